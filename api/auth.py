@@ -1,12 +1,13 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Request
 from fastapi.security import OAuth2PasswordBearer, OAuth2PasswordRequestForm
-from werkzeug.security import generate_password_hash, check_password_hash
 import logging
 import mysql.connector
 
 from config import DB_CONFIG
 from database.crud import execute_query, fetch_one
 from api.models import User
+from api.throttle import check_auth_throttle
+from services.password_service import hash_password, verify_password
 
 
 router = APIRouter(tags=["authentication"], prefix="")
@@ -14,7 +15,7 @@ oauth2_scheme = OAuth2PasswordBearer(tokenUrl="token")
 logger = logging.getLogger(__name__)
 
 
-def authenticate_user(username: str, password: str):
+async def authenticate_user(username: str, password: str):
     """Authenticate a user by username and password"""
     try:
         logger.info(f"Authenticating user: {username}")
@@ -27,7 +28,7 @@ def authenticate_user(username: str, password: str):
         
         user_id, hashed_password = result
 
-        if check_password_hash(hashed_password, password):
+        if await verify_password(hashed_password, password):
             logger.info(f"Authencation successful for user: {username}")
             return user_id
         else:
@@ -39,10 +40,11 @@ def authenticate_user(username: str, password: str):
 
 
 @router.post("/token")
-async def login(form_data: OAuth2PasswordRequestForm = Depends()):
+async def login(request: Request, form_data: OAuth2PasswordRequestForm = Depends()):
     """Login endpoint to obtain an OAuth2 Bearer token"""
+    check_auth_throttle(request, "login", form_data.username)
     logger.info(f"Login attempt with username: {form_data.username}")
-    user_id = authenticate_user(form_data.username, form_data.password)
+    user_id = await authenticate_user(form_data.username, form_data.password)
     if not user_id:
         logger.warning(f"Login failed for user: {form_data.username}")
         raise HTTPException(status_code=400, detail="Incorrect username or password")
@@ -51,10 +53,11 @@ async def login(form_data: OAuth2PasswordRequestForm = Depends()):
 
 
 @router.post("/register")
-async def register(user: User):
+async def register(request: Request, user: User):
     """Register a new user"""
+    check_auth_throttle(request, "register", user.username)
     try:
-        hashed_password = generate_password_hash(user.password)
+        hashed_password = await hash_password(user.password)
         execute_query("INSERT INTO users (username, password) VALUES (%s, %s)",
                       (user.username, hashed_password))
         logger.info(f"Successfully registered user: {user.username}")
@@ -0,0 +1,210 @@
+import os
+import re
+from email.utils import formatdate, parsedate_to_datetime
+from typing import List, Optional, Tuple
+
+import anyio
+from fastapi import Request
+from fastapi.responses import FileResponse, Response
+from starlette.types import Receive, Scope, Send
+
+
+# ASGI extension for handing a file descriptor to the server (sendfile)
+ZEROCOPY_EXTENSION = "http.response.zerocopysend"
+
+RANGE_PATTERN = re.compile(r"^bytes=(\d*)-(\d*)$")
+
+
+def file_etag(stat_result: os.stat_result) -> str:
+    """
+    Strong validator for a stored file. Stored files are only ever replaced
+    atomically, so mtime and size identify the content.
+    """
+    return f'"{stat_result.st_mtime_ns:x}-{stat_result.st_size:x}"'
+
+
+def _etag_list(header: str) -> List[str]:
+    return [tag.strip().removeprefix("W/") for tag in header.split(",") if tag.strip()]
+
+
+def _not_modified(request: Request, etag: str, stat_result: os.stat_result) -> bool:
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is not None:
+        # If-None-Match takes precedence over If-Modified-Since (RFC 9110 13.2.2)
+        tags = _etag_list(if_none_match)
+        return "*" in tags or etag in tags
+
+    if_modified_since = request.headers.get("if-modified-since")
+    if if_modified_since:
+        try:
+            since = parsedate_to_datetime(if_modified_since).timestamp()
+        except (TypeError, ValueError):
+            return False
+        return int(stat_result.st_mtime) <= since
+    return False
+
+
+def _if_range_matches(request: Request, etag: str, last_modified: str) -> bool:
+    if_range = request.headers.get("if-range")
+    if if_range is None:
+        return True
+    if_range = if_range.strip()
+    if if_range.startswith('"'):
+        return if_range == etag
+    return if_range == last_modified
+
+
+def parse_range(header: Optional[str], size: int) -> Optional[Tuple[int, int]]:
+    """
+    Parse a single-range Range header into inclusive (start, end) offsets.
+
+    Args:
+        header: Value of the Range header
+        size: File size in bytes
+
+    Returns:
+        Optional[Tuple[int, int]]: The byte range, or None to send the whole file
+            (no header, a syntax error, or several ranges)
+
+    Raises:
+        ValueError: If the range cannot be satisfied
+    """
+    if not header:
+        return None
+    match = RANGE_PATTERN.match(header.strip())
+    if not match:
+        return None
+
+    first, last = match.groups()
+    if not first and not last:
+        return None
+    if not first:
+        # Suffix range: the last N bytes
+        length = int(last)
+        if length == 0 or size == 0:
+            raise ValueError("Unsatisfiable range")
+        return max(size - length, 0), size - 1
+
+    start = int(first)
+    end = int(last) if last else size - 1
+    if start >= size or end < start:
+        raise ValueError("Unsatisfiable range")
+    return start, min(end, size - 1)
+
+
+class RangeFileResponse(FileResponse):
+    """
+    FileResponse for one byte range of a file (or all of it), sent with sendfile
+    when the server supports the zero-copy ASGI extension.
+    """
+
+    chunk_size = 256 * 1024
+
+    def __init__(self, path, stat_result: os.stat_result, start: int, end: int, method: str = "GET", **kwargs):
+        self.start = start
+        self.end = end
+        super().__init__(path, stat_result=stat_result, **kwargs)
+        self.send_header_only = method.upper() == "HEAD"
+
+    def set_stat_headers(self, stat_result: os.stat_result) -> None:
+        self.headers.setdefault("content-length", str(self.end - self.start + 1))
+        self.headers.setdefault("last-modified", formatdate(stat_result.st_mtime, usegmt=True))
+        self.headers.setdefault("etag", file_etag(stat_result))
+        self.headers.setdefault("accept-ranges", "bytes")
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        await send({
+            "type": "http.response.start",
+            "status": self.status_code,
+            "headers": self.raw_headers,
+        })
+        if self.send_header_only or self.end < self.start:
+            await send({"type": "http.response.body", "body": b"", "more_body": False})
+        else:
+            async with await anyio.open_file(self.path, mode="rb") as file:
+                if ZEROCOPY_EXTENSION in scope.get("extensions", {}):
+                    await send({
+                        "type": ZEROCOPY_EXTENSION,
+                        "file": file.wrapped.fileno(),
+                        "offset": self.start,
+                        "count": self.end - self.start + 1,
+                        "more_body": False,
+                    })
+                else:
+                    await file.seek(self.start)
+                    remaining = self.end - self.start + 1
+                    while remaining > 0:
+                        chunk = await file.read(min(self.chunk_size, remaining))
+                        if not chunk:
+                            break  # File was truncated underneath us
+                        remaining -= len(chunk)
+                        await send({
+                            "type": "http.response.body",
+                            "body": chunk,
+                            "more_body": remaining > 0,
+                        })
+                    if remaining > 0:
+                        await send({"type": "http.response.body", "body": b"", "more_body": False})
+        if self.background is not None:
+            await self.background()
+
+
+def ranged_file_response(
+    request: Request,
+    path,
+    media_type: str,
+    filename: Optional[str] = None,
+    cache_control: Optional[str] = None
+) -> Response:
+    """
+    Serve a file with conditional-request and byte-range support.
+
+    Answers 304 when If-None-Match / If-Modified-Since match, 206 with
+    Content-Range for a satisfiable single Range (honouring If-Range), 416 for
+    an unsatisfiable one, and the whole file with 200 otherwise.
+
+    Args:
+        request: The incoming request
+        path: File to send
+        media_type: Content-Type of the file
+        filename: Download name for Content-Disposition
+        cache_control: Optional Cache-Control header value
+
+    Raises:
+        FileNotFoundError: If the file does not exist
+    """
+    stat_result = os.stat(path)
+    size = stat_result.st_size
+    etag = file_etag(stat_result)
+    last_modified = formatdate(stat_result.st_mtime, usegmt=True)
+
+    headers = {"etag": etag, "last-modified": last_modified, "accept-ranges": "bytes"}
+    if cache_control:
+        headers["cache-control"] = cache_control
+
+    if _not_modified(request, etag, stat_result):
+        return Response(status_code=304, headers=headers)
+
+    start, end, status_code = 0, size - 1, 200
+    if _if_range_matches(request, etag, last_modified):
+        try:
+            byte_range = parse_range(request.headers.get("range"), size)
+        except ValueError:
+            headers["content-range"] = f"bytes */{size}"
+            return Response(status_code=416, headers=headers)
+        if byte_range is not None:
+            start, end = byte_range
+            status_code = 206
+            headers["content-range"] = f"bytes {start}-{end}/{size}"
+
+    return RangeFileResponse(
+        path,
+        stat_result=stat_result,
+        start=start,
+        end=end,
+        status_code=status_code,
+        headers=headers,
+        media_type=media_type,
+        filename=filename,
+        method=request.method
+    )
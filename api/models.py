@@ -1,5 +1,5 @@
 from pydantic import BaseModel
-from typing import Optional
+from typing import Optional, List
 
 
 class User(BaseModel):
@@ -26,3 +26,9 @@ class YouTubeRequest(BaseModel):
     video_id: str  # YouTube video ID
     width: Optional[int] = None  # Optional width for the player
     height: Optional[int] = None  # Optional height for the player
+
+
+class MultiSearchRequest(BaseModel):
+    """Concurrent multi-query Google search request model"""
+    queries: List[str]  # Related queries to run concurrently
+    num_results: int = 5  # Results requested per query (max 10)
@@ -1,13 +1,16 @@
-from fastapi import APIRouter, Depends, HTTPException, UploadFile, File, Query, Response
-from fastapi.responses import FileResponse
-from typing import Dict, Any, Optional, List
+from fastapi import APIRouter, Depends, HTTPException, UploadFile, File, Query, Request, Response
+from fastapi.responses import HTMLResponse, StreamingResponse
+from typing import Dict, Any, Optional, List, Tuple
+import asyncio
+import json
 import logging
 import webbrowser
 import os
 from pathlib import Path
 
-from api.models import ChatRequest, ImageRequest, YouTubeRequest
+from api.models import ChatRequest, ImageRequest, YouTubeRequest, MultiSearchRequest
 from api.auth import oauth2_scheme
+from api.file_responses import ranged_file_response
 from database.crud import (
     execute_query, 
     fetch_all, 
@@ -25,18 +28,28 @@ from services.langchain_service import generate_langsearch_response
 from services.langgraph_service import (
     generate_langgraph_response, 
     test_langgraph_agent,
-    youtube_search,
+    search_youtube_videos,
     youtube_video_info,
-    youtube_oembed,
-    youtube_download,
-    youtube_create_html_player,
-    test_youtube_api,
-    test_youtube_oembed,
-    get_youtube_client
+    youtube_oembed
+)
+from services.youtube_metadata import get_video_snippet
+from services.download_jobs import download_manager, DownloadQueueFull
+from services.video_storage import touch_stored_video
+from services.html_player import extract_video_id, get_player_html, player_url, get_player_cache_stats
+from services.hls_service import (
+    HLS_AVAILABLE,
+    PLAYLIST_NAME,
+    PLAYLIST_MEDIA_TYPE,
+    SEGMENT_MEDIA_TYPE,
+    find_hls_playlist,
+    find_hls_segment
 )
 from services.image_service import generate_image_from_prompt
 from services.ocr_service import extract_text_from_image
-from config import YOUTUBE_API_ENABLED, YOUTUBE_PLAYER_WIDTH, YOUTUBE_PLAYER_HEIGHT
+from config import (
+    YOUTUBE_API_ENABLED, YOUTUBE_PLAYER_WIDTH, YOUTUBE_PLAYER_HEIGHT, DOWNLOAD_JOB_EVENT_INTERVAL,
+    VIDEO_STREAM_CACHE_CONTROL, HLS_SEGMENT_CACHE_CONTROL
+)
 
 router = APIRouter(tags=["api"])
 logger = logging.getLogger(__name__)
@@ -58,9 +71,9 @@ async def chat(request: ChatRequest, token: str = Depends(oauth2_scheme)):
         elif request.api_provider == "huggingface":
             content, used_model = generate_huggingface_response(request.prompt)
         elif request.api_provider == "langchain":
-            content, used_model = await generate_langsearch_response(request.prompt)
+            content, used_model = await generate_langsearch_response(request.prompt, user_id=user_id)
         elif request.api_provider == "langgraph":
-            content, used_model = await generate_langgraph_response(request.prompt, request.model)
+            content, used_model = await generate_langgraph_response(request.prompt, request.model, user_id=user_id)
         else:  # Default to OpenAI
             content, used_model = await generate_openai_response(request.prompt, request.model, request.temperature)
         
@@ -259,28 +272,21 @@ async def upload_image(file: UploadFile = File(...), token: str = Depends(oauth2
 
 @router.get("/health")
 async def health_check():
-    """Check the health status of the API and its dependencies"""
+    """
+    Health status of the API and its dependencies.
+    Served from the background health snapshot; no dependency is probed per request.
+    """
     from services.openai_service import check_openai_status
-    from services.search_service import test_google_api
-    from services.langchain_service import check_langchain_status
-    from services.langgraph_service import setup_langgraph_components
     from services.huggingface_service import check_huggingface_status
-    from database.connection import check_database_connection
+    from services.search_cache import get_search_cache_stats
+    from services.youtube_metadata import get_video_metadata_stats
+    from services.youtube_streams import get_stream_cache_stats
+    from services.video_storage import get_storage_stats
+    from services.status_service import get_service_status, get_readiness
     from config import LANGGRAPH_MODEL, YOUTUBE_API_ENABLED
     
     openai_version, openai_status = check_openai_status()
-    langchain_ready, langchain_error = check_langchain_status()
-    
-    # Quick check for LangGraph status
-    langgraph_llm, langgraph_agent = setup_langgraph_components(LANGGRAPH_MODEL)
-    langgraph_ready = langgraph_agent is not None
-    
-    # Check YouTube API if enabled
-    youtube_api_ready = False
-    youtube_oembed_ready = False
-    if YOUTUBE_API_ENABLED:
-        youtube_api_ready = test_youtube_api()
-        youtube_oembed_ready = test_youtube_oembed()
+    snapshot = get_service_status()
     
     return {
         "status": "healthy",
@@ -292,18 +298,51 @@ async def health_check():
         "langchain_model": "gpt-3.5-turbo-instruct",
         "langgraph_model": LANGGRAPH_MODEL,
         "huggingface_available": check_huggingface_status(),
-        "langchain_agent_available": langchain_ready,
-        "langchain_error": langchain_error,
-        "langgraph_agent_available": langgraph_ready,
-        "direct_google_search_available": test_google_api(),
+        "langchain_agent_available": snapshot.llm_available,
+        "langchain_error": snapshot.llm_error,
+        "langgraph_agent_available": snapshot.langgraph_available,
+        "direct_google_search_available": snapshot.search_available,
+        "search_cache": get_search_cache_stats(),
+        "youtube_metadata_cache": get_video_metadata_stats(),
+        "youtube_stream_cache": get_stream_cache_stats(),
+        "html_player_cache": get_player_cache_stats(),
+        "download_jobs": download_manager.stats(),
+        "video_storage": get_storage_stats(),
+        "hls_available": HLS_AVAILABLE,
+        "readiness": get_readiness().to_dict(),
         "youtube_api_enabled": YOUTUBE_API_ENABLED,
-        "youtube_api_available": youtube_api_ready,
-        "youtube_oembed_available": youtube_oembed_ready,
-        "database_connected": check_database_connection(),
+        "youtube_api_available": bool(snapshot.youtube_api_available),
+        "youtube_oembed_available": bool(snapshot.youtube_oembed_available),
+        "database_connected": snapshot.database_connected,
+        "checked_at": snapshot.checked_at,
+        "snapshot_age_seconds": snapshot.to_dict()["age_seconds"],
+        "snapshot_stale": snapshot.stale,
         "video_features_enabled": True,
         "fallback_enabled": True
     }
 
+@router.get("/health/live")
+async def health_live():
+    """Liveness probe: the process is up and the event loop is responsive"""
+    return {"status": "alive"}
+
+@router.get("/health/ready")
+async def health_ready(response: Response):
+    """Readiness probe served from the cached health snapshot (503 when not ready)"""
+    from services.status_service import get_service_status, check_readiness
+    
+    ready, reasons = check_readiness()
+    snapshot = get_service_status()
+    if not ready:
+        response.status_code = 503
+    return {
+        "status": "ready" if ready else "not_ready",
+        "reasons": reasons,
+        "checked_at": snapshot.checked_at,
+        "snapshot_age_seconds": snapshot.to_dict()["age_seconds"],
+        "snapshot_stale": snapshot.stale
+    }
+
 @router.get("/test-google-search")
 async def test_google_search(query: str = "test", token: str = Depends(oauth2_scheme)):
     """Test endpoint for Google search functionality"""
@@ -331,6 +370,18 @@ async def test_google_search(query: str = "test", token: str = Depends(oauth2_sc
             "error": str(e)
         }
 
+@router.post("/search/multi")
+async def multi_search_endpoint(request: MultiSearchRequest, token: str = Depends(oauth2_scheme)):
+    """Run several Google searches concurrently and return merged, de-duplicated results"""
+    from services.search_service import multi_search
+
+    if not request.queries:
+        raise HTTPException(status_code=400, detail="At least one query is required")
+    if len(request.queries) > 10:
+        raise HTTPException(status_code=400, detail="At most 10 queries are allowed")
+
+    return await multi_search(request.queries, max(1, min(request.num_results, 10)))
+
 @router.get("/test-langchain-search")
 async def test_langchain_search(query: str = "test", token: str = Depends(oauth2_scheme)):
     """Test endpoint for LangChain search functionality"""
@@ -412,57 +463,31 @@ async def test_langgraph_search_endpoint(query: str = "test", token: str = Depen
 async def youtube_search_endpoint(
     query: str, 
     max_results: int = Query(5, ge=1, le=50),
+    page_token: Optional[str] = None,
     token: str = Depends(oauth2_scheme)
 ):
-    """Search for videos on YouTube"""
+    """Search for videos on YouTube (pass nextPageToken as page_token for the next page)"""
     if not YOUTUBE_API_ENABLED:
         raise HTTPException(status_code=400, detail="YouTube API is disabled in server configuration")
     
     user_id = int(token)
     try:
-        # Parse YouTube search results
-        search_response = youtube_search(query)
-        
-        # Parse the results into a more frontend-friendly format
-        results = []
-        for video_text in search_response.split("\n\n---\n\n"):
-            if not video_text.strip():
-                continue
-                
-            # Extract data from the text
-            lines = video_text.strip().split("\n")
-            video_data = {}
-            
-            for line in lines:
-                if line.startswith("Title: "):
-                    video_data["title"] = line[7:]
-                elif line.startswith("Channel: "):
-                    video_data["channel"] = line[9:]
-                elif line.startswith("URL: "):
-                    video_data["url"] = line[5:]
-                    # Extract video ID from URL
-                    if "v=" in line:
-                        video_data["videoId"] = line.split("v=")[1].split("&")[0]
-                    elif "youtu.be/" in line:
-                        video_data["videoId"] = line.split("youtu.be/")[1]
-                elif line.startswith("Thumbnail: "):
-                    video_data["thumbnail"] = line[11:]
-                elif line.startswith("Description: "):
-                    video_data["description"] = line[13:]
-            
-            if "title" in video_data and "videoId" in video_data:
-                results.append(video_data)
+        search = await asyncio.to_thread(search_youtube_videos, query, max_results, page_token)
         
-        # Log search in conversations
-        execute_query(
-            "INSERT INTO conversations (user_id, conversation, model, api_provider) VALUES (%s, %s, %s, %s)",
-            (user_id, f"Searched YouTube for: {query}", "YouTube-Search", "youtube")
-        )
+        # Log search in conversations (once per search, not for every further page)
+        if not page_token:
+            execute_query(
+                "INSERT INTO conversations (user_id, conversation, model, api_provider) VALUES (%s, %s, %s, %s)",
+                (user_id, f"Searched YouTube for: {query}", "YouTube-Search", "youtube")
+            )
         
         return {
             "success": True,
             "query": query,
-            "results": results
+            "results": search["results"],
+            "nextPageToken": search["nextPageToken"],
+            "prevPageToken": search["prevPageToken"],
+            "totalResults": search["totalResults"]
         }
     except Exception as e:
         logger.error(f"YouTube search error: {str(e)}")
@@ -482,7 +507,8 @@ async def youtube_video_endpoint(
         raise HTTPException(status_code=400, detail="YouTube API is disabled in server configuration")
     
     try:
-        video_info = await youtube_video_info(video_id)
+        # Tool call is blocking; metadata comes from the cache filled by the search enrichment
+        video_info = await asyncio.to_thread(youtube_video_info.invoke, video_id)
         return {
             "success": True,
             "video_id": video_id,
@@ -529,21 +555,22 @@ async def youtube_create_player_endpoint(
     request: YouTubeRequest,
     token: str = Depends(oauth2_scheme)
 ):
-    """Create an HTML file with an embedded YouTube player and return its path"""
+    """Render an HTML page with an embedded YouTube player and return the URL it is served from"""
     if not YOUTUBE_API_ENABLED:
         raise HTTPException(status_code=400, detail="YouTube API is disabled in server configuration")
     
+    video_id = extract_video_id(request.video_id)
+    width = request.width or YOUTUBE_PLAYER_WIDTH
+    height = request.height or YOUTUBE_PLAYER_HEIGHT
+    
     try:
-        html_path = await youtube_create_html_player(
-            request.video_id, 
-            request.width or YOUTUBE_PLAYER_WIDTH, 
-            request.height or YOUTUBE_PLAYER_HEIGHT
-        )
+        # Rendered in memory and cached, so opening the URL right after is free
+        await asyncio.to_thread(get_player_html, video_id, width, height)
         
         return {
             "success": True,
-            "video_id": request.video_id,
-            "player_path": html_path,
+            "video_id": video_id,
+            "player_url": player_url(video_id, width, height),
             "message": "HTML player created successfully"
         }
     except Exception as e:
@@ -553,6 +580,27 @@ async def youtube_create_player_endpoint(
             "video_id": request.video_id,
             "error": str(e)
         }
+
+@router.get("/youtube/player/{video_id}", response_class=HTMLResponse)
+async def youtube_player_page(
+    video_id: str,
+    width: int = Query(YOUTUBE_PLAYER_WIDTH, ge=1, le=4096),
+    height: int = Query(YOUTUBE_PLAYER_HEIGHT, ge=1, le=4096)
+):
+    """
+    Serve the HTML page of an embedded YouTube player. No bearer token is required,
+    so the URL can be opened in a browser tab or an iframe; the page only contains
+    public embed markup.
+    """
+    if not YOUTUBE_API_ENABLED:
+        raise HTTPException(status_code=400, detail="YouTube API is disabled in server configuration")
+    
+    try:
+        page = await asyncio.to_thread(get_player_html, video_id, width, height)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    
+    return HTMLResponse(page, headers={"Cache-Control": "public, max-age=300"})
     
 
 @router.get("/youtube/watch/{video_id}")
@@ -604,21 +652,12 @@ async def create_embedded_player_response(
     user_id = int(token)
     
     try:
-        # Get video info
-        youtube = get_youtube_client()
+        # Get video info (served from the shared metadata cache when possible)
         video_info = None
-        
-        if youtube:
-            try:
-                video_response = youtube.videos().list(
-                    part="snippet",
-                    id=video_id
-                ).execute()
-                
-                if video_response.get("items"):
-                    video_info = video_response["items"][0]["snippet"]
-            except Exception as e:
-                logger.error(f"Error fetching video info: {str(e)}")
+        try:
+            video_info = await asyncio.to_thread(get_video_snippet, video_id)
+        except Exception as e:
+            logger.error(f"Error fetching video info: {str(e)}")
         
         # Create embed HTML for direct viewing (with autoplay)
         embed_url = f"https://www.youtube.com/embed/{video_id}"
@@ -693,73 +732,86 @@ async def create_embedded_player_response(
             "error": str(e)
         }
 
-@router.post("/videos/{video_id}/download")
+@router.post("/videos/{video_id}/download", status_code=202)
 async def download_video_response(
     video_id: str,
     resolution: str = "720p",
     token: str = Depends(oauth2_scheme)
 ):
-    """Download a YouTube video and save to history"""
+    """
+    Start downloading a YouTube video in the background.
+    The video is saved to history once the file is in place; follow the job via
+    /download-jobs/{job_id} (polling) or /download-jobs/{job_id}/events (SSE).
+    Videos already in storage complete immediately without downloading again.
+    """
     if not YOUTUBE_API_ENABLED:
         raise HTTPException(status_code=400, detail="YouTube API is disabled")
     
     user_id = int(token)
     
     try:
-        # Download video
-        video_download_result = await youtube_download(video_id, resolution)
-        
-        # Extract video data from the download result
-        video_data = None
-        
-        # This is a complex parsing task - depends on the exact format of youtube_download's response
-        # For now, just create basic video info as a fallback
-        if not isinstance(video_download_result, dict):
-            # Create basic video info
-            video_data = {
-                "video_id": video_id,
-                "title": f"YouTube Video {video_id}",
-                "channel": "Unknown channel",
-                "type": "downloaded",
-                "filepath": f"./storage/videos/{video_id}.mp4",  # Default path
-                "thumbnail": f"https://img.youtube.com/vi/{video_id}/hqdefault.jpg"
-            }
-        else:
-            video_data = video_download_result
-        
-        # Save to database
-        video_db_id = save_video_to_db(user_id, video_data)
-        
-        if not video_db_id:
-            raise HTTPException(status_code=500, detail="Failed to save video to database")
-        
-        # Save to conversations
-        video_text = f"Downloaded YouTube video: {video_data.get('title', video_id)}"
-        conversation_id = execute_query(
-            "INSERT INTO conversations (user_id, conversation, model, api_provider) VALUES (%s, %s, %s, %s)",
-            (user_id, video_text, "YouTube", "youtube"),
-            return_last_id=True
-        )
-        
-        # Link video to conversation
-        link_video_to_conversation(conversation_id, video_db_id)
-        
-        return {
-            "success": True,
-            "video_id": video_id,
-            "video_db_id": video_db_id,
-            "filepath": video_data.get("filepath"),
-            "title": video_data.get("title"),
-            "thumbnail": video_data.get("thumbnail"),
-            "conversation_added": True
-        }
-    except Exception as e:
-        logger.error(f"Error downloading video: {str(e)}")
-        return {
-            "success": False,
-            "video_id": video_id,
-            "error": str(e)
-        }
+        # May write the database row right away when the video is already in storage
+        job = await asyncio.to_thread(download_manager.submit, video_id, resolution, user_id)
+    except DownloadQueueFull as e:
+        raise HTTPException(status_code=429, detail=str(e))
+    
+    return {
+        "success": True,
+        "video_id": video_id,
+        "job_id": job.job_id,
+        "status": job.status,
+        "status_url": f"/download-jobs/{job.job_id}",
+        "events_url": f"/download-jobs/{job.job_id}/events"
+    }
+
+def get_user_download_job(job_id: str, user_id: int):
+    """Look up a download job owned by the user (404 otherwise)"""
+    job = download_manager.get(job_id)
+    if job is None or job.user_id != user_id:
+        raise HTTPException(status_code=404, detail="Download job not found")
+    return job
+
+@router.get("/download-jobs/{job_id}")
+async def get_download_job(
+    job_id: str,
+    token: str = Depends(oauth2_scheme)
+):
+    """Get the progress of a background video download"""
+    job = get_user_download_job(job_id, int(token))
+    return job.to_dict()
+
+@router.get("/download-jobs/{job_id}/events")
+async def download_job_events(
+    job_id: str,
+    token: str = Depends(oauth2_scheme)
+):
+    """Stream the progress of a background video download as server-sent events"""
+    job = get_user_download_job(job_id, int(token))
+    
+    async def event_stream():
+        last_version = -1
+        idle = 0.0
+        while True:
+            version = job.version
+            if version != last_version:
+                last_version = version
+                idle = 0.0
+                state = job.to_dict()
+                yield f"event: progress\ndata: {json.dumps(state)}\n\n"
+                if state["status"] in ("completed", "failed"):
+                    break
+            elif idle >= 15:
+                # Comment line keeps proxies from closing an idle connection
+                idle = 0.0
+                yield ": keep-alive\n\n"
+            await asyncio.sleep(DOWNLOAD_JOB_EVENT_INTERVAL)
+            idle += DOWNLOAD_JOB_EVENT_INTERVAL
+    
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
 
 @router.get("/videos/{video_db_id}")
 async def get_video(
@@ -779,12 +831,24 @@ async def get_video(
         if video_data["type"] == "downloaded" and video_data["filepath"]:
             file_path = Path(video_data["filepath"])
             if not file_path.exists():
+                if video_data.get("evicted_at"):
+                    # Evicted to stay under the storage quota; downloading again restores it
+                    return {
+                        "success": False,
+                        "error": "Video file was removed from storage and can be downloaded again",
+                        "evicted": True,
+                        "redownload_url": f"/videos/{video_data['video_id']}/download",
+                        "video_data": video_data
+                    }
                 return {
                     "success": False,
                     "error": "Video file not found on server",
                     "video_data": video_data
                 }
         
+            if find_hls_playlist(file_path):
+                video_data["hls_url"] = f"/videos/{video_db_id}/hls/{PLAYLIST_NAME}"
+        
         return {
             "success": True,
             "video_data": video_data
@@ -798,35 +862,80 @@ async def get_video(
             "error": str(e)
         }
 
+def get_downloaded_video_file(video_db_id: int, user_id: int) -> Tuple[Path, Dict[str, Any]]:
+    """Path of a user's downloaded video, or the HTTP error explaining why it cannot be served"""
+    video_data = get_video_by_id(video_db_id, user_id)
+    
+    if not video_data:
+        raise HTTPException(status_code=404, detail="Video not found")
+    
+    if video_data["type"] != "downloaded" or not video_data["filepath"]:
+        raise HTTPException(status_code=400, detail="This is not a downloaded video")
+    
+    file_path = Path(video_data["filepath"])
+    if not file_path.exists():
+        if video_data.get("evicted_at"):
+            raise HTTPException(status_code=410, detail="Video file was removed from storage and can be downloaded again")
+        raise HTTPException(status_code=404, detail="Video file not found on server")
+    
+    return file_path, video_data
+
 @router.get("/videos/{video_db_id}/stream")
 async def stream_video(
     video_db_id: int,
+    request: Request,
     token: str = Depends(oauth2_scheme)
 ):
-    """Stream a downloaded video"""
+    """Stream a downloaded video (supports Range requests for seeking and ETag revalidation)"""
     user_id = int(token)
     
     try:
-        video_data = get_video_by_id(video_db_id, user_id)
-        
-        if not video_data:
-            raise HTTPException(status_code=404, detail="Video not found")
+        file_path, video_data = get_downloaded_video_file(video_db_id, user_id)
         
-        if video_data["type"] != "downloaded" or not video_data["filepath"]:
-            raise HTTPException(status_code=400, detail="This is not a downloaded video")
+        # Keeps recently watched videos from being evicted
+        touch_stored_video(file_path)
         
-        file_path = Path(video_data["filepath"])
-        if not file_path.exists():
-            raise HTTPException(status_code=404, detail="Video file not found on server")
-        
-        # Return a streaming response
-        return FileResponse(
-            path=file_path,
+        return ranged_file_response(
+            request,
+            file_path,
             media_type="video/mp4",
-            filename=f"{video_data['title']}.mp4"
+            filename=f"{video_data['title']}.mp4",
+            cache_control=VIDEO_STREAM_CACHE_CONTROL
         )
     except HTTPException:
         raise
     except Exception as e:
         logger.error(f"Error streaming video: {str(e)}")
         raise HTTPException(status_code=500, detail=str(e))
+
+@router.get("/videos/{video_db_id}/hls/{filename}")
+async def stream_video_hls(
+    video_db_id: int,
+    filename: str,
+    request: Request,
+    token: str = Depends(oauth2_scheme)
+):
+    """Serve the HLS playlist (index.m3u8) or a segment of a downloaded video"""
+    user_id = int(token)
+    
+    try:
+        file_path, _ = get_downloaded_video_file(video_db_id, user_id)
+        
+        if filename == PLAYLIST_NAME:
+            hls_file = find_hls_playlist(file_path)
+            media_type, cache_control = PLAYLIST_MEDIA_TYPE, VIDEO_STREAM_CACHE_CONTROL
+            # Opening the playlist counts as watching the video
+            touch_stored_video(file_path)
+        else:
+            hls_file = find_hls_segment(file_path, filename)
+            media_type, cache_control = SEGMENT_MEDIA_TYPE, HLS_SEGMENT_CACHE_CONTROL
+        
+        if not hls_file:
+            raise HTTPException(status_code=404, detail="HLS stream not available for this video")
+        
+        return ranged_file_response(request, hls_file, media_type=media_type, cache_control=cache_control)
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Error streaming HLS: {str(e)}")
+        raise HTTPException(status_code=500, detail=str(e))
@@ -0,0 +1,186 @@
+import logging
+import math
+import threading
+import time
+from typing import Dict, List, Optional, Tuple
+
+from fastapi import HTTPException, Request
+
+from config import AUTH_THROTTLE_ENABLED, AUTH_THROTTLE_LIMITS, AUTH_THROTTLE_REDIS_URL
+
+
+logger = logging.getLogger(__name__)
+
+# Redis is only needed when a shared throttle backend is configured
+try:
+    import redis
+    REDIS_AVAILABLE = True
+except ImportError:
+    REDIS_AVAILABLE = False
+
+
+class InMemoryBucketStore:
+    """Token buckets kept in process memory, expired once they would be full again"""
+
+    SWEEP_EVERY = 1000  # Number of takes between sweeps of idle buckets
+
+    def __init__(self):
+        self._buckets: Dict[str, List[float]] = {}  # key -> [tokens, last_update, expires_at]
+        self._lock = threading.Lock()
+        self._takes = 0
+
+    def take_all(self, buckets: List[Tuple[str, int, float]]) -> float:
+        """
+        Take one token from each bucket, or from none of them
+
+        Every bucket is checked before any is charged, so a request rejected by
+        one bucket (e.g. its username) does not use up the others (e.g. its IP).
+
+        Args:
+            buckets: (key, capacity, period) per bucket; capacity is the maximum
+                number of tokens (burst size), period the seconds needed to
+                refill an empty bucket
+
+        Returns:
+            float: 0 if the tokens were taken, otherwise seconds until all are available
+        """
+        now = time.monotonic()
+
+        with self._lock:
+            self._takes += 1
+            if self._takes % self.SWEEP_EVERY == 0:
+                self._sweep(now)
+
+            levels = []
+            for key, capacity, period in buckets:
+                rate = capacity / period
+                bucket = self._buckets.get(key)
+                if bucket is None or bucket[2] <= now:
+                    tokens = float(capacity)
+                else:
+                    tokens = min(capacity, bucket[0] + (now - bucket[1]) * rate)
+                levels.append((key, capacity, rate, tokens))
+
+            retry_after = max(((1 - tokens) / rate for _, _, rate, tokens in levels if tokens < 1), default=0.0)
+
+            for key, capacity, rate, tokens in levels:
+                if retry_after == 0:
+                    tokens -= 1
+                # Once the bucket is full again it carries no state and can be dropped
+                self._buckets[key] = [tokens, now, now + (capacity - tokens) / rate]
+            return retry_after
+
+    def _sweep(self, now: float):
+        """Drop buckets that have refilled completely"""
+        expired = [key for key, bucket in self._buckets.items() if bucket[2] <= now]
+        for key in expired:
+            del self._buckets[key]
+
+
+class RedisBucketStore:
+    """Token buckets shared between workers through Redis"""
+
+    # Atomically refill every bucket and take a token from each only if all have one;
+    # ARGV is now followed by (capacity, rate) per key. Returns the wait in milliseconds (0 if allowed)
+    TAKE_SCRIPT = """
+    local now = tonumber(ARGV[1])
+    local levels = {}
+    local wait = 0
+    for i, key in ipairs(KEYS) do
+        local capacity = tonumber(ARGV[i * 2])
+        local rate = tonumber(ARGV[i * 2 + 1])
+        local bucket = redis.call('HMGET', key, 'tokens', 'ts')
+        local tokens = tonumber(bucket[1])
+        if tokens == nil then
+            tokens = capacity
+        else
+            tokens = math.min(capacity, tokens + (now - tonumber(bucket[2])) * rate)
+        end
+        if tokens < 1 then
+            wait = math.max(wait, math.ceil((1 - tokens) / rate * 1000))
+        end
+        levels[i] = tokens
+    end
+    for i, key in ipairs(KEYS) do
+        local capacity = tonumber(ARGV[i * 2])
+        local rate = tonumber(ARGV[i * 2 + 1])
+        local tokens = levels[i]
+        if wait == 0 then
+            tokens = tokens - 1
+        end
+        redis.call('HSET', key, 'tokens', tokens, 'ts', now)
+        redis.call('PEXPIRE', key, math.ceil((capacity - tokens) / rate * 1000) + 1000)
+    end
+    return wait
+    """
+
+    def __init__(self, url: str):
+        self._client = redis.Redis.from_url(url)
+        self._take = self._client.register_script(self.TAKE_SCRIPT)
+
+    def take_all(self, buckets: List[Tuple[str, int, float]]) -> float:
+        """Take one token from each bucket, or from none of them (see InMemoryBucketStore.take_all)"""
+        args = [time.time()]
+        for _, capacity, period in buckets:
+            args += [capacity, capacity / period]
+        wait_ms = self._take(keys=[f"auth_throttle:{key}" for key, _, _ in buckets], args=args)
+        return int(wait_ms) / 1000
+
+
+# Global bucket store, created on first use
+bucket_store = None
+
+
+def get_bucket_store():
+    """Return the configured bucket store, falling back to memory if Redis is unavailable"""
+    global bucket_store
+
+    if bucket_store is None:
+        if AUTH_THROTTLE_REDIS_URL and REDIS_AVAILABLE:
+            try:
+                bucket_store = RedisBucketStore(AUTH_THROTTLE_REDIS_URL)
+                logger.info("Auth throttling uses the shared Redis backend")
+            except Exception as e:
+                logger.error(f"Could not connect auth throttling to Redis, using memory: {e}")
+                bucket_store = InMemoryBucketStore()
+        else:
+            if AUTH_THROTTLE_REDIS_URL:
+                logger.warning("AUTH_THROTTLE_REDIS_URL is set but redis is not installed. Using memory.")
+            bucket_store = InMemoryBucketStore()
+    return bucket_store
+
+
+def check_auth_throttle(request: Request, action: str, username: Optional[str] = None):
+    """
+    Reject an authentication request early if its IP or username is over the limit
+
+    Args:
+        request: The incoming request (used for the client IP)
+        action: The throttled action ("login" or "register")
+        username: Optional username to throttle in addition to the IP
+
+    Raises:
+        HTTPException: 429 with a Retry-After header when throttled
+    """
+    if not AUTH_THROTTLE_ENABLED:
+        return
+
+    client_ip = request.client.host if request.client else "unknown"
+    checks = [(f"{action}:ip:{client_ip}", *AUTH_THROTTLE_LIMITS[f"{action}_ip"])]
+    if username and f"{action}_username" in AUTH_THROTTLE_LIMITS:
+        checks.append((f"{action}:user:{username.lower()}", *AUTH_THROTTLE_LIMITS[f"{action}_username"]))
+
+    try:
+        retry_after = get_bucket_store().take_all(checks)
+    except Exception as e:
+        # Never lock users out because the throttle backend is down
+        logger.error(f"Auth throttle check failed for {action}: {e}")
+        return
+
+    if retry_after > 0:
+        logger.warning(f"Throttled {action} request from {client_ip}, retry in {retry_after:.1f}s")
+        raise HTTPException(
+            status_code=429,
+            detail="Too many attempts. Please try again later.",
+            headers={"Retry-After": str(math.ceil(retry_after))}
+        )
@@ -15,14 +15,15 @@ from api.routes import router as api_router
 from api.auth import router as auth_router
 
 # Import initialization functions
-from services.huggingface_service import init_huggingface
 from services.langchain_service import setup_langchain_components
-from services.langgraph_service import (
-    setup_langgraph_components, 
-    test_youtube_api, 
-    test_youtube_oembed
-)
-from services.search_service import test_google_api
+from services.langgraph_service import setup_langgraph_components
+from services.http_client import close_http_clients
+from services.search_cache import close_search_cache
+from services.youtube_client import init_youtube_client, close_youtube_client
+from services.download_jobs import shutdown_download_jobs
+from services.html_player import start_player_cleanup, stop_player_cleanup
+from services.status_service import start_health_prober, stop_health_prober, start_warmup, stop_warmup
+from services.password_service import init_password_pool, shutdown_password_pool
 from database.connection import init_database
 
 # Setup logging
@@ -54,18 +55,11 @@ async def startup_event():
     logger.info("Initializing database connection...")
     init_database()
 
-    # Initialize HuggingFace model
-    logger.info("Loading HuggingFace model...")
-    init_huggingface()
-
-    # Test Google API setup
-    logger.info("Testing Google API setup...")
-    if test_google_api():
-        logger.info("✅ Google API setup verified successfully")
-    else:
-        logger.error("❌ Google API setup verification failed - search functionality may not work")
+    # Start the password hashing process pool
+    logger.info("Starting password hashing pool...")
+    init_password_pool()
 
-    # Setup LangChain components
+    # Build the LangChain and LangGraph clients and agents (no network I/O)
     logger.info(f"Setting up LangChain with Google Gemini model: {LANGCHAIN_MODEL}")
     bullseye_llm, search_agent = setup_langchain_components()
     if bullseye_llm:
@@ -78,7 +72,6 @@ async def startup_event():
     else:
         logger.warning("⚠️ LangChain search agent initialization failed")
         
-    # Setup LangGraph components
     logger.info(f"Setting up LangGraph with Google Gemini model: {LANGGRAPH_MODEL}")
     gemini_llm, langgraph_agent = setup_langgraph_components(LANGGRAPH_MODEL)
     if gemini_llm:
@@ -90,26 +83,28 @@ async def startup_event():
         logger.info("✅ LangGraph agent initialized successfully")
     else:
         logger.warning("⚠️ LangGraph agent initialization failed")
-    
-    # YouTube API testing
+
+    # Build the shared YouTube Data API client (bundled discovery document, no network I/O)
     if YOUTUBE_API_ENABLED:
-        logger.info("Testing YouTube API connectivity...")
-        youtube_api_working = test_youtube_api()
-        if youtube_api_working:
-            logger.info("✅ YouTube API connection successful")
-        else:
-            logger.warning("⚠️ YouTube API connection failed - video search functionality may not work")
-            logger.warning("   Make sure YouTube Data API v3 is enabled for your Google API key")
-        
-        logger.info("Testing YouTube oEmbed API connectivity...")
-        oembed_api_working = test_youtube_oembed()
-        if oembed_api_working:
-            logger.info("✅ YouTube oEmbed API connection successful")
-        else:
-            logger.warning("⚠️ YouTube oEmbed API connection failed - video embedding may not work")
+        try:
+            init_youtube_client()
+            logger.info("✅ YouTube API client initialized successfully")
+        except Exception as e:
+            logger.warning(f"⚠️ YouTube API client initialization failed: {e}")
     else:
         logger.info("YouTube API functionality is disabled in configuration")
-    
+
+    # Players are served from memory now; periodically expire the HTML files earlier versions left on disk
+    start_player_cleanup()
+
+    # Load the HuggingFace model, test the LLMs and take the first health snapshot in
+    # the background so the server starts listening immediately; progress is reported
+    # by get_readiness()
+    start_warmup()
+
+    # Keep the health snapshot fresh in the background
+    start_health_prober()
+
     # Display debug configuration
     if DEBUG_MODE:
         logger.info("🔍 Debug mode is enabled")
@@ -119,6 +114,20 @@ async def startup_event():
     logger.info("Bulls AI API initialization complete ✨")
 
 
+@app.on_event("shutdown")
+async def shutdown_event():
+    """Releases background resources when the application stops"""
+    logger.info("Shutting down Bulls AI API...")
+    await stop_warmup()
+    await stop_health_prober()
+    await stop_player_cleanup()
+    shutdown_password_pool()
+    shutdown_download_jobs()
+    await close_http_clients()
+    close_search_cache()
+    close_youtube_client()
+
+
 if __name__ == "__main__":
     # Add a small delay for logs to display cleanly
     time.sleep(0.1)
@@ -0,0 +1,160 @@
+"""
+Agent concurrency benchmark.
+
+Runs N concurrent LangGraph chat requests through generate_langgraph_response
+on one event loop, using the real create_react_agent graph and the real
+google_multi_search tool. Only the chat model is scripted: each session asks
+for one multi-query search, then answers, and every model call takes a fixed
+time (standing in for Gemini). The searches go over HTTP to the local Google
+stand-in server (benchmarks/google_stub_server.py), started in-process.
+
+Compares the old path, where the graph's sync invoke ran inside the async
+handler, with the current ainvoke path, and reports wall time and per-session
+latency. With invoke the sessions serialize; with ainvoke they overlap.
+
+Run from the project root:
+    python -m benchmarks.agent_concurrency --sessions 20 --model-latency 0.5 --search-latency 300
+"""
+import argparse
+import asyncio
+import os
+import statistics
+import sys
+import threading
+import time
+import uuid
+from http.server import ThreadingHTTPServer
+from pathlib import Path
+from typing import Any, List, Optional
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from benchmarks.google_stub_server import LatencyModel, StubState, make_handler
+
+
+def start_stub_server(search_latency_ms: float) -> ThreadingHTTPServer:
+    """Serve the Google stand-in on a free local port and point the backend at it"""
+    handler = make_handler(StubState(0), LatencyModel(f"fixed:{search_latency_ms}"), 0.0, 503)
+    server = ThreadingHTTPServer(("127.0.0.1", 0), handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+
+    base_url = f"http://127.0.0.1:{server.server_port}"
+    os.environ["GOOGLE_CSE_URL"] = f"{base_url}/customsearch/v1"
+    os.environ["YOUTUBE_API_BASE_URL"] = f"{base_url}/"
+    os.environ["YOUTUBE_OEMBED_URL"] = f"{base_url}/oembed"
+    os.environ.setdefault("GOOGLE_API_KEY", "benchmark-key")
+    os.environ.setdefault("GOOGLE_CSE_ID", "benchmark-cse")
+    # Every session must reach the stand-in server, not the search cache
+    os.environ["SEARCH_CACHE_ENABLED"] = "false"
+    return server
+
+
+def build_model(model_latency: float):
+    """Chat model that scripts one google_multi_search call per question"""
+    from langchain_core.language_models.chat_models import BaseChatModel
+    from langchain_core.messages import AIMessage, BaseMessage, HumanMessage
+    from langchain_core.outputs import ChatGeneration, ChatResult
+
+    class ScriptedChatModel(BaseChatModel):
+        latency: float
+
+        @property
+        def _llm_type(self) -> str:
+            return "scripted"
+
+        def bind_tools(self, tools, **kwargs):
+            return self
+
+        def _reply(self, messages: List[BaseMessage]) -> ChatResult:
+            last = messages[-1]
+            if isinstance(last, HumanMessage):
+                message = AIMessage(content="", tool_calls=[{
+                    "name": "google_multi_search",
+                    "args": {"queries": [last.content, f"{last.content} overview"]},
+                    "id": uuid.uuid4().hex,
+                }])
+            else:
+                message = AIMessage(content=f"Answer based on {len(last.content)} chars of search results")
+            return ChatResult(generations=[ChatGeneration(message=message)])
+
+        def _generate(self, messages, stop: Optional[List[str]] = None, run_manager=None, **kwargs: Any) -> ChatResult:
+            time.sleep(self.latency)
+            return self._reply(messages)
+
+        async def _agenerate(self, messages, stop: Optional[List[str]] = None, run_manager=None, **kwargs: Any) -> ChatResult:
+            await asyncio.sleep(self.latency)
+            return self._reply(messages)
+
+    return ScriptedChatModel(latency=model_latency)
+
+
+class SyncInvokeAgent:
+    """The old behaviour: the graph's sync invoke runs inside the async handler"""
+
+    def __init__(self, graph):
+        self.graph = graph
+
+    async def ainvoke(self, inputs, config=None):
+        return self.graph.invoke(inputs, config)
+
+
+async def run_sessions(langgraph_service, agent, sessions: int):
+    langgraph_service.langgraph_agent = agent
+    langgraph_service.langgraph_comprehensive_agent = agent
+    langgraph_service.gemini_llm = object()
+
+    # Latency is measured from the moment all sessions were submitted, as a user would see it
+    async def session(i: int) -> float:
+        await langgraph_service.generate_langgraph_response(f"question {i}", comprehensive=False)
+        return time.perf_counter() - start
+
+    start = time.perf_counter()
+    latencies = await asyncio.gather(*(session(i) for i in range(sessions)))
+    return time.perf_counter() - start, sorted(latencies)
+
+
+def report(name: str, sessions: int, wall: float, latencies: List[float]):
+    p95 = latencies[max(0, int(len(latencies) * 0.95) - 1)]
+    print(
+        f"{name:22s} {wall:6.2f}s  {sessions / wall:6.2f} sessions/s  "
+        f"p50 {statistics.median(latencies):5.2f}s  p95 {p95:5.2f}s"
+    )
+
+
+async def main(sessions: int, model_latency: float, search_latency_ms: float):
+    server = start_stub_server(search_latency_ms)
+
+    # Imported after the environment points at the stand-in server
+    from langgraph.prebuilt import create_react_agent
+    from services import langgraph_service
+    from services.http_client import close_http_clients
+
+    langgraph_service.debug_mode = False
+    graph = create_react_agent(build_model(model_latency), [langgraph_service.google_multi_search])
+
+    try:
+        # One warm-up session so connection setup is not measured
+        await run_sessions(langgraph_service, graph, 1)
+
+        blocking = await run_sessions(langgraph_service, SyncInvokeAgent(graph), sessions)
+        concurrent = await run_sessions(langgraph_service, graph, sessions)
+    finally:
+        await close_http_clients()
+        server.shutdown()
+
+    single = 2 * model_latency + search_latency_ms / 1000
+    print(
+        f"{sessions} sessions, 2 model calls x {model_latency * 1000:.0f} ms + 2 searches x "
+        f"{search_latency_ms:.0f} ms in parallel (single session: ~{single:.2f}s)"
+    )
+    report("invoke  (blocking)", sessions, *blocking)
+    report("ainvoke (concurrent)", sessions, *concurrent)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark concurrent agent sessions on one worker")
+    parser.add_argument("--sessions", type=int, default=20)
+    parser.add_argument("--model-latency", type=float, default=0.5, help="Seconds per scripted model call")
+    parser.add_argument("--search-latency", type=float, default=300, help="Milliseconds per stand-in search")
+    args = parser.parse_args()
+    asyncio.run(main(args.sessions, args.model_latency, args.search_latency))
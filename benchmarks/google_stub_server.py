@@ -0,0 +1,296 @@
+"""
+Local stand-in for the Google APIs used by the backend, for offline load testing.
+
+Serves:
+    GET /customsearch/v1        Custom Search JSON API
+    GET /youtube/v3/search      YouTube Data API v3 search.list
+    GET /youtube/v3/videos      YouTube Data API v3 videos.list
+    GET /oembed                 YouTube oEmbed
+    GET /_stats                 Request and quota counters
+    POST /_reset                Reset counters
+
+Point the backend at it with environment variables:
+    GOOGLE_CSE_URL=http://127.0.0.1:8765/customsearch/v1
+    YOUTUBE_API_BASE_URL=http://127.0.0.1:8765/
+    YOUTUBE_OEMBED_URL=http://127.0.0.1:8765/oembed
+
+Run from the project root:
+    python -m benchmarks.google_stub_server --latency lognormal:300,0.4 --error-rate 0.02
+"""
+import argparse
+import base64
+import hashlib
+import json
+import random
+import threading
+import time
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse, parse_qs
+
+# Quota cost per call, as charged by the real APIs
+QUOTA_COSTS = {
+    "customsearch": 1,
+    "youtube.search": 100,
+    "youtube.videos": 1,
+    "oembed": 0,
+}
+
+
+class LatencyModel:
+    """Samples artificial response latency from a configured distribution"""
+
+    def __init__(self, spec: str):
+        kind, _, args = spec.partition(":")
+        self.kind = kind
+        self.args = [float(a) for a in args.split(",") if a]
+
+    def sample(self) -> float:
+        """Return a latency in seconds"""
+        if self.kind == "fixed":
+            return self.args[0] / 1000
+        if self.kind == "uniform":
+            return random.uniform(self.args[0], self.args[1]) / 1000
+        if self.kind == "lognormal":
+            # args: median in ms, sigma
+            median, sigma = self.args
+            return random.lognormvariate(0, sigma) * median / 1000
+        return 0.0
+
+
+class StubState:
+    """Counters shared between request threads"""
+
+    def __init__(self, quota: int):
+        self.lock = threading.Lock()
+        self.quota = quota
+        self.requests = Counter()
+        self.errors = Counter()
+        self.quota_used = 0
+
+    def charge(self, api: str) -> bool:
+        """Count a request and charge its quota; returns False once the quota is exhausted"""
+        with self.lock:
+            self.requests[api] += 1
+            cost = QUOTA_COSTS.get(api, 0)
+            if self.quota and self.quota_used + cost > self.quota:
+                self.errors["quotaExceeded"] += 1
+                return False
+            self.quota_used += cost
+            return True
+
+    def snapshot(self) -> dict:
+        with self.lock:
+            return {
+                "requests": dict(self.requests),
+                "errors": dict(self.errors),
+                "quota_used": self.quota_used,
+                "quota_limit": self.quota or None,
+            }
+
+    def reset(self):
+        with self.lock:
+            self.requests.clear()
+            self.errors.clear()
+            self.quota_used = 0
+
+
+def _digest(*parts) -> bytes:
+    return hashlib.sha256("|".join(str(p) for p in parts).encode()).digest()
+
+
+def fake_video_id(query: str, index: int) -> str:
+    """Deterministic 11-character video ID"""
+    return base64.urlsafe_b64encode(_digest(query, index)).decode()[:11]
+
+
+def customsearch_response(query: str, num: int, start: int) -> dict:
+    slug = "-".join(query.lower().split())[:40] or "empty"
+    items = []
+    for i in range(start, start + num):
+        items.append({
+            "kind": "customsearch#result",
+            "title": f"{query.title()} - result {i}",
+            "link": f"https://example{i % 7}.com/{slug}/{i}",
+            "displayLink": f"example{i % 7}.com",
+            "snippet": f"Result {i} about {query}. Synthetic snippet text from the local stand-in server.",
+            "pagemap": {},
+        })
+    return {
+        "kind": "customsearch#search",
+        "searchInformation": {"searchTime": 0.1, "totalResults": "1000"},
+        "items": items,
+    }
+
+
+def video_snippet(video_id: str, title: str) -> dict:
+    return {
+        "publishedAt": "2023-01-01T00:00:00Z",
+        "channelId": f"UC{video_id}",
+        "title": title,
+        "description": f"Synthetic description for {title}.",
+        "channelTitle": f"Channel {video_id[:4]}",
+        "thumbnails": {
+            size: {"url": f"https://i.ytimg.com/vi/{video_id}/{size}.jpg"}
+            for size in ("default", "medium", "high")
+        },
+    }
+
+
+def youtube_search_response(query: str, max_results: int, page_token: str) -> dict:
+    page = int(page_token) if page_token.isdigit() else 0
+    items = []
+    for i in range(page * max_results, (page + 1) * max_results):
+        video_id = fake_video_id(query, i)
+        items.append({
+            "kind": "youtube#searchResult",
+            "id": {"kind": "youtube#video", "videoId": video_id},
+            "snippet": video_snippet(video_id, f"{query.title()} video {i}"),
+        })
+    response = {
+        "kind": "youtube#searchListResponse",
+        "nextPageToken": str(page + 1),
+        "pageInfo": {"totalResults": 1000, "resultsPerPage": max_results},
+        "items": items,
+    }
+    if page:
+        response["prevPageToken"] = str(page - 1)
+    return response
+
+
+def youtube_videos_response(ids: list, parts: list) -> dict:
+    items = []
+    for video_id in ids:
+        seed = int.from_bytes(_digest(video_id)[:4], "big")
+        item = {"kind": "youtube#video", "id": video_id}
+        if "snippet" in parts:
+            item["snippet"] = video_snippet(video_id, f"Video {video_id}")
+        if "contentDetails" in parts:
+            item["contentDetails"] = {
+                "duration": f"PT{seed % 20}M{seed % 60}S",
+                "definition": "hd" if seed % 3 else "sd",
+                "dimension": "2d",
+            }
+        if "statistics" in parts:
+            item["statistics"] = {
+                "viewCount": str(seed % 10_000_000),
+                "likeCount": str(seed % 100_000),
+                "commentCount": str(seed % 5_000),
+            }
+        items.append(item)
+    return {"kind": "youtube#videoListResponse", "items": items}
+
+
+def oembed_response(url: str) -> dict:
+    video_id = parse_qs(urlparse(url).query).get("v", ["unknown"])[0]
+    return {
+        "type": "video",
+        "version": "1.0",
+        "title": f"Video {video_id}",
+        "author_name": f"Channel {video_id[:4]}",
+        "provider_name": "YouTube",
+        "thumbnail_url": f"https://i.ytimg.com/vi/{video_id}/hqdefault.jpg",
+        "html": f'<iframe width="200" height="113" src="https://www.youtube.com/embed/{video_id}?feature=oembed" allowfullscreen></iframe>',
+    }
+
+
+def make_handler(state: StubState, latency: LatencyModel, error_rate: float, error_status: int):
+    class StubHandler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"  # Keep-alive, like the real endpoints
+
+        def log_message(self, format, *args):
+            pass
+
+        def _send_json(self, status: int, body: dict):
+            payload = json.dumps(body).encode()
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json; charset=UTF-8")
+            self.send_header("Content-Length", str(len(payload)))
+            self.end_headers()
+            self.wfile.write(payload)
+
+        def _error(self, status: int, reason: str, message: str):
+            self._send_json(status, {"error": {"code": status, "message": message, "errors": [{"reason": reason}]}})
+
+        def do_POST(self):
+            if urlparse(self.path).path == "/_reset":
+                state.reset()
+                self._send_json(200, {"reset": True})
+            else:
+                self._error(404, "notFound", "Not found")
+
+        def do_GET(self):
+            parsed = urlparse(self.path)
+            params = {k: v[0] for k, v in parse_qs(parsed.query).items()}
+            routes = {
+                "/customsearch/v1": "customsearch",
+                "/youtube/v3/search": "youtube.search",
+                "/youtube/v3/videos": "youtube.videos",
+                "/oembed": "oembed",
+            }
+
+            if parsed.path == "/_stats":
+                self._send_json(200, state.snapshot())
+                return
+
+            api = routes.get(parsed.path)
+            if api is None:
+                self._error(404, "notFound", f"Unknown path {parsed.path}")
+                return
+
+            time.sleep(latency.sample())
+
+            if not state.charge(api):
+                self._error(403, "quotaExceeded", "The request cannot be completed because you have exceeded your quota.")
+                return
+
+            if random.random() < error_rate:
+                with state.lock:
+                    state.errors[f"injected_{error_status}"] += 1
+                self._error(error_status, "backendError", "Injected error from the local stand-in server")
+                return
+
+            if api == "customsearch":
+                num = min(int(params.get("num", 10)), 10)
+                body = customsearch_response(params.get("q", ""), num, int(params.get("start", 1)))
+            elif api == "youtube.search":
+                body = youtube_search_response(
+                    params.get("q", ""), min(int(params.get("maxResults", 5)), 50), params.get("pageToken", "")
+                )
+            elif api == "youtube.videos":
+                ids = [i for i in params.get("id", "").split(",") if i][:50]
+                body = youtube_videos_response(ids, params.get("part", "snippet").split(","))
+            else:
+                body = oembed_response(params.get("url", ""))
+
+            self._send_json(200, body)
+
+    return StubHandler
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Local stand-in for Google Custom Search, YouTube Data v3 and oEmbed")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--latency", default="lognormal:300,0.4",
+                        help="fixed:MS | uniform:MIN_MS,MAX_MS | lognormal:MEDIAN_MS,SIGMA")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Fraction of requests that fail")
+    parser.add_argument("--error-status", type=int, default=503, help="Status code for injected errors")
+    parser.add_argument("--quota", type=int, default=0, help="Quota units before quotaExceeded (0 = unlimited)")
+    args = parser.parse_args()
+
+    state = StubState(args.quota)
+    handler = make_handler(state, LatencyModel(args.latency), args.error_rate, args.error_status)
+    server = ThreadingHTTPServer((args.host, args.port), handler)
+    print(f"Google API stand-in listening on http://{args.host}:{args.port} (latency={args.latency}, "
+          f"error_rate={args.error_rate}, quota={args.quota or 'unlimited'})")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,91 @@
+"""
+Login storm benchmark.
+
+Fires a burst of concurrent password verifications (what /token does) while a
+fake chat stream emits a token every 10 ms, and reports login throughput and
+chat stream latency for inline hashing versus the password hashing pool.
+
+Run from the project root:
+    python -m benchmarks.login_storm --logins 50
+"""
+import argparse
+import asyncio
+import statistics
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from werkzeug.security import generate_password_hash, check_password_hash
+
+from services.password_service import init_password_pool, shutdown_password_pool, verify_password
+
+TICK_INTERVAL = 0.01  # Fake chat stream emits one token every 10 ms
+
+
+async def inline_verify(hashed_password: str, password: str) -> bool:
+    """The old behaviour: verify directly inside the async handler"""
+    return check_password_hash(hashed_password, password)
+
+
+async def chat_stream(stop: asyncio.Event, gaps: list):
+    """Emit fake tokens and record how late each one arrives"""
+    last = time.perf_counter()
+    while not stop.is_set():
+        await asyncio.sleep(TICK_INTERVAL)
+        now = time.perf_counter()
+        gaps.append(now - last - TICK_INTERVAL)
+        last = now
+
+
+async def run_storm(verify, hashed_password: str, logins: int) -> dict:
+    """Run one login storm with the given verify function"""
+    stop = asyncio.Event()
+    gaps = []
+    stream = asyncio.create_task(chat_stream(stop, gaps))
+    await asyncio.sleep(0.05)
+
+    start = time.perf_counter()
+    results = await asyncio.gather(*(verify(hashed_password, "secret") for _ in range(logins)))
+    elapsed = time.perf_counter() - start
+
+    stop.set()
+    await stream
+
+    gaps.sort()
+    return {
+        "ok": all(results),
+        "elapsed": elapsed,
+        "logins_per_sec": logins / elapsed,
+        "chat_p50_ms": statistics.median(gaps) * 1000 if gaps else 0.0,
+        "chat_p99_ms": gaps[int(len(gaps) * 0.99) - 1] * 1000 if gaps else 0.0,
+        "chat_max_ms": gaps[-1] * 1000 if gaps else 0.0,
+    }
+
+
+def print_result(name: str, result: dict):
+    print(
+        f"{name:<8} logins/s={result['logins_per_sec']:7.1f}  total={result['elapsed']:6.2f}s  "
+        f"chat lag p50={result['chat_p50_ms']:7.1f}ms p99={result['chat_p99_ms']:7.1f}ms "
+        f"max={result['chat_max_ms']:7.1f}ms  ok={result['ok']}"
+    )
+
+
+async def main(logins: int):
+    hashed_password = generate_password_hash("secret")
+
+    print_result("inline", await run_storm(inline_verify, hashed_password, logins))
+
+    init_password_pool()
+    # Warm the worker processes so start-up cost is not counted
+    await verify_password(hashed_password, "secret")
+    print_result("pool", await run_storm(verify_password, hashed_password, logins))
+    shutdown_password_pool()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark login throughput and chat latency during a login storm")
+    parser.add_argument("--logins", type=int, default=50, help="Number of concurrent logins")
+    args = parser.parse_args()
+    asyncio.run(main(args.logins))
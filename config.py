@@ -26,6 +26,16 @@ HUGGINGFACE_MODEL = "gpt2"  # HuggingFace often requires specific model names
 LANGCHAIN_MODEL = "gemini-1.5-pro"
 LANGCHAIN_FRONTEND_MODEL = "google-gemini"  # Frontend identifier for Langchain
 
+# Per-user LangChain agent memory (sliding window bounded by tokens)
+LANGCHAIN_MEMORY_TOKEN_BUDGET = 2000  # Approximate tokens of chat history sent per request
+LANGCHAIN_MEMORY_MAX_SESSIONS = 1000  # Sessions kept in memory before LRU eviction
+LANGCHAIN_MEMORY_IDLE_TTL = 60 * 60  # Seconds before an idle session is dropped
+LANGCHAIN_MEMORY_PERSIST = False  # Store turns in the agent_memory table so history survives restarts
+
+# Pool of LangChain agent instances so concurrent requests never share one agent
+LANGCHAIN_AGENT_POOL_SIZE = 8  # Maximum agent instances per agent type
+LANGCHAIN_AGENT_POOL_IDLE_TIMEOUT = 300  # Seconds before an idle extra instance is dropped
+
 # Default model for LangGraph integrations
 # User requested to keep this as gemini-1.5-pro
 LANGGRAPH_MODEL = "gemini-1.5-pro"
@@ -120,12 +130,56 @@ VALID_GROQ_MODELS = [
 # IMPORTANT: Periodically verify this list against Groq's official API or documentation.
 
 
+# --- Google Custom Search Configuration ---
+# The base URLs can be pointed at benchmarks/google_stub_server.py for offline load testing
+GOOGLE_CSE_URL = os.getenv("GOOGLE_CSE_URL", "https://www.googleapis.com/customsearch/v1")
+
+# Search result cache (shared by LangChain, LangGraph and the /test-* endpoints)
+SEARCH_CACHE_ENABLED = os.getenv("SEARCH_CACHE_ENABLED", "true").lower() in ("1", "true", "yes")
+SEARCH_CACHE_MAX_ENTRIES = 1000  # In-memory LRU size
+SEARCH_CACHE_TTL = 15 * 60  # Seconds a result stays in memory
+# Optional on-disk SQLite tier that survives restarts; opened on first use (set to an empty string to disable)
+SEARCH_CACHE_SQLITE_PATH = os.getenv("SEARCH_CACHE_SQLITE_PATH", "./storage/cache/search_cache.sqlite3") or None
+SEARCH_CACHE_SQLITE_TTL = 6 * 60 * 60  # Seconds a result stays on disk
+
+# Relevance ranking of search snippets before they are added to prompts
+SEARCH_CANDIDATE_COUNT = 10  # Results fetched per query and ranked (Custom Search maximum is 10)
+SEARCH_SNIPPET_TOKEN_BUDGET = 600  # Approximate tokens of search results sent to the LLM
+
+# Maximum number of concurrent searches per multi_search call
+SEARCH_MAX_CONCURRENCY = 4
+
+
+# --- Outbound HTTP Configuration ---
+# Shared keep-alive HTTP clients used for Google Custom Search and oEmbed requests
+HTTP_CONNECT_TIMEOUT = 3.05  # Seconds to establish a connection
+HTTP_READ_TIMEOUT = 10  # Seconds to wait for a response
+HTTP_POOL_MAXSIZE = 20  # Keep-alive connections kept per host
+HTTP_MAX_RETRIES = 3  # Retries on connection errors and retryable status codes
+HTTP_BACKOFF_FACTOR = 0.5  # Exponential backoff base in seconds (0.5, 1, 2, ...)
+HTTP_RETRY_STATUSES = (429, 500, 502, 503, 504)
+
+
 # --- YouTube API Configuration ---
 YOUTUBE_API_SERVICE_NAME = "youtube"
 YOUTUBE_API_VERSION = "v3"
 YOUTUBE_API_ENABLED = True  # Set to False to disable YouTube functionality
 YOUTUBE_MAX_RESULTS = 10  # Maximum number of YouTube search results to return
 YOUTUBE_SAFE_SEARCH = "moderate"  # Options: "none", "moderate", "strict"
+YOUTUBE_API_BASE_URL = os.getenv("YOUTUBE_API_BASE_URL")  # Override the Data API root URL (None = googleapis.com)
+YOUTUBE_OEMBED_URL = os.getenv("YOUTUBE_OEMBED_URL", "https://www.youtube.com/oembed")
+
+# YouTube video metadata cache (keyed by video ID, one TTL per videos.list part)
+YOUTUBE_METADATA_CACHE_MAX_ENTRIES = 5000  # Videos kept per part
+YOUTUBE_METADATA_TTLS = {
+    "snippet": 6 * 60 * 60,  # Titles and descriptions rarely change
+    "contentDetails": 24 * 60 * 60,  # Duration and definition are fixed after upload
+    "statistics": 10 * 60  # View and like counts move quickly
+}
+
+# pytube stream manifests (watch page + cipher parse), shared by video info and download
+YOUTUBE_STREAM_CACHE_MAX_ENTRIES = 256
+YOUTUBE_STREAM_CACHE_TTL = 5 * 60  # Short: stream URLs are signed and expire
 
 # YouTube Player Configuration
 YOUTUBE_PLAYER_WIDTH = 640  # Default width for embedded player
@@ -142,14 +196,62 @@ CHAIN_OF_THOUGHT_VISIBLE = True  # Set to True to show reasoning in responses
 PREFERRED_PLAYERS = ["mpv", "vlc", "browser"]  # Order of preference for local players
 
 # --- HTML Player Settings ---
+# Players are rendered in memory and served from /youtube/player/{video_id}
+HTML_PLAYER_CACHE_MAX_ENTRIES = 256  # Rendered pages kept, keyed by (video ID, width, height)
+HTML_PLAYER_CACHE_TTL = 60 * 60  # Seconds before a page is re-rendered (picks up title changes)
+# Earlier versions wrote youtube_player_*.html files here; a background task removes them once older than the TTL
 HTML_PLAYER_TEMP_DIR = os.path.join(os.path.expanduser("~"), "bulls_eye_temp")
-if not os.path.exists(HTML_PLAYER_TEMP_DIR):
-    try:
-        os.makedirs(HTML_PLAYER_TEMP_DIR)
-    except Exception:
-        # Fall back to system temp directory if creation fails
-        HTML_PLAYER_TEMP_DIR = None
-        logging.warning(f"Could not create temporary directory {HTML_PLAYER_TEMP_DIR}. Falling back to system temp.")
+HTML_PLAYER_LEGACY_FILE_TTL = 24 * 60 * 60
+HTML_PLAYER_CLEANUP_INTERVAL = int(os.getenv("HTML_PLAYER_CLEANUP_INTERVAL", 60 * 60))  # Seconds between cleanup passes
+
+# --- Video Downloads ---
+VIDEO_STORAGE_DIR = "./storage/videos"  # Where downloaded videos are stored
+MAX_VIDEO_SIZE_MB = 100  # Maximum size of videos to download (to avoid huge files)
+VIDEO_STORAGE_QUOTA_MB = int(os.getenv("VIDEO_STORAGE_QUOTA_MB", 5000))  # Least recently streamed videos are evicted above this
+VIDEO_DOWNLOAD_WORKERS = int(os.getenv("VIDEO_DOWNLOAD_WORKERS", 2))  # Downloads running at once
+VIDEO_DOWNLOAD_MAX_PENDING = 20  # Jobs queued or running before new ones are rejected
+DOWNLOAD_JOB_TTL = 60 * 60  # Seconds a finished job stays queryable
+DOWNLOAD_JOB_EVENT_INTERVAL = 0.5  # Seconds between progress checks on the SSE stream
+YOUTUBE_DOWNLOAD_TOOL_WAIT = 60  # Seconds the agent tool waits for a download before replying with its job ID
+VIDEO_STREAM_CACHE_CONTROL = "private, max-age=3600"  # Browsers revalidate with If-None-Match after this
+
+# Optional post-download stage: remux to a faststart MP4 and HLS segments with a local ffmpeg.
+# Skipped (the plain MP4 is served) when ffmpeg is not installed.
+HLS_ENABLED = True
+FFMPEG_PATH = os.getenv("FFMPEG_PATH", "ffmpeg")  # Binary name on PATH or absolute path
+FFMPEG_TIMEOUT = 300  # Seconds before a remux is abandoned
+HLS_SEGMENT_SECONDS = 4  # Target segment length; segments are cut at keyframes
+HLS_SEGMENT_CACHE_CONTROL = "private, max-age=31536000, immutable"  # Segment names never get new content
+
+
+# --- Authentication Configuration ---
+# Password hashing (PBKDF2) is CPU-bound, so it runs on a dedicated process pool
+# instead of blocking the event loop during login and registration.
+PASSWORD_HASH_WORKERS = int(os.getenv("PASSWORD_HASH_WORKERS", min(4, os.cpu_count() or 1)))
+PASSWORD_HASH_MAX_PENDING = 64  # Maximum hash jobs queued or running at once
+
+# Token-bucket throttling for /token and /register, checked before any hashing or DB lookup.
+# Each limit is (burst capacity, seconds to refill an empty bucket).
+AUTH_THROTTLE_ENABLED = True
+AUTH_THROTTLE_LIMITS = {
+    "login_ip": (20, 60),          # 20 login attempts per minute per IP
+    "login_username": (5, 60),     # 5 login attempts per minute per username
+    "register_ip": (5, 3600),      # 5 registrations per hour per IP
+}
+# Optional shared backend so limits hold across workers (requires the redis package)
+AUTH_THROTTLE_REDIS_URL = os.getenv("AUTH_THROTTLE_REDIS_URL")
+
+
+# --- Health Probing ---
+HEALTH_PROBE_INTERVAL = int(os.getenv("HEALTH_PROBE_INTERVAL", 60))  # Seconds between background health snapshot refreshes
+# A live Custom Search query is billable, so the prober normally only checks the configuration
+# and the outcome of the last real search. Set this to probe with a real query at most every N seconds.
+HEALTH_SEARCH_PROBE_INTERVAL = int(os.getenv("HEALTH_SEARCH_PROBE_INTERVAL", 0))  # 0 = never
+# A search that failed on credentials or quota marks Google Search as down for this long;
+# transient failures (5xx, timeouts, one bad query) never do
+SEARCH_FAILURE_TTL = int(os.getenv("SEARCH_FAILURE_TTL", 300))
+HEALTH_STALE_AFTER = int(os.getenv("HEALTH_STALE_AFTER", HEALTH_PROBE_INTERVAL * 3))  # Snapshot age after which /health/ready fails
+WARMUP_TIMEOUT = int(os.getenv("WARMUP_TIMEOUT", 120))  # Seconds a startup component may take to warm up before it is marked failed
 
 
 # --- Database Configuration ---
@@ -222,7 +222,7 @@ def get_video_by_id(video_id: int, user_id: int) -> Optional[Dict[str, Any]]:
         Optional[Dict]: Video data or None
     """
     query = """
-        SELECT id, video_id, title, channel, type, filepath, thumbnail_url, embed_html, created_at
+        SELECT id, video_id, title, channel, type, filepath, thumbnail_url, embed_html, created_at, evicted_at
         FROM videos 
         WHERE id = %s AND user_id = %s
     """
@@ -240,7 +240,8 @@ def get_video_by_id(video_id: int, user_id: int) -> Optional[Dict[str, Any]]:
         "filepath": result[5],
         "thumbnail": result[6],
         "embed_html": result[7],
-        "created_at": result[8]
+        "created_at": result[8],
+        "evicted_at": result[9]
     }
 
 
@@ -298,6 +299,110 @@ def link_video_to_conversation(conversation_id: int, video_db_id: int) -> bool:
     return execute_query(query, (video_db_id, conversation_id))
 
 
+def get_downloaded_video_by_filepath(filepath: str) -> Optional[Dict[str, Any]]:
+    """
+    Get the metadata of any downloaded video row pointing at a stored file
+    
+    Args:
+        filepath: Path of the stored video file
+        
+    Returns:
+        Optional[Dict]: Video data (video_id, title, channel, thumbnail) or None
+    """
+    query = """
+        SELECT video_id, title, channel, thumbnail_url
+        FROM videos
+        WHERE type = 'downloaded' AND filepath = %s
+        ORDER BY id DESC
+        LIMIT 1
+    """
+    
+    result = fetch_one(query, (filepath,))
+    if not result:
+        return None
+    
+    return {
+        "video_id": result[0],
+        "title": result[1],
+        "channel": result[2],
+        "thumbnail": result[3]
+    }
+
+
+def get_user_downloaded_video(user_id: int, filepath: str) -> Optional[Tuple[int, Optional[int]]]:
+    """
+    Find the user's video row for a stored file and the conversation linked to it
+    
+    Args:
+        user_id: The user ID
+        filepath: Path of the stored video file
+        
+    Returns:
+        Optional[Tuple[int, Optional[int]]]: (video database ID, conversation ID) or None
+    """
+    query = """
+        SELECT v.id, c.id
+        FROM videos v
+        LEFT JOIN conversations c ON c.video_id = v.id AND c.user_id = v.user_id
+        WHERE v.user_id = %s AND v.type = 'downloaded' AND v.filepath = %s
+        ORDER BY v.id DESC, c.id DESC
+        LIMIT 1
+    """
+    result = fetch_one(query, (user_id, filepath))
+    return (result[0], result[1]) if result else None
+
+
+def count_video_file_references(filepaths: List[str]) -> Dict[str, int]:
+    """
+    Count the video rows (across all users) that reference each of several stored files
+    
+    Args:
+        filepaths: Paths of the stored video files
+        
+    Returns:
+        Dict[str, int]: Number of referencing rows per path (0 for unreferenced files)
+    """
+    counts = {filepath: 0 for filepath in filepaths}
+    if not filepaths:
+        return counts
+    placeholders = ", ".join(["%s"] * len(filepaths))
+    query = (
+        "SELECT filepath, COUNT(*) FROM videos "
+        f"WHERE type = 'downloaded' AND filepath IN ({placeholders}) GROUP BY filepath"
+    )
+    for filepath, count in fetch_all(query, tuple(filepaths)):
+        counts[filepath] = count
+    return counts
+
+
+def mark_video_file_evicted(filepath: str) -> bool:
+    """
+    Mark every video row that references a stored file as evicted (re-downloadable)
+    
+    Args:
+        filepath: Path of the evicted video file
+        
+    Returns:
+        bool: True if successful
+    """
+    query = "UPDATE videos SET evicted_at = CURRENT_TIMESTAMP WHERE type = 'downloaded' AND filepath = %s"
+    return execute_query(query, (filepath,))
+
+
+def mark_video_file_restored(filepath: str) -> bool:
+    """
+    Clear the evicted mark of every video row that references a stored file
+    
+    Args:
+        filepath: Path of the re-downloaded video file
+        
+    Returns:
+        bool: True if successful
+    """
+    query = "UPDATE videos SET evicted_at = NULL WHERE type = 'downloaded' AND filepath = %s AND evicted_at IS NOT NULL"
+    return execute_query(query, (filepath,))
+
+
 def get_conversations_with_videos(user_id: int, limit: int = 50, offset: int = 0) -> List[Dict[str, Any]]:
     """
     Get conversations with associated videos
@@ -347,3 +452,42 @@ def get_conversations_with_videos(user_id: int, limit: int = 50, offset: int = 0
         conversations.append(conv)
         
     return conversations
+
+
+def save_memory_turn(user_id: int, human_message: str, ai_message: str) -> bool:
+    """
+    Persist one LangChain agent memory turn
+    
+    Args:
+        user_id: The user ID
+        human_message: The user's message
+        ai_message: The agent's answer
+        
+    Returns:
+        bool: True if successful
+    """
+    query = "INSERT INTO agent_memory (user_id, human_message, ai_message) VALUES (%s, %s, %s)"
+    return execute_query(query, (user_id, human_message, ai_message))
+
+
+def get_recent_memory_turns(user_id: int, limit: int = 20) -> List[Tuple[str, str]]:
+    """
+    Get a user's most recent LangChain agent memory turns, oldest first
+    
+    Args:
+        user_id: The user ID
+        limit: Maximum number of turns to return
+        
+    Returns:
+        List[Tuple]: (human_message, ai_message) pairs
+    """
+    query = """
+        SELECT human_message, ai_message
+        FROM agent_memory
+        WHERE user_id = %s
+        ORDER BY id DESC
+        LIMIT %s
+    """
+    
+    results = fetch_all(query, (user_id, limit))
+    return [(result[0], result[1]) for result in reversed(results)]
@@ -43,12 +43,27 @@ CREATE TABLE IF NOT EXISTS videos (
     thumbnail_url VARCHAR(512),
     embed_html TEXT,
     created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    evicted_at TIMESTAMP NULL DEFAULT NULL,
+    INDEX idx_videos_filepath (filepath),
+    FOREIGN KEY (user_id) REFERENCES users(id) ON DELETE CASCADE
+)
+"""
+
+# LangChain agent memory table definition (one row per human/AI turn)
+AGENT_MEMORY_TABLE = """
+CREATE TABLE IF NOT EXISTS agent_memory (
+    id INT AUTO_INCREMENT PRIMARY KEY,
+    user_id INT NOT NULL,
+    human_message TEXT NOT NULL,
+    ai_message MEDIUMTEXT NOT NULL,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    INDEX idx_agent_memory_user (user_id, id),
     FOREIGN KEY (user_id) REFERENCES users(id) ON DELETE CASCADE
 )
 """
 
 # List of all table creation statements
-TABLES = [USERS_TABLE, CONVERSATIONS_TABLE, VIDEOS_TABLE]
+TABLES = [USERS_TABLE, CONVERSATIONS_TABLE, VIDEOS_TABLE, AGENT_MEMORY_TABLE]
 
 # Table column checks
 TABLE_COLUMNS = {
@@ -60,6 +75,7 @@ TABLE_COLUMNS = {
         {"name": "video_id", "query": "ALTER TABLE conversations ADD COLUMN video_id INT"}
     ],
     "videos": [
-        # No column checks needed as we're creating the table from scratch
+        # Set when the stored file was evicted to stay under the storage quota (re-downloadable)
+        {"name": "evicted_at", "query": "ALTER TABLE videos ADD COLUMN evicted_at TIMESTAMP NULL DEFAULT NULL"}
     ]
 }
@@ -0,0 +1,112 @@
+import asyncio
+import logging
+import time
+from contextlib import asynccontextmanager
+from typing import Any, Callable, Dict, List, Tuple
+
+
+logger = logging.getLogger(__name__)
+
+
+class AgentPool:
+    """
+    Bounded pool of agent instances with checkout/return semantics.
+
+    Agents carry per-run callback and scratchpad state, so a single instance
+    must not serve two requests at once. The pool hands each request its own
+    instance, builds new ones lazily up to max_size, makes callers wait when
+    all are busy, and drops instances that have been idle for too long.
+    """
+
+    def __init__(self, name: str, factory: Callable[[], Any], max_size: int, min_idle: int = 1, idle_timeout: float = 300):
+        """
+        Args:
+            name: Name used in logs and stats
+            factory: Builds a new agent instance (must not do network I/O)
+            max_size: Maximum number of instances in existence
+            min_idle: Idle instances kept even when past the idle timeout
+            idle_timeout: Seconds an idle instance is kept before being dropped
+        """
+        self.name = name
+        self.factory = factory
+        self.max_size = max_size
+        self.min_idle = min_idle
+        self.idle_timeout = idle_timeout
+        self._idle: List[Tuple[Any, float]] = []  # (agent, returned_at), most recent last
+        self._size = 0
+        self._waiting = 0
+        self._condition = None
+
+    def _get_condition(self) -> asyncio.Condition:
+        # Created lazily so it binds to the running event loop
+        if self._condition is None:
+            self._condition = asyncio.Condition()
+        return self._condition
+
+    def add(self, agent: Any):
+        """Seed the pool with an already built instance"""
+        self._idle.append((agent, time.monotonic()))
+        self._size += 1
+
+    def _shrink(self):
+        """Drop instances idle longer than idle_timeout, keeping min_idle"""
+        cutoff = time.monotonic() - self.idle_timeout
+        while len(self._idle) > self.min_idle and self._idle[0][1] < cutoff:
+            self._idle.pop(0)
+            self._size -= 1
+            logger.debug(f"Agent pool '{self.name}' dropped an idle instance (size: {self._size})")
+
+    async def acquire(self) -> Any:
+        """Check out an agent, building one if below max_size or waiting for a free one"""
+        condition = self._get_condition()
+        async with condition:
+            while True:
+                self._shrink()
+                if self._idle:
+                    agent, _ = self._idle.pop()
+                    return agent
+                if self._size < self.max_size:
+                    self._size += 1
+                    break
+                self._waiting += 1
+                try:
+                    await condition.wait()
+                finally:
+                    self._waiting -= 1
+
+        # Build outside the lock so other checkouts are not held up
+        try:
+            agent = await asyncio.to_thread(self.factory)
+            logger.info(f"Agent pool '{self.name}' grew to {self._size} instances")
+            return agent
+        except Exception:
+            async with condition:
+                self._size -= 1
+                condition.notify()
+            raise
+
+    async def release(self, agent: Any):
+        """Return an agent to the pool"""
+        condition = self._get_condition()
+        async with condition:
+            self._idle.append((agent, time.monotonic()))
+            condition.notify()
+
+    @asynccontextmanager
+    async def checkout(self):
+        """Context manager that checks an agent out and always returns it"""
+        agent = await self.acquire()
+        try:
+            yield agent
+        finally:
+            await self.release(agent)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "name": self.name,
+            "size": self._size,
+            "idle": len(self._idle),
+            "in_use": self._size - len(self._idle),
+            "waiting": self._waiting,
+            "max_size": self.max_size
+        }
@@ -0,0 +1,433 @@
+import logging
+import os
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from pytube import request as pytube_request
+from pytube.exceptions import RegexMatchError, VideoUnavailable
+
+from config import (
+    MAX_VIDEO_SIZE_MB,
+    VIDEO_DOWNLOAD_WORKERS,
+    VIDEO_DOWNLOAD_MAX_PENDING,
+    DOWNLOAD_JOB_TTL
+)
+from services.youtube_streams import get_stream_manifest, invalidate_stream_manifest
+from services.video_storage import (
+    stored_video_path,
+    find_stored_video,
+    lock_stored_video,
+    touch_stored_video,
+    enforce_quota
+)
+from services.hls_service import HLS_AVAILABLE, remux_faststart, ensure_hls
+
+
+logger = logging.getLogger(__name__)
+
+# Job states
+QUEUED = "queued"
+DOWNLOADING = "downloading"
+COMPLETED = "completed"
+FAILED = "failed"
+
+
+class VideoDownloadError(Exception):
+    """A download that cannot be done, with a message fit to show the user"""
+
+
+class DownloadQueueFull(Exception):
+    """Raised when too many download jobs are queued or running"""
+
+
+def stored_video_result(video_id: str, path: Path) -> Optional[Dict[str, Any]]:
+    """
+    Build a download result for a file that is already in storage, using the
+    metadata of an existing videos row that references it (no YouTube calls).
+    Returns None when no row references the file yet.
+    """
+    from database.crud import get_downloaded_video_by_filepath
+
+    video_data = get_downloaded_video_by_filepath(str(path))
+    if not video_data:
+        return None
+    touch_stored_video(path)
+    return {
+        "video_id": video_id,
+        "title": video_data["title"],
+        "author": video_data["channel"],
+        "channel": video_data["channel"],
+        "length": None,
+        "filepath": str(path),
+        "file_size_mb": f"{path.stat().st_size / (1024 * 1024):.2f}",
+        "resolution": path.stem.rsplit("_", 1)[-1],
+        "thumbnail": video_data["thumbnail"] or f"https://img.youtube.com/vi/{video_id}/hqdefault.jpg",
+        "type": "downloaded",
+        "reused": True
+    }
+
+
+def download_video_file(
+    video_id: str,
+    resolution: str = "720p",
+    on_progress: Optional[Callable[[int, int], None]] = None
+) -> Dict[str, Any]:
+    """
+    Download a progressive MP4 stream of a YouTube video into content-addressed storage.
+    If the file for (video_id, resolution, mp4) already exists it is reused; otherwise it
+    is written under a temporary name and renamed once complete. With ffmpeg available,
+    the new file is remuxed to faststart and segmented for HLS.
+
+    Args:
+        video_id: YouTube video ID
+        resolution: Desired resolution; the best available is used if it does not exist
+        on_progress: Called with (bytes_downloaded, bytes_total) after every chunk
+
+    Returns:
+        Dict: video_id, title, author, length, filepath, file_size_mb, resolution, thumbnail, type, reused
+
+    Raises:
+        VideoDownloadError: If no stream is suitable or the video is too large
+    """
+    try:
+        yt = get_stream_manifest(video_id)
+    except (RegexMatchError, VideoUnavailable):
+        raise VideoDownloadError("Error: The provided URL is not a valid YouTube video or the video is unavailable.")
+
+    stream = yt.streams.filter(progressive=True, file_extension='mp4', resolution=resolution).first()
+
+    # If requested resolution not available, get the best available
+    if not stream:
+        stream = yt.streams.filter(progressive=True, file_extension='mp4').order_by('resolution').desc().first()
+
+    if not stream:
+        raise VideoDownloadError(f"No suitable download stream found for video: {yt.title}")
+
+    # Check file size
+    total = stream.filesize
+    if total / (1024 * 1024) > MAX_VIDEO_SIZE_MB:
+        raise VideoDownloadError(
+            f"Video is too large to download ({total / (1024 * 1024):.2f} MB). Maximum size is {MAX_VIDEO_SIZE_MB} MB."
+        )
+
+    filepath = stored_video_path(video_id, stream.resolution, "mp4")
+    reused = True
+
+    with lock_stored_video(filepath):
+        if filepath.is_file():
+            touch_stored_video(filepath)
+        else:
+            reused = False
+            # Make room first; the file being written is locked and cannot be evicted.
+            # HLS segments take about as much space again as the MP4.
+            enforce_quota(incoming_bytes=total * 2 if HLS_AVAILABLE else total)
+            partial_path = filepath.with_suffix(f".{uuid.uuid4().hex[:8]}.part")
+            downloaded = 0
+            try:
+                with open(partial_path, "wb") as fh:
+                    for chunk in pytube_request.stream(stream.url):
+                        fh.write(chunk)
+                        downloaded += len(chunk)
+                        if on_progress:
+                            on_progress(downloaded, total)
+                remux_faststart(partial_path)
+                os.replace(partial_path, filepath)
+                # Rows whose copy was evicted earlier point at this file again
+                from database.crud import mark_video_file_restored
+                mark_video_file_restored(str(filepath))
+            except Exception:
+                partial_path.unlink(missing_ok=True)
+                # The cached stream URLs may have expired or been rejected; refetch next time
+                invalidate_stream_manifest(video_id)
+                raise
+
+        # Optional streaming stage; the MP4 is still served if it fails
+        ensure_hls(filepath)
+
+    return {
+        "video_id": video_id,
+        "title": yt.title,
+        "author": yt.author,
+        "channel": yt.author,
+        "length": yt.length,
+        "filepath": str(filepath),
+        "file_size_mb": f"{filepath.stat().st_size / (1024 * 1024):.2f}",
+        "resolution": stream.resolution,
+        "thumbnail": f"https://img.youtube.com/vi/{video_id}/hqdefault.jpg",
+        "type": "downloaded",
+        "reused": reused
+    }
+
+
+# Serializes the check-then-insert in record_download
+record_lock = threading.Lock()
+
+
+def record_download(user_id: int, video_data: Dict[str, Any]) -> Tuple[int, Optional[int]]:
+    """
+    Save a finished download to the user's videos and conversation history.
+    Idempotent per (user, stored file): downloading a video the user already has
+    returns the existing rows instead of adding duplicates.
+
+    Returns:
+        Tuple[int, Optional[int]]: The video database ID and the conversation ID
+    """
+    from database.crud import execute_query, save_video_to_db, link_video_to_conversation, get_user_downloaded_video
+
+    with record_lock:
+        existing = get_user_downloaded_video(user_id, video_data["filepath"])
+        if existing is not None:
+            return existing
+
+        video_db_id = save_video_to_db(user_id, video_data)
+        if not video_db_id:
+            raise RuntimeError("Failed to save video to database")
+
+        video_text = f"Downloaded YouTube video: {video_data.get('title', video_data['video_id'])}"
+        conversation_id = execute_query(
+            "INSERT INTO conversations (user_id, conversation, model, api_provider) VALUES (%s, %s, %s, %s)",
+            (user_id, video_text, "YouTube", "youtube"),
+            return_last_id=True
+        )
+        link_video_to_conversation(conversation_id, video_db_id)
+        return video_db_id, conversation_id
+
+
+class DownloadJob:
+    """State of one background video download, updated by the worker thread"""
+
+    def __init__(self, video_id: str, resolution: str, user_id: Optional[int] = None):
+        self.job_id = uuid.uuid4().hex
+        self.video_id = video_id
+        self.resolution = resolution
+        self.user_id = user_id
+        self.status = QUEUED
+        self.bytes_downloaded = 0
+        self.bytes_total = None
+        self.result: Optional[Dict[str, Any]] = None
+        self.error: Optional[str] = None
+        self.rejected = False  # True when the error is a VideoDownloadError meant for the user
+        self.video_db_id: Optional[int] = None
+        self.conversation_id: Optional[int] = None
+        self.created_at = time.time()
+        self.updated_at = self.created_at
+        self.version = 0  # Bumped on every change, so watchers can tell when to report
+        self._done = threading.Event()
+
+    def update(self, **fields):
+        for name, value in fields.items():
+            setattr(self, name, value)
+        self.updated_at = time.time()
+        self.version += 1
+        if self.status in (COMPLETED, FAILED):
+            self._done.set()
+
+    @property
+    def finished(self) -> bool:
+        return self._done.is_set()
+
+    def wait(self, timeout: Optional[float] = None) -> bool:
+        """Block until the job has finished; returns False on timeout"""
+        return self._done.wait(timeout)
+
+    def to_dict(self) -> Dict[str, Any]:
+        progress = None
+        if self.status == COMPLETED:
+            progress = 100.0
+        elif self.bytes_total:
+            progress = round(100 * self.bytes_downloaded / self.bytes_total, 1)
+        result = self.result or {}
+        return {
+            "job_id": self.job_id,
+            "video_id": self.video_id,
+            "resolution": self.resolution,
+            "status": self.status,
+            "progress": progress,
+            "bytes_downloaded": self.bytes_downloaded,
+            "bytes_total": self.bytes_total,
+            "error": self.error,
+            "video_db_id": self.video_db_id,
+            "conversation_id": self.conversation_id,
+            "title": result.get("title"),
+            "thumbnail": result.get("thumbnail"),
+            "filepath": result.get("filepath"),
+            "created_at": self.created_at,
+            "updated_at": self.updated_at
+        }
+
+
+class DownloadJobManager:
+    """
+    Runs video downloads on a bounded thread pool so HTTP requests only
+    enqueue work. Jobs for the same (video_id, resolution) share one download,
+    and a video already in storage completes immediately without a download.
+    Finished jobs stay queryable for DOWNLOAD_JOB_TTL seconds.
+    """
+
+    def __init__(self, max_workers: int, max_pending: int, job_ttl: float):
+        self.max_workers = max_workers
+        self.max_pending = max_pending
+        self.job_ttl = job_ttl
+        self.executor = None
+        self.jobs: Dict[str, DownloadJob] = {}
+        self.inflight: Dict[Tuple[str, str], List[DownloadJob]] = {}  # key -> jobs sharing one download
+        self.coalesced = 0
+        self.reused = 0
+        self._lock = threading.Lock()
+
+    def _get_executor(self) -> ThreadPoolExecutor:
+        if self.executor is None:
+            self.executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="video-download")
+        return self.executor
+
+    def _prune(self):
+        """Forget finished jobs older than the TTL (caller holds the lock)"""
+        cutoff = time.time() - self.job_ttl
+        for job_id in [j.job_id for j in self.jobs.values() if j.finished and j.updated_at < cutoff]:
+            del self.jobs[job_id]
+
+    def submit(self, video_id: str, resolution: str = "720p", user_id: Optional[int] = None) -> DownloadJob:
+        """
+        Enqueue a download and return its job immediately
+
+        Args:
+            video_id: YouTube video ID
+            resolution: Desired resolution
+            user_id: Owner of the job; when set, the video is saved to their history once downloaded
+
+        Raises:
+            DownloadQueueFull: If max_pending downloads are already queued or running
+        """
+        key = (video_id, resolution)
+        job = DownloadJob(video_id, resolution, user_id)
+
+        # The storage lookup and the job registration happen under one lock, so two
+        # concurrent submits for the same key can never both start a download
+        with self._lock:
+            self._prune()
+            group = self.inflight.get(key)
+            if group is not None:
+                # Same video and resolution already queued or downloading: share it
+                leader = group[0]
+                self.jobs[job.job_id] = job
+                group.append(job)
+                self.coalesced += 1
+                job.update(status=leader.status, bytes_downloaded=leader.bytes_downloaded, bytes_total=leader.bytes_total)
+                logger.info(f"Download job {job.job_id} joined in-progress download of {video_id} ({resolution})")
+                return job
+
+            stored = find_stored_video(video_id, resolution)
+            if stored is None and len(self.inflight) >= self.max_pending:
+                raise DownloadQueueFull(f"Too many downloads in progress ({len(self.inflight)}), try again later")
+            self.jobs[job.job_id] = job
+            self.inflight[key] = [job]
+
+        # Already in storage: only the database row is needed (jobs submitted meanwhile join the group)
+        if stored is not None:
+            try:
+                result = stored_video_result(video_id, stored)
+            except Exception as e:
+                logger.error(f"Could not reuse stored file {stored}, downloading again: {e}")
+                result = None
+            if result is not None:
+                with self._lock:
+                    group = self.inflight.pop(key, [])
+                    self.reused += len(group)
+                for member in group:
+                    self._finish(member, result)
+                logger.info(f"Download job {job.job_id} reused stored file {stored}")
+                return job
+
+        with self._lock:
+            executor = self._get_executor()
+        executor.submit(self._run, key)
+        logger.info(f"Queued download job {job.job_id} for video {video_id} ({resolution})")
+        return job
+
+    def get(self, job_id: str) -> Optional[DownloadJob]:
+        with self._lock:
+            return self.jobs.get(job_id)
+
+    def _group(self, key: Tuple[str, str]) -> List[DownloadJob]:
+        with self._lock:
+            return list(self.inflight.get(key, []))
+
+    def _update_group(self, key: Tuple[str, str], **fields):
+        for job in self._group(key):
+            job.update(**fields)
+
+    def _finish(self, job: DownloadJob, result: Dict[str, Any]):
+        """Write the job's database row (the file is already in place) and mark it completed"""
+        try:
+            video_db_id = conversation_id = None
+            if job.user_id is not None:
+                video_db_id, conversation_id = record_download(job.user_id, result)
+            job.update(status=COMPLETED, result=result, video_db_id=video_db_id, conversation_id=conversation_id)
+        except Exception as e:
+            job.update(status=FAILED, error=str(e))
+            logger.error(f"Download job {job.job_id} could not be saved: {e}")
+
+    def _run(self, key: Tuple[str, str]):
+        video_id, resolution = key
+        self._update_group(key, status=DOWNLOADING)
+        try:
+            result = download_video_file(
+                video_id,
+                resolution,
+                on_progress=lambda done, total: self._update_group(key, bytes_downloaded=done, bytes_total=total)
+            )
+            error = None
+        except VideoDownloadError as e:
+            error, rejected = str(e), True
+            logger.warning(f"Download of {video_id} ({resolution}) rejected: {e}")
+        except Exception as e:
+            error, rejected = str(e), False
+            logger.error(f"Download of {video_id} ({resolution}) failed: {e}")
+
+        # Detach the group first so new requests see the stored file instead of joining
+        with self._lock:
+            group = self.inflight.pop(key, [])
+
+        for job in group:
+            if error is None:
+                self._finish(job, result)
+            else:
+                job.update(status=FAILED, error=error, rejected=rejected)
+        if error is None:
+            logger.info(f"Download of {video_id} ({resolution}) finished for {len(group)} job(s): {result['filepath']}")
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            by_status: Dict[str, int] = {}
+            for job in self.jobs.values():
+                by_status[job.status] = by_status.get(job.status, 0) + 1
+            return {
+                "workers": self.max_workers,
+                "max_pending": self.max_pending,
+                "downloads_in_progress": len(self.inflight),
+                "coalesced_jobs": self.coalesced,
+                "reused_files": self.reused,
+                "jobs": by_status
+            }
+
+    def shutdown(self):
+        """Stop accepting work and cancel queued (not yet running) downloads"""
+        if self.executor is not None:
+            self.executor.shutdown(wait=False, cancel_futures=True)
+            self.executor = None
+        with self._lock:
+            for job in self.jobs.values():
+                if job.status == QUEUED:
+                    job.update(status=FAILED, error="Server is shutting down")
+
+
+# Global download job manager shared by the API routes and the LangGraph tool
+download_manager = DownloadJobManager(VIDEO_DOWNLOAD_WORKERS, VIDEO_DOWNLOAD_MAX_PENDING, DOWNLOAD_JOB_TTL)
+
+
+def shutdown_download_jobs():
+    download_manager.shutdown()
@@ -0,0 +1,131 @@
+import logging
+import os
+import re
+import shutil
+import subprocess
+import uuid
+from pathlib import Path
+from typing import List, Optional
+
+from config import HLS_ENABLED, FFMPEG_PATH, FFMPEG_TIMEOUT, HLS_SEGMENT_SECONDS
+from services.video_storage import stored_hls_dir
+
+
+logger = logging.getLogger(__name__)
+
+PLAYLIST_NAME = "index.m3u8"
+PLAYLIST_MEDIA_TYPE = "application/vnd.apple.mpegurl"
+SEGMENT_MEDIA_TYPE = "video/mp2t"
+
+# Segments are named <generation>_<index>.ts; every remux uses a new generation,
+# so a segment URL never changes content and can be cached as immutable
+SEGMENT_NAME_PATTERN = re.compile(r"^[0-9a-f]{8}_\d{5}\.ts$")
+
+# ffmpeg is optional; without it downloads are served as the plain MP4
+ffmpeg_binary = shutil.which(FFMPEG_PATH) if HLS_ENABLED else None
+HLS_AVAILABLE = ffmpeg_binary is not None
+
+
+def _run_ffmpeg(args: List[str]) -> bool:
+    try:
+        subprocess.run(
+            [ffmpeg_binary, "-nostdin", "-hide_banner", "-loglevel", "error", "-y", *args],
+            check=True,
+            capture_output=True,
+            timeout=FFMPEG_TIMEOUT
+        )
+        return True
+    except subprocess.CalledProcessError as e:
+        logger.error(f"ffmpeg failed: {e.stderr.decode(errors='replace').strip()[-500:]}")
+    except (subprocess.TimeoutExpired, OSError) as e:
+        logger.error(f"ffmpeg failed: {str(e)}")
+    return False
+
+
+def remux_faststart(path: Path) -> bool:
+    """
+    Rewrite an MP4 in place with the moov atom at the front, so progressive
+    playback can start before the whole file has been fetched. Streams are
+    copied, not re-encoded.
+
+    Returns:
+        bool: True if the file was rewritten; on failure it is left untouched
+    """
+    if not HLS_AVAILABLE:
+        return False
+
+    remuxed = path.with_suffix(f".{uuid.uuid4().hex[:8]}.part")
+    ok = _run_ffmpeg([
+        "-i", str(path),
+        "-map", "0", "-c", "copy",
+        "-movflags", "+faststart",
+        "-f", "mp4", str(remuxed)
+    ])
+    if ok:
+        os.replace(remuxed, path)
+    else:
+        remuxed.unlink(missing_ok=True)
+    return ok
+
+
+def build_hls(path: Path) -> Optional[Path]:
+    """
+    Segment a stored video into a VOD HLS playlist next to it (stream copy,
+    cut at keyframes). The playlist is built in a temporary directory and
+    swapped in once complete.
+
+    Args:
+        path: The stored MP4
+
+    Returns:
+        Optional[Path]: The playlist, or None if ffmpeg is unavailable or failed
+    """
+    if not HLS_AVAILABLE:
+        return None
+
+    hls_dir = stored_hls_dir(path)
+    build_dir = hls_dir.with_name(f".{hls_dir.name}.{uuid.uuid4().hex[:8]}.tmp")
+    generation = uuid.uuid4().hex[:8]
+    try:
+        build_dir.mkdir(parents=True)
+        ok = _run_ffmpeg([
+            "-i", str(path),
+            "-map", "0:v:0", "-map", "0:a:0?", "-c", "copy",
+            "-f", "hls",
+            "-hls_time", str(HLS_SEGMENT_SECONDS),
+            "-hls_playlist_type", "vod",
+            "-hls_flags", "independent_segments",
+            "-hls_segment_filename", str(build_dir / f"{generation}_%05d.ts"),
+            str(build_dir / PLAYLIST_NAME)
+        ])
+        if not ok:
+            return None
+        shutil.rmtree(hls_dir, ignore_errors=True)
+        os.replace(build_dir, hls_dir)
+    except OSError as e:
+        logger.error(f"Could not build HLS playlist for {path.name}: {str(e)}")
+        return None
+    finally:
+        shutil.rmtree(build_dir, ignore_errors=True)
+
+    logger.info(f"Built HLS playlist for {path.name}")
+    return hls_dir / PLAYLIST_NAME
+
+
+def find_hls_playlist(path: Path) -> Optional[Path]:
+    """Return the HLS playlist of a stored video if it has been built"""
+    playlist = stored_hls_dir(path) / PLAYLIST_NAME
+    return playlist if playlist.is_file() else None
+
+
+def find_hls_segment(path: Path, name: str) -> Optional[Path]:
+    """Return a segment of a stored video's HLS playlist, or None for unknown names"""
+    if not SEGMENT_NAME_PATTERN.match(name):
+        return None
+    segment = stored_hls_dir(path) / name
+    return segment if segment.is_file() else None
+
+
+def ensure_hls(path: Path) -> Optional[Path]:
+    """Build the HLS playlist of a stored video unless it already exists"""
+    return find_hls_playlist(path) or build_hls(path)
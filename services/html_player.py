@@ -0,0 +1,190 @@
+import asyncio
+import html
+import logging
+import re
+import tempfile
+import time
+from pathlib import Path
+from string import Template
+from typing import Any, Dict, Optional
+
+from config import (
+    HTML_PLAYER_TEMP_DIR,
+    HTML_PLAYER_CACHE_MAX_ENTRIES,
+    HTML_PLAYER_CACHE_TTL,
+    HTML_PLAYER_LEGACY_FILE_TTL,
+    HTML_PLAYER_CLEANUP_INTERVAL
+)
+from services.cache import TTLCache
+from services.youtube_metadata import get_video_snippet
+
+
+logger = logging.getLogger(__name__)
+
+VIDEO_ID_PATTERN = re.compile(r"^[A-Za-z0-9_-]{6,20}$")
+
+# Compiled once; only the escaped values are substituted per player
+PLAYER_TEMPLATE = Template("""<!DOCTYPE html>
+<html>
+<head>
+    <meta charset="UTF-8">
+    <meta name="viewport" content="width=device-width, initial-scale=1.0">
+    <title>$title</title>
+    <style>
+        body {
+            margin: 0;
+            padding: 0;
+            display: flex;
+            justify-content: center;
+            align-items: center;
+            min-height: 100vh;
+            background-color: #000;
+        }
+        .video-container {
+            width: ${width}px;
+            height: ${height}px;
+            max-width: 100%;
+        }
+        iframe {
+            width: 100%;
+            height: 100%;
+            border: none;
+        }
+    </style>
+</head>
+<body>
+    <div class="video-container">
+        <iframe
+            src="https://www.youtube.com/embed/$video_id?autoplay=1"
+            title="$title"
+            frameborder="0"
+            allow="accelerometer; autoplay; clipboard-write; encrypted-media; gyroscope; picture-in-picture"
+            allowfullscreen>
+        </iframe>
+    </div>
+</body>
+</html>
+""")
+
+# (video ID, width, height) -> rendered page
+player_cache = TTLCache(HTML_PLAYER_CACHE_MAX_ENTRIES, HTML_PLAYER_CACHE_TTL)
+
+# Background task that removes legacy player files
+cleanup_task: Optional[asyncio.Task] = None
+
+
+def extract_video_id(video_url_or_id: str) -> str:
+    """Return the video ID of a youtube.com / youtu.be URL, or the input if it is already an ID"""
+    video_id = video_url_or_id
+    if "youtube.com" in video_url_or_id or "youtu.be" in video_url_or_id:
+        if "v=" in video_url_or_id:
+            video_id = video_url_or_id.split("v=")[1].split("&")[0]
+        elif "youtu.be/" in video_url_or_id:
+            video_id = video_url_or_id.split("youtu.be/")[1].split("?")[0]
+    return video_id
+
+
+def render_player(video_id: str, width: int, height: int, title: str) -> str:
+    """Fill the player template; all values are escaped"""
+    return PLAYER_TEMPLATE.substitute(
+        video_id=html.escape(video_id, quote=True),
+        width=int(width),
+        height=int(height),
+        title=html.escape(title, quote=True)
+    )
+
+
+def get_player_html(video_id: str, width: int, height: int) -> str:
+    """
+    Return the HTML page of an embedded player, rendering it on a cache miss.
+    The title comes from the shared metadata cache, so a video that was just
+    searched costs no API call.
+
+    Raises:
+        ValueError: If video_id is not a valid YouTube video ID
+    """
+    if not VIDEO_ID_PATTERN.match(video_id):
+        raise ValueError(f"Invalid YouTube video ID: {video_id}")
+
+    key = (video_id, int(width), int(height))
+    page = player_cache.get(key)
+    if page is not None:
+        return page
+
+    title = f"YouTube Video - {video_id}"
+    try:
+        snippet = get_video_snippet(video_id)
+        if snippet:
+            title = snippet["title"]
+    except Exception as e:
+        logger.error(f"Error fetching video title: {str(e)}")
+
+    page = render_player(video_id, width, height, title)
+    player_cache.set(key, page)
+    return page
+
+
+def player_url(video_id: str, width: int, height: int) -> str:
+    """Route that serves the player page"""
+    return f"/youtube/player/{video_id}?width={int(width)}&height={int(height)}"
+
+
+def cleanup_legacy_player_files(max_age: float = HTML_PLAYER_LEGACY_FILE_TTL) -> int:
+    """
+    Remove youtube_player_*.html files written by earlier versions once they
+    are older than max_age seconds.
+
+    Returns:
+        int: Number of files removed
+    """
+    cutoff = time.time() - max_age
+    removed = 0
+    for directory in {HTML_PLAYER_TEMP_DIR, tempfile.gettempdir()}:
+        if not directory or not Path(directory).is_dir():
+            continue
+        for path in Path(directory).glob("youtube_player_*.html"):
+            try:
+                if path.stat().st_mtime < cutoff:
+                    path.unlink()
+                    removed += 1
+            except OSError:
+                pass
+    if removed:
+        logger.info(f"Removed {removed} legacy HTML player files")
+    return removed
+
+
+async def _cleanup_loop():
+    """Remove expired legacy player files now and every HTML_PLAYER_CLEANUP_INTERVAL seconds"""
+    while True:
+        try:
+            await asyncio.to_thread(cleanup_legacy_player_files)
+        except Exception as e:
+            logger.error(f"Legacy player cleanup failed: {e}")
+        await asyncio.sleep(HTML_PLAYER_CLEANUP_INTERVAL)
+
+
+def start_player_cleanup():
+    """Start the background legacy player cleanup on the running event loop"""
+    global cleanup_task
+
+    if cleanup_task is None or cleanup_task.done():
+        cleanup_task = asyncio.create_task(_cleanup_loop())
+
+
+async def stop_player_cleanup():
+    """Cancel the background legacy player cleanup"""
+    global cleanup_task
+
+    if cleanup_task is not None:
+        cleanup_task.cancel()
+        try:
+            await cleanup_task
+        except asyncio.CancelledError:
+            pass
+        cleanup_task = None
+
+
+def get_player_cache_stats() -> Dict[str, Any]:
+    """Hit-rate metrics of the rendered player cache"""
+    return player_cache.stats()
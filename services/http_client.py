@@ -0,0 +1,161 @@
+import asyncio
+import logging
+from typing import Dict, Any, Optional
+
+import httpx
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+from config import (
+    HTTP_CONNECT_TIMEOUT,
+    HTTP_READ_TIMEOUT,
+    HTTP_POOL_MAXSIZE,
+    HTTP_MAX_RETRIES,
+    HTTP_BACKOFF_FACTOR,
+    HTTP_RETRY_STATUSES
+)
+
+
+logger = logging.getLogger(__name__)
+
+# Shared keep-alive clients, created on first use
+http_session = None
+async_http_client = None
+
+
+def get_session() -> requests.Session:
+    """Return the shared pooled requests session with retry on 429/5xx"""
+    global http_session
+
+    if http_session is None:
+        retry = Retry(
+            total=HTTP_MAX_RETRIES,
+            backoff_factor=HTTP_BACKOFF_FACTOR,
+            status_forcelist=HTTP_RETRY_STATUSES,
+            allowed_methods=["GET"],
+            respect_retry_after_header=True,
+            raise_on_status=False
+        )
+        adapter = HTTPAdapter(pool_connections=4, pool_maxsize=HTTP_POOL_MAXSIZE, max_retries=retry)
+        session = requests.Session()
+        session.mount("https://", adapter)
+        session.mount("http://", adapter)
+        http_session = session
+    return http_session
+
+
+def _error_payload(decode) -> Optional[Dict[str, Any]]:
+    """
+    Google APIs report failures as {"error": {...}} with a 4xx/5xx status. Callers
+    inspect that payload (e.g. to log the API's own message), so it is returned
+    instead of raising. Returns None when the error body is anything else.
+    """
+    try:
+        data = decode()
+    except ValueError:
+        return None
+    return data if isinstance(data, dict) and "error" in data else None
+
+
+def get_json(url: str, params: Optional[Dict[str, Any]] = None, timeout: Optional[float] = None) -> Dict[str, Any]:
+    """
+    GET a URL with the shared session and return the decoded JSON body
+
+    Args:
+        url: The URL to request (without query string)
+        params: Query parameters, URL-encoded by requests
+        timeout: Optional read timeout overriding HTTP_READ_TIMEOUT
+
+    Returns:
+        Dict: The decoded JSON response; for error status codes, the API's
+            {"error": ...} payload when it sent one
+
+    Raises:
+        requests.RequestException: On connection errors, timeouts, or error status codes without a JSON error payload
+    """
+    response = get_session().get(url, params=params, timeout=(HTTP_CONNECT_TIMEOUT, timeout or HTTP_READ_TIMEOUT))
+    if not response.ok:
+        payload = _error_payload(response.json)
+        if payload is not None:
+            return payload
+        response.raise_for_status()
+    return response.json()
+
+
+def get_async_client() -> httpx.AsyncClient:
+    """Return the shared pooled httpx client for async callers"""
+    global async_http_client
+
+    if async_http_client is None or async_http_client.is_closed:
+        async_http_client = httpx.AsyncClient(
+            timeout=httpx.Timeout(HTTP_READ_TIMEOUT, connect=HTTP_CONNECT_TIMEOUT),
+            limits=httpx.Limits(max_connections=HTTP_POOL_MAXSIZE, max_keepalive_connections=HTTP_POOL_MAXSIZE)
+        )
+    return async_http_client
+
+
+def _retry_delay(attempt: int, response: Optional[httpx.Response] = None) -> float:
+    """Seconds to wait before the next attempt, honouring Retry-After when present"""
+    if response is not None:
+        retry_after = response.headers.get("Retry-After")
+        if retry_after and retry_after.isdigit():
+            return float(retry_after)
+    return HTTP_BACKOFF_FACTOR * (2 ** attempt)
+
+
+async def async_get_json(url: str, params: Optional[Dict[str, Any]] = None, timeout: Optional[float] = None) -> Dict[str, Any]:
+    """
+    GET a URL with the shared async client and return the decoded JSON body.
+    Retries with exponential backoff on connection errors and 429/5xx responses.
+
+    Args:
+        url: The URL to request (without query string)
+        params: Query parameters, URL-encoded by httpx
+        timeout: Optional read timeout overriding HTTP_READ_TIMEOUT
+
+    Returns:
+        Dict: The decoded JSON response; for error status codes, the API's
+            {"error": ...} payload when it sent one
+
+    Raises:
+        httpx.HTTPError: When all attempts fail without a JSON error payload
+    """
+    client = get_async_client()
+    request_timeout = httpx.Timeout(timeout or HTTP_READ_TIMEOUT, connect=HTTP_CONNECT_TIMEOUT)
+
+    for attempt in range(HTTP_MAX_RETRIES + 1):
+        try:
+            response = await client.get(url, params=params, timeout=request_timeout)
+        except httpx.TransportError as e:
+            if attempt == HTTP_MAX_RETRIES:
+                raise
+            delay = _retry_delay(attempt)
+            logger.warning(f"Request to {url} failed ({e}), retrying in {delay:.1f}s")
+            await asyncio.sleep(delay)
+            continue
+
+        if response.status_code in HTTP_RETRY_STATUSES and attempt < HTTP_MAX_RETRIES:
+            delay = _retry_delay(attempt, response)
+            logger.warning(f"Request to {url} returned {response.status_code}, retrying in {delay:.1f}s")
+            await asyncio.sleep(delay)
+            continue
+
+        if response.is_error:
+            payload = _error_payload(response.json)
+            if payload is not None:
+                return payload
+            response.raise_for_status()
+        return response.json()
+
+
+async def close_http_clients():
+    """Close the shared HTTP clients"""
+    global http_session, async_http_client
+
+    if http_session is not None:
+        http_session.close()
+        http_session = None
+    if async_http_client is not None:
+        await async_http_client.aclose()
+        async_http_client = None
@@ -1,8 +1,17 @@
+import asyncio
 import logging
 from typing import Tuple, Dict, Any, Optional
 
-from config import GOOGLE_API_KEY, LANGCHAIN_MODEL  # Assuming you have GOOGLE_API_KEY in config
+from config import (  # Assuming you have GOOGLE_API_KEY in config
+    GOOGLE_API_KEY,
+    LANGCHAIN_MODEL,
+    LANGCHAIN_AGENT_POOL_SIZE,
+    LANGCHAIN_AGENT_POOL_IDLE_TIMEOUT
+)
+from services.agent_pool import AgentPool
 from services.search_service import direct_google_search
+from services.status_service import get_service_status
+from services.session_memory import session_memory
 
 logger = logging.getLogger(__name__)
 
@@ -11,12 +20,15 @@ bullseye_llm = None
 search_agent = None
 verbose_agent = None  # New agent for comprehensive responses
 
+# Pools of agent instances so concurrent requests never share one agent
+search_agent_pool = None
+verbose_agent_pool = None
+
 # Flag to check if LangChain imports are available
 try:
     from langchain.agents import initialize_agent, AgentType
     from langchain.tools import Tool
     from langchain_google_genai import ChatGoogleGenerativeAI
-    from langchain.memory import ConversationBufferMemory
     from langchain.prompts import SystemMessagePromptTemplate, HumanMessagePromptTemplate, ChatPromptTemplate
     from langchain.chains import LLMChain
     LANGCHAIN_AVAILABLE = True
@@ -32,9 +44,38 @@ For factual questions, provide context, history, and related information.
 Always aim to be educational and insightful with long-form, well-structured responses.
 """
 
+def build_search_agent(agent_type):
+    """
+    Build a new search agent instance around the shared LLM.
+    Agents are built without memory; per-user history is passed in as "chat_history".
+
+    Args:
+        agent_type: The LangChain AgentType to build
+
+    Returns:
+        AgentExecutor: A fresh agent instance
+    """
+    from services.search_service import google_search, async_google_search
+    search_tools = [
+        Tool(
+            name="GoogleSearch",
+            func=google_search,
+            coroutine=async_google_search,  # Used when the agent runs via ainvoke
+            description="Useful for when you need to search for information online. Input should be a search query."
+        )
+    ]
+
+    return initialize_agent(
+        search_tools,
+        bullseye_llm,
+        agent=agent_type,
+        verbose=True,
+        handle_parsing_errors=True
+    )
+
 def setup_langchain_components():
     """Set up LangChain components with error handling and diagnostics, now using Google GenAI"""
-    global bullseye_llm, search_agent, verbose_agent
+    global bullseye_llm, search_agent, verbose_agent, search_agent_pool, verbose_agent_pool
 
     if not LANGCHAIN_AVAILABLE:
         logger.error("LangChain components not available - imports failed")
@@ -66,64 +107,32 @@ def setup_langchain_components():
             logger.error(f"Error initializing ChatGoogleGenerativeAI: {genai_init_error}")
             return None, None
 
-        # Test LLM directly
-        try:
-            logger.info("Testing LLM directly")
-            llm_result = bullseye_llm.invoke("Hello, this is a test.")
-            logger.info("LLM test successful")
-        except Exception as llm_error:
-            logger.error(f"LLM test failed: {llm_error}")
-            return bullseye_llm, None
-
-        # Test Google Search directly before creating the tool
-        from services.search_service import test_google_api
-        try:
-            logger.info("Testing Google Search API directly")
-            test_result = test_google_api()
-            if not test_result:
-                logger.error("Google Search API test failed")
-                return bullseye_llm, None
-            logger.info("Google Search API test successful")
-        except Exception as search_error:
-            logger.error(f"Google Search API test failed: {search_error}")
-            return bullseye_llm, None
-
-        # Create search tools
-        from services.search_service import google_search
-        search_tools = [
-            Tool(
-                name="GoogleSearch",
-                func=google_search,
-                description="Useful for when you need to search for information online. Input should be a search query."
-            )
-        ]
+        # No network calls here: the LLM and search API are exercised by
+        # warm_langchain_components() after the server is listening
 
         # Create standard agent
         try:
             logger.info("Creating standard search agent")
-            memory = ConversationBufferMemory(memory_key="chat_history")
-            agent = initialize_agent(
-                search_tools,
-                bullseye_llm,
-                agent=AgentType.ZERO_SHOT_REACT_DESCRIPTION,
-                verbose=True,
-                memory=memory,
-                handle_parsing_errors=True
+            search_agent = build_search_agent(AgentType.ZERO_SHOT_REACT_DESCRIPTION)
+            search_agent_pool = AgentPool(
+                "langchain-standard",
+                lambda: build_search_agent(AgentType.ZERO_SHOT_REACT_DESCRIPTION),
+                LANGCHAIN_AGENT_POOL_SIZE,
+                idle_timeout=LANGCHAIN_AGENT_POOL_IDLE_TIMEOUT
             )
+            search_agent_pool.add(search_agent)
             logger.info("Standard search agent created successfully")
-            search_agent = agent
             
             # Create verbose agent (for comprehensive responses)
             logger.info("Creating verbose search agent")
-            verbose_memory = ConversationBufferMemory(memory_key="chat_history")
-            verbose_agent = initialize_agent(
-                search_tools,
-                bullseye_llm,
-                agent=AgentType.CONVERSATIONAL_REACT_DESCRIPTION,  # More detailed, conversational responses
-                verbose=True,
-                memory=verbose_memory,
-                handle_parsing_errors=True
+            verbose_agent = build_search_agent(AgentType.CONVERSATIONAL_REACT_DESCRIPTION)  # More detailed, conversational responses
+            verbose_agent_pool = AgentPool(
+                "langchain-verbose",
+                lambda: build_search_agent(AgentType.CONVERSATIONAL_REACT_DESCRIPTION),
+                LANGCHAIN_AGENT_POOL_SIZE,
+                idle_timeout=LANGCHAIN_AGENT_POOL_IDLE_TIMEOUT
             )
+            verbose_agent_pool.add(verbose_agent)
             logger.info("Verbose search agent created successfully")
             
             return bullseye_llm, search_agent
@@ -153,6 +162,22 @@ def check_langchain_status() -> Tuple[bool, Optional[str]]:
 
     return True, None
 
+async def warm_langchain_components() -> bool:
+    """
+    Exercise the LangChain LLM once so the first user request does not pay for
+    connection setup. Run in the background after startup, never on the request path.
+
+    Returns:
+        bool: True if the LLM answered
+    """
+    if bullseye_llm is None:
+        logger.warning("LangChain warm-up skipped: LLM not initialized")
+        return False
+
+    await bullseye_llm.ainvoke("Hello, this is a test.")
+    logger.info("LangChain LLM warm-up successful")
+    return True
+
 def enhance_prompt(prompt: str) -> str:
     """Enhance the prompt to encourage more detailed responses"""
     enhanced_prompt = (
@@ -177,7 +202,7 @@ async def expand_response(initial_response: str) -> str:
             f"Make it more comprehensive while maintaining accuracy."
         )
         
-        expanded = bullseye_llm.invoke(expansion_prompt)
+        expanded = await bullseye_llm.ainvoke(expansion_prompt)
         
         # Format the final response
         final_response = (
@@ -191,7 +216,7 @@ async def expand_response(initial_response: str) -> str:
         logger.error(f"Error expanding response: {expand_error}")
         return initial_response
 
-async def generate_langsearch_response(prompt: str, comprehensive: bool = True) -> Tuple[str, str]:
+async def generate_langsearch_response(prompt: str, comprehensive: bool = True, user_id: Optional[int] = None) -> Tuple[str, str]:
     """
     Generate a response using LangChain Google Search agent or fall back to direct search
     With option for comprehensive responses
@@ -199,39 +224,49 @@ async def generate_langsearch_response(prompt: str, comprehensive: bool = True)
     Args:
         prompt: The user's input prompt
         comprehensive: Whether to generate a comprehensive response (default: True)
+        user_id: Optional user ID whose chat history is used as agent memory
 
     Returns:
         Tuple[str, str]: (generated content, model used)
     """
-    global search_agent, verbose_agent
+    global search_agent_pool, verbose_agent_pool
 
-    # First try direct search to make sure the Google API works
-    try:
-        test_search = direct_google_search("quick test")
-        if "Error" in test_search:
-            logger.error(f"Google Search API is not working: {test_search}")
-            return f"Sorry, I couldn't access Google Search at the moment. Error: {test_search}...Please try again later.", "Error-Google-Search"
-    except Exception as test_error:
-        logger.error(f"Error testing Google Search API: {test_error}")
+    # Check the cached search status published by the background health prober
+    status = get_service_status()
+    if status.search_available is False:
+        logger.error(f"Google Search API is not working: {status.search_error}")
+        return f"Sorry, I couldn't access Google Search at the moment. Error: {status.search_error}...Please try again later.", "Error-Google-Search"
 
     # Then try using the agent if available
-    if search_agent is None and verbose_agent is None:
+    if search_agent_pool is None and verbose_agent_pool is None:
         logger.warning("LangChain Google Search agent is not available, using direct search instead.")
-        content = direct_google_search(prompt)
+        content = await asyncio.to_thread(direct_google_search, prompt)
         return content, "Direct-Google-Search"
 
     try:
-        # Choose the appropriate agent based on comprehensive flag
-        agent_to_use = verbose_agent if comprehensive and verbose_agent is not None else search_agent
+        chat_history = session_memory.get_history(user_id)
+        
+        # Only the conversational (verbose) agent's prompt has a {chat_history} slot, so it
+        # also handles non-comprehensive requests from users with history
+        conversational = bool(comprehensive or chat_history) and verbose_agent_pool is not None
+        pool = verbose_agent_pool if conversational else search_agent_pool
         
         # Enhance the prompt for more detailed responses if comprehensive mode is on
         actual_prompt = enhance_prompt(prompt) if comprehensive else prompt
+        if chat_history and not conversational:
+            # The zero-shot agent would ignore chat_history, so it goes into the input instead
+            actual_prompt = f"Previous conversation:\n{chat_history}\n\nCurrent question: {actual_prompt}"
         
-        if hasattr(agent_to_use, 'invoke'):
-            result = agent_to_use.invoke({"input": actual_prompt})
-            response = result['output']
-        else:
-            response = agent_to_use.run(actual_prompt)
+        # Run a checked-out agent asynchronously so other requests keep being served meanwhile
+        async with pool.checkout() as agent_to_use:
+            if hasattr(agent_to_use, 'ainvoke'):
+                result = await agent_to_use.ainvoke({"input": actual_prompt, "chat_history": chat_history})
+                response = result['output']
+            else:
+                response = await agent_to_use.arun(input=actual_prompt, chat_history=chat_history)
+        
+        # Remember the exchange for this user only
+        session_memory.add_turn(user_id, prompt, response)
         
         # If comprehensive mode is enabled, expand the response further
         if comprehensive:
@@ -242,17 +277,17 @@ async def generate_langsearch_response(prompt: str, comprehensive: bool = True)
             
     except Exception as e:
         logger.error(f"Error using LangChain agent: {e}, falling back to direct search")
-        content = direct_google_search(prompt)
+        content = await asyncio.to_thread(direct_google_search, prompt)
         return content, "Direct-Google-Search-Fallback"
 
 async def test_langchain_search(query: str, comprehensive: bool = True) -> Dict[str, Any]:
     """Test LangChain search functionality with option for comprehensive responses"""
-    global search_agent, verbose_agent
+    global search_agent_pool, verbose_agent_pool
 
-    # Choose the appropriate agent based on comprehensive flag
-    agent_to_use = verbose_agent if comprehensive and verbose_agent is not None else search_agent
+    # Choose the appropriate agent pool based on comprehensive flag
+    pool = verbose_agent_pool if comprehensive and verbose_agent_pool is not None else search_agent_pool
     
-    if agent_to_use is None:
+    if pool is None:
         return {
             "success": False,
             "method": "langchain_test",
@@ -264,11 +299,12 @@ async def test_langchain_search(query: str, comprehensive: bool = True) -> Dict[
         # Enhance the prompt for more detailed responses if comprehensive mode is on
         actual_query = enhance_prompt(query) if comprehensive else query
         
-        if hasattr(agent_to_use, 'invoke'):
-            result = agent_to_use.invoke({"input": actual_query})
-            agent_result = result.get("output", "No output")
-        else:
-            agent_result = agent_to_use.run(actual_query)
+        async with pool.checkout() as agent_to_use:
+            if hasattr(agent_to_use, 'ainvoke'):
+                result = await agent_to_use.ainvoke({"input": actual_query, "chat_history": ""})
+                agent_result = result.get("output", "No output")
+            else:
+                agent_result = await agent_to_use.arun(input=actual_query, chat_history="")
         
         # If comprehensive mode is enabled, expand the response further
         if comprehensive:
@@ -1,53 +1,39 @@
 
 """LangGraph implementation with Google Gemini for search-powered conversations"""
+import asyncio
 import logging
-import requests
-import json
-import webbrowser
-import os
-import sys
-import time
-import platform
-import subprocess
-import tempfile
-import base64
-import uuid
+from contextvars import ContextVar
 from typing import Tuple, Dict, Any, Optional, List
-from pathlib import Path
 
 from langchain_core.messages import AIMessage, HumanMessage, SystemMessage
-from langchain_core.tools import tool
+from langchain_core.tools import StructuredTool, tool
 from langchain_google_genai import ChatGoogleGenerativeAI
 from langchain.callbacks.streaming_stdout import StreamingStdOutCallbackHandler
-from langchain_core.callbacks import CallbackManager
 from langgraph.prebuilt import create_react_agent
 
 
-# Add cache management to suppress file_cache warnings
-from googleapiclient.discovery_cache.base import Cache
-class MemoryCache(Cache):
-    _CACHE = {}
-    def get(self, url): return MemoryCache._CACHE.get(url)
-    def set(self, url, content): MemoryCache._CACHE[url] = content
-
 
 # Import YouTube-related libraries
-from googleapiclient.discovery import build
-from pytube import YouTube
 from pytube.exceptions import RegexMatchError, VideoUnavailable
 
 from config import (
     GOOGLE_API_KEY,
-    GOOGLE_CSE_ID,
-    VALID_GOOGLE_MODELS,
-    YOUTUBE_API_SERVICE_NAME,
-    YOUTUBE_API_VERSION,
+    YOUTUBE_OEMBED_URL,
     YOUTUBE_PLAYER_WIDTH,
     YOUTUBE_PLAYER_HEIGHT,
     CHAIN_OF_THOUGHT_VISIBLE,
-    HTML_PLAYER_TEMP_DIR
+    SEARCH_CANDIDATE_COUNT,
+    YOUTUBE_DOWNLOAD_TOOL_WAIT
 )
 
+from services.http_client import get_json
+from services import youtube_client
+from services.youtube_streams import get_stream_manifest
+from services.download_jobs import download_manager, DownloadQueueFull, FAILED
+from services.youtube_metadata import get_video_metadata, get_video_snippet, enrich_search_items
+from services.html_player import extract_video_id, get_player_html, player_url
+from services.search_service import async_fetch_google_results, multi_search, multi_search_sync, build_search_context
+
 logger = logging.getLogger(__name__)
 
 # Suppress googleapiclient.discovery_cache INFO messages
@@ -60,6 +46,9 @@ langgraph_agent = None
 langgraph_comprehensive_agent = None  # Agent using the comprehensive LLM
 debug_mode = True  # Set to True to enable colored debug output
 
+# User the current agent run acts for; tools read it to attribute downloads
+current_user_id: ContextVar[Optional[int]] = ContextVar("current_user_id", default=None)
+
 # Input threshold for switching modes (characters)
 LARGE_INPUT_THRESHOLD = 10000
 
@@ -74,13 +63,6 @@ Your responses should:
 - Be educational and insightful with well-organized information
 """ # Removed "Think step by step" as that's handled in the thinking phase
 
-# Video storage configuration
-VIDEO_STORAGE_DIR = Path("./storage/videos")
-VIDEO_STORAGE_DIR.mkdir(parents=True, exist_ok=True)
-MAX_VIDEO_SIZE_MB = 100  # Maximum size of videos to download (to avoid huge files)
-ALLOWED_VIDEO_FORMATS = ['mp4', 'webm']  # Allowed formats to download
-
-
 # Define the missing debug_print function
 def debug_print(message: str, level: str = "DEBUG"):
     """Prints colored debug messages if debug_mode is True"""
@@ -97,17 +79,11 @@ def debug_print(message: str, level: str = "DEBUG"):
         print(f"{color_code}[{level.upper()}] {message}{reset_code}")
 
 
-# YouTube API client initialization
+# YouTube API client access
 def get_youtube_client():
-    """Initialize and return a YouTube API client"""
+    """Return the shared YouTube API client (built once, see services.youtube_client)"""
     try:
-        youtube = build(
-            YOUTUBE_API_SERVICE_NAME,
-            YOUTUBE_API_VERSION,
-            developerKey=GOOGLE_API_KEY,
-            cache=MemoryCache()  # Use memory cache to avoid file_cache warnings
-        )
-        return youtube
+        return youtube_client.get_youtube_client()
     except Exception as e:
         if debug_mode:
             logger.error(f"\033[0;31m[Error] Failed to initialize YouTube API client: {str(e)}\033[0m")
@@ -118,7 +94,7 @@ def get_youtube_client():
 
 # Create search tool using the @tool decorator
 @tool
-def google_search(query: str) -> str:
+async def google_search(query: str) -> str:
     """
     Search for information on the web using Google Search API.
 
@@ -133,18 +109,11 @@ def google_search(query: str) -> str:
     else:
         logger.info(f"Executing Google Search for: {query}")
 
-    url = f"https://www.googleapis.com/customsearch/v1?q={query}&key={GOOGLE_API_KEY}&cx={GOOGLE_CSE_ID}"
-
     try:
-        response = requests.get(url).json()
+        response = await async_fetch_google_results(query, SEARCH_CANDIDATE_COUNT)
         if "items" in response:
-            # Enhanced: Include titles and links for better context
-            results = []
-            for item in response["items"][:5]:
-                title = item.get("title", "")
-                link = item.get("link", "")
-                snippet = item.get("snippet", "")
-                results.append(f"Title: {title}\nURL: {link}\nSnippet: {snippet}")
+            # Ranked and packed into the snippet token budget
+            results = build_search_context(query, response["items"])
 
             result_text = "\n\n---\n\n".join(results)
             if debug_mode:
@@ -166,6 +135,159 @@ def google_search(query: str) -> str:
         return f"Error performing search: {str(e)}"
 
 
+def _format_multi_search(response: Dict[str, Any]) -> str:
+    """Format merged multi-search results for the agent"""
+    if not response["results"]:
+        if response.get("errors"):
+            return f"Error performing search: {'; '.join(response['errors'].values())}"
+        return "No search results found."
+
+    results = []
+    for item in response["results"][:10]:
+        results.append(
+            f"Title: {item['title']}\nURL: {item['link']}\nSnippet: {item['snippet']}\n"
+            f"Matched queries: {', '.join(item['queries'])}"
+        )
+
+    if debug_mode:
+        logger.info(f"\033[0;32m[Tool] Multi-search returned {len(results)} results\033[0m")
+    else:
+        logger.info(f"Multi-search returned {len(results)} results")
+    return "\n\n---\n\n".join(results)
+
+
+def _log_multi_search(queries: List[str]):
+    if debug_mode:
+        logger.info(f"\033[0;33m[Tool] Executing Google Multi-Search for: {queries}\033[0m")
+    else:
+        logger.info(f"Executing Google Multi-Search for: {queries}")
+
+
+def _multi_search_error(e: Exception) -> str:
+    if debug_mode:
+        logger.error(f"\033[0;31m[Tool] Multi-search error: {str(e)}\033[0m")
+    else:
+        logger.error(f"Multi-search error: {str(e)}")
+    return f"Error performing search: {str(e)}"
+
+
+def _google_multi_search(queries: List[str]) -> str:
+    _log_multi_search(queries)
+    try:
+        return _format_multi_search(multi_search_sync(queries))
+    except Exception as e:
+        return _multi_search_error(e)
+
+
+async def _google_multi_search_async(queries: List[str]) -> str:
+    _log_multi_search(queries)
+    try:
+        return _format_multi_search(await multi_search(queries))
+    except Exception as e:
+        return _multi_search_error(e)
+
+
+# Works with both invoke (thread-pool fan-out) and ainvoke (asyncio fan-out)
+google_multi_search = StructuredTool.from_function(
+    func=_google_multi_search,
+    coroutine=_google_multi_search_async,
+    name="google_multi_search",
+    description=(
+        "Run several related web searches at once (e.g. different phrasings, or a "
+        "site-restricted query plus a general one) and return merged, de-duplicated results. "
+        "Takes a list of search query strings."
+    )
+)
+
+
+def search_youtube_videos(query: str, max_results: int = 5, page_token: Optional[str] = None) -> Dict[str, Any]:
+    """
+    Search YouTube and return structured results, enriched with duration,
+    view count and definition (one batched videos.list call per page).
+
+    Args:
+        query: The search query for YouTube videos
+        max_results: Number of results per page (1-50)
+        page_token: nextPageToken from a previous page, to continue the same search
+
+    Returns:
+        Dict: query, results (list of video dicts), nextPageToken, prevPageToken, totalResults
+
+    Raises:
+        RuntimeError: If the YouTube API client is not available
+        googleapiclient.errors.HttpError: If the API call fails
+    """
+    youtube = get_youtube_client()
+    if not youtube:
+        raise RuntimeError("YouTube API client could not be initialized")
+
+    params = {
+        "q": query,
+        "part": "snippet",
+        "maxResults": max(1, min(max_results, 50)),
+        "type": "video"  # Only search for videos
+    }
+    if page_token:
+        params["pageToken"] = page_token
+    search_response = youtube.search().list(**params).execute()
+
+    # Add duration, views and definition with one batched videos.list call; this also
+    # caches the full snippets so embedding a result needs no further API calls
+    items = enrich_search_items(search_response.get("items", []))
+
+    results = []
+    for item in items:
+        video_id = item.get("id", {}).get("videoId")
+        if not video_id:
+            continue
+        snippet = item["snippet"]
+        thumbnails = snippet.get("thumbnails", {})
+        thumbnail = (thumbnails.get("high") or thumbnails.get("medium") or thumbnails.get("default") or {}).get("url")
+        results.append({
+            "videoId": video_id,
+            "title": snippet.get("title", ""),
+            "channel": snippet.get("channelTitle", ""),
+            "channelId": snippet.get("channelId"),
+            "url": f"https://www.youtube.com/watch?v={video_id}",
+            "thumbnail": thumbnail,
+            "description": snippet.get("description", ""),
+            "publishedAt": snippet.get("publishedAt"),
+            "duration": item.get("contentDetails", {}).get("duration"),
+            "viewCount": item.get("statistics", {}).get("viewCount"),
+            "definition": item.get("contentDetails", {}).get("definition")
+        })
+
+    return {
+        "query": query,
+        "results": results,
+        "nextPageToken": search_response.get("nextPageToken"),
+        "prevPageToken": search_response.get("prevPageToken"),
+        "totalResults": search_response.get("pageInfo", {}).get("totalResults")
+    }
+
+
+def format_youtube_results(results: List[Dict[str, Any]]) -> str:
+    """Format structured YouTube search results as text for the LLM"""
+    blocks = []
+    for video in results:
+        video_id = video["videoId"]
+        blocks.append(
+            f"Title: {video['title']}\n"
+            f"Channel: {video['channel']}\n"
+            f"URL: {video['url']}\n"
+            f"Thumbnail: {video['thumbnail']}\n"
+            f"Duration: {video['duration'] or 'N/A'}\n"
+            f"Views: {video['viewCount'] or 'N/A'}\n"
+            f"Definition: {video['definition'] or 'N/A'}\n"
+            f"Description: {video['description']}\n"
+            f"Commands:\n"
+            f"- Watch in app: Use 'youtube_embed({video_id})'\n"
+            f"- Download video: Use 'youtube_download({video_id})'\n"
+            f"- Get video details: Use 'youtube_video_info({video_id})'"
+        )
+    return "\n\n---\n\n".join(blocks)
+
+
 @tool
 def youtube_search(query: str, max_results: int = 5) -> str:
     """
@@ -184,47 +306,14 @@ def youtube_search(query: str, max_results: int = 5) -> str:
         logger.info(f"Executing YouTube Search for: {query}")
 
     try:
-        youtube = get_youtube_client()
-        if not youtube:
-            return "YouTube API client could not be initialized."
-
-        # Execute search request
-        search_response = youtube.search().list(
-            q=query,
-            part="snippet",
-            maxResults=max_results,
-            type="video"  # Only search for videos
-        ).execute()
-
-        # Process search results
-        if "items" in search_response and search_response["items"]:
-            results = []
-            for item in search_response["items"]:
-                video_id = item["id"]["videoId"]
-                title = item["snippet"]["title"]
-                channel = item["snippet"]["channelTitle"]
-                description = item["snippet"]["description"]
-                video_url = f"https://www.youtube.com/watch?v={video_id}"
-                thumbnail = item["snippet"]["thumbnails"]["high"]["url"]
-
-                results.append(
-                    f"Title: {title}\n"
-                    f"Channel: {channel}\n"
-                    f"URL: {video_url}\n"
-                    f"Thumbnail: {thumbnail}\n"
-                    f"Description: {description}\n"
-                    f"Commands:\n"
-                    f"- Watch in app: Use 'youtube_embed({video_id})'\n"
-                    f"- Download video: Use 'youtube_download({video_id})'\n"
-                    f"- Get video details: Use 'youtube_video_info({video_id})'"
-                )
+        search = search_youtube_videos(query, max_results)
 
-            result_text = "\n\n---\n\n".join(results)
+        if search["results"]:
             if debug_mode:
-                logger.info(f"\033[0;32m[Tool] YouTube search returned {len(results)} videos\033[0m")
+                logger.info(f"\033[0;32m[Tool] YouTube search returned {len(search['results'])} videos\033[0m")
             else:
-                logger.info(f"YouTube search returned {len(results)} videos")
-            return result_text
+                logger.info(f"YouTube search returned {len(search['results'])} videos")
+            return format_youtube_results(search["results"])
         else:
             if debug_mode:
                 logger.warning(f"\033[0;31m[Tool] YouTube search returned no results\033[0m")
@@ -266,26 +355,20 @@ def youtube_video_info(video_url_or_id: str) -> str:
     video_url = f"https://www.youtube.com/watch?v={video_id}"
 
     try:
-        # Use YouTube API to get video info
-        youtube = get_youtube_client()
-        if not youtube:
+        # Use YouTube API to get video info (served from the shared metadata cache when possible)
+        if not get_youtube_client():
             return "YouTube API client could not be initialized."
 
-        video_response = youtube.videos().list(
-            part="snippet,contentDetails,statistics",
-            id=video_id
-        ).execute()
-
-        if not video_response.get("items"):
+        video_data = get_video_metadata(video_id, ("snippet", "contentDetails", "statistics"))
+        if not video_data:
             return f"No video found with ID: {video_id}"
 
-        video_data = video_response["items"][0]
         snippet = video_data["snippet"]
         statistics = video_data["statistics"]
         content_details = video_data["contentDetails"]
 
-        # Get pytube info for stream information
-        yt = YouTube(video_url)
+        # Get pytube info for stream information (cached and shared with youtube_download)
+        yt = get_stream_manifest(video_id)
 
         # Basic video info
         info = {
@@ -376,25 +459,15 @@ def youtube_oembed(video_url_or_id: str, width: int = YOUTUBE_PLAYER_WIDTH, heig
         elif "youtu.be/" in video_url_or_id:
             video_id = video_url_or_id.split("youtu.be/")[1].split("?")[0]
 
-    video_url = f"https://www.youtube.com/watch?v={video_id}"
     embed_url = f"https://www.youtube.com/embed/{video_id}"
 
     try:
-        # Get basic video info
-        youtube = get_youtube_client()
+        # Get basic video info (served from the shared metadata cache when possible)
         video_info = None
-
-        if youtube:
-            try:
-                video_response = youtube.videos().list(
-                    part="snippet",
-                    id=video_id
-                ).execute()
-
-                if video_response.get("items"):
-                    video_info = video_response["items"][0]["snippet"]
-            except Exception as e:
-                logger.error(f"Error fetching video info: {str(e)}")
+        try:
+            video_info = get_video_snippet(video_id)
+        except Exception as e:
+            logger.error(f"Error fetching video info: {str(e)}")
 
         # Generate embed HTML
         embed_html = f"""
@@ -456,7 +529,7 @@ This video will also be saved in your conversation history.
 @tool
 async def youtube_create_html_player(video_url_or_id: str, width: int = YOUTUBE_PLAYER_WIDTH, height: int = YOUTUBE_PLAYER_HEIGHT) -> str:
     """
-    Create an HTML file with an embedded YouTube player and return its path.
+    Create a standalone HTML page with an embedded YouTube player and return its URL.
 
     Args:
         video_url_or_id: Full URL of the YouTube video or just the video ID
@@ -464,100 +537,26 @@ async def youtube_create_html_player(video_url_or_id: str, width: int = YOUTUBE_
         height: Height of the embedded player
 
     Returns:
-        Path to the created HTML file
+        URL of the player page
     """
     if debug_mode:
         logger.info(f"\033[0;33m[Tool] Creating HTML player for: {video_url_or_id}\033[0m")
     else:
         logger.info(f"Creating HTML player for: {video_url_or_id}")
 
-    # Extract video ID if a full URL was provided
-    video_id = video_url_or_id
-    if "youtube.com" in video_url_or_id or "youtu.be" in video_url_or_id:
-        if "v=" in video_url_or_id:
-            video_id = video_url_or_id.split("v=")[1].split("&")[0]
-        elif "youtu.be/" in video_url_or_id:
-            video_id = video_url_or_id.split("youtu.be/")[1].split("?")[0]
+    video_id = extract_video_id(video_url_or_id)
 
     try:
-        # Get basic video info for the title
-        youtube = get_youtube_client()
-        video_title = f"YouTube Video - {video_id}"
-
-        if youtube:
-            try:
-                video_response = youtube.videos().list(
-                    part="snippet",
-                    id=video_id
-                ).execute()
-
-                if video_response.get("items"):
-                    video_title = video_response["items"][0]["snippet"]["title"]
-            except Exception as e:
-                logger.error(f"Error fetching video title: {str(e)}")
-
-        # Create HTML content
-        html_content = f"""
-        <!DOCTYPE html>
-        <html>
-        <head>
-            <meta charset="UTF-8">
-            <meta name="viewport" content="width=device-width, initial-scale=1.0">
-            <title>{video_title}</title>
-            <style>
-                body {{
-                    margin: 0;
-                    padding: 0;
-                    display: flex;
-                    justify-content: center;
-                    align-items: center;
-                    min-height: 100vh;
-                    background-color: #000;
-                }}
-                .video-container {{
-                    width: {width}px;
-                    height: {height}px;
-                    max-width: 100%;
-                }}
-                iframe {{
-                    width: 100%;
-                    height: 100%;
-                    border: none;
-                }}
-            </style>
-        </head>
-        <body>
-            <div class="video-container">
-                <iframe
-                    src="https://www.youtube.com/embed/{video_id}?autoplay=1"
-                    title="{video_title}"
-                    frameborder="0"
-                    allow="accelerometer; autoplay; clipboard-write; encrypted-media; gyroscope; picture-in-picture"
-                    allowfullscreen>
-                </iframe>
-            </div>
-        </body>
-        </html>
-        """
-
-        # Create a temp directory if it doesn't exist
-        temp_dir = HTML_PLAYER_TEMP_DIR if HTML_PLAYER_TEMP_DIR else tempfile.gettempdir()
-        os.makedirs(temp_dir, exist_ok=True)
-
-        # Create a unique filename
-        filename = f"youtube_player_{video_id}_{uuid.uuid4().hex[:6]}.html"
-        file_path = os.path.join(temp_dir, filename)
-
-        # Write the HTML file
-        with open(file_path, "w", encoding="utf-8") as f:
-            f.write(html_content)
+        # Rendered in memory (and cached) so the route can serve it without a disk write
+        await asyncio.to_thread(get_player_html, video_id, width, height)
+        url = player_url(video_id, width, height)
 
         if debug_mode:
-            logger.info(f"\033[0;32m[Tool] YouTube HTML player created at: {file_path}\033[0m")
+            logger.info(f"\033[0;32m[Tool] YouTube HTML player available at: {url}\033[0m")
         else:
-            logger.info(f"YouTube HTML player created at: {file_path}")
+            logger.info(f"YouTube HTML player available at: {url}")
 
-        return file_path
+        return url
 
     except Exception as e:
         if debug_mode:
@@ -567,121 +566,91 @@ async def youtube_create_html_player(video_url_or_id: str, width: int = YOUTUBE_
         return f"Error creating HTML player: {str(e)}"
 
 
-@tool
-def youtube_download(video_url_or_id: str, resolution: str = "720p") -> str:
-    """
-    Download a YouTube video and save it to the database.
-
-    Args:
-        video_url_or_id: Full URL of the YouTube video or just the video ID
-        resolution: Desired resolution (default: 720p)
-
-    Returns:
-        Information about the downloaded video
-    """
+def _submit_download(video_url_or_id: str, resolution: str):
     if debug_mode:
         logger.info(f"\033[0;33m[Tool] Downloading YouTube video: {video_url_or_id}\033[0m")
     else:
         logger.info(f"Downloading YouTube video: {video_url_or_id}")
 
-    # Extract video ID if a full URL was provided
-    video_id = video_url_or_id
-    if "youtube.com" in video_url_or_id or "youtu.be" in video_url_or_id:
-        if "v=" in video_url_or_id:
-            video_id = video_url_or_id.split("v=")[1].split("&")[0]
-        elif "youtu.be/" in video_url_or_id:
-            video_id = video_url_or_id.split("youtu.be/")[1].split("?")[0]
-
-    video_url = f"https://www.youtube.com/watch?v={video_id}"
-
-    try:
-        # Get video info
-        yt = YouTube(video_url)
-
-        # Check video size first
-        stream = yt.streams.filter(progressive=True, file_extension='mp4', resolution=resolution).first()
+    # Run through the shared download pool (bounded) on behalf of the chatting user
+    video_id = extract_video_id(video_url_or_id)
+    return download_manager.submit(video_id, resolution, user_id=current_user_id.get())
 
-        # If requested resolution not available, get the best available
-        if not stream:
-            stream = yt.streams.filter(progressive=True, file_extension='mp4').order_by('resolution').desc().first()
 
-        if not stream:
-            return f"No suitable download stream found for video: {yt.title}"
-
-        # Check file size
-        file_size_mb = stream.filesize / (1024 * 1024)
-        if file_size_mb > MAX_VIDEO_SIZE_MB:
-            return f"Video is too large to download ({file_size_mb:.2f} MB). Maximum size is {MAX_VIDEO_SIZE_MB} MB."
-
-        # Create a unique filename
-        unique_id = str(uuid.uuid4())[:8]
-        filename = f"{video_id}_{unique_id}.mp4"
-        filepath = VIDEO_STORAGE_DIR / filename
+def _download_reply(job, finished: bool) -> str:
+    """Format the state of a download job for the agent"""
+    if not finished:
+        logger.info(f"Download job {job.job_id} still running after {YOUTUBE_DOWNLOAD_TOOL_WAIT}s")
+        return (
+            f"The download of YouTube video {job.video_id} is still in progress.\n"
+            f"Job ID: {job.job_id}\n"
+            f"Progress: /download-jobs/{job.job_id}"
+            + ("\nIt will be saved to your conversation history when it completes." if job.user_id is not None else "")
+        )
 
-        # Download the video
-        stream.download(output_path=str(VIDEO_STORAGE_DIR), filename=filename)
+    if job.status == FAILED:
+        if debug_mode:
+            logger.error(f"\033[0;31m[Tool] Error downloading YouTube video: {job.error}\033[0m")
+        else:
+            logger.error(f"Error downloading YouTube video: {job.error}")
+        return job.error if job.rejected else f"Error downloading YouTube video: {job.error}"
 
-        # Check if the file was downloaded
-        if not filepath.exists():
-            return f"Error: Video download failed. File not created."
+    result = job.result
+    history_note = (
+        "\nIt has also been saved to your conversation history for future viewing."
+        if job.video_db_id is not None else ""
+    )
 
-        # Get file size
-        file_size = filepath.stat().st_size
-        file_size_mb = file_size / (1024 * 1024)
+    # Format the response for the agent
+    response_text = f"""
+I've downloaded the YouTube video for you.
 
-        # Encode a small preview for immediate display
-        # For a real preview, this would need to process the video to create a thumbnail
-        # Here we'll use the YouTube thumbnail instead
-        thumbnail_url = f"https://img.youtube.com/vi/{video_id}/hqdefault.jpg"
+Title: {result['title']}
+Channel: {result['author']}
+Duration: {result['length']} seconds
+Resolution: {result['resolution']}
+File Size: {result['file_size_mb']} MB
 
-        # This information will be available to handle in the API route
-        result = {
-            "video_id": video_id,
-            "title": yt.title,
-            "author": yt.author,
-            "length": yt.length,
-            "filepath": str(filepath),
-            "file_size_mb": f"{file_size_mb:.2f}",
-            "resolution": stream.resolution,
-            "thumbnail": thumbnail_url,
-            "type": "downloaded_video"
-        }
+The video has been downloaded and will appear in your chat window.{history_note}
 
-        # Format the response for the agent
-        response_text = f"""
-I've downloaded the YouTube video for you.
+[DOWNLOADED_VIDEO_{job.video_id}]
+"""
 
-Title: {yt.title}
-Channel: {yt.author}
-Duration: {yt.length} seconds
-Resolution: {stream.resolution}
-File Size: {file_size_mb:.2f} MB
+    if debug_mode:
+        logger.info(f"\033[0;32m[Tool] YouTube video downloaded successfully: {result['filepath']}\033[0m")
+    else:
+        logger.info(f"YouTube video downloaded successfully: {result['filepath']}")
 
-The video has been downloaded and will appear in your chat window.
-It has also been saved to your conversation history for future viewing.
+    return response_text
 
-[DOWNLOADED_VIDEO_{video_id}]
-"""
 
-        if debug_mode:
-            logger.info(f"\033[0;32m[Tool] YouTube video downloaded successfully: {filepath}\033[0m")
-        else:
-            logger.info(f"YouTube video downloaded successfully: {filepath}")
+def _youtube_download(video_url_or_id: str, resolution: str = "720p") -> str:
+    try:
+        job = _submit_download(video_url_or_id, resolution)
+    except DownloadQueueFull as e:
+        return f"Error downloading YouTube video: {str(e)}"
+    return _download_reply(job, job.wait(YOUTUBE_DOWNLOAD_TOOL_WAIT))
 
-        return response_text
 
-    except (RegexMatchError, VideoUnavailable) as e:
-        if debug_mode:
-            logger.error(f"\033[0;31m[Tool] Invalid YouTube URL or video unavailable: {str(e)}\033[0m")
-        else:
-            logger.error(f"Invalid YouTube URL or video unavailable: {str(e)}")
-        return f"Error: The provided URL is not a valid YouTube video or the video is unavailable."
-    except Exception as e:
-        if debug_mode:
-            logger.error(f"\033[0;31m[Tool] Error downloading YouTube video: {str(e)}\033[0m")
-        else:
-            logger.error(f"Error downloading YouTube video: {str(e)}")
+async def _youtube_download_async(video_url_or_id: str, resolution: str = "720p") -> str:
+    try:
+        job = _submit_download(video_url_or_id, resolution)
+    except DownloadQueueFull as e:
         return f"Error downloading YouTube video: {str(e)}"
+    return _download_reply(job, await asyncio.to_thread(job.wait, YOUTUBE_DOWNLOAD_TOOL_WAIT))
+
+
+# Waits at most YOUTUBE_DOWNLOAD_TOOL_WAIT seconds; longer downloads are reported by job ID
+youtube_download = StructuredTool.from_function(
+    func=_youtube_download,
+    coroutine=_youtube_download_async,
+    name="youtube_download",
+    description=(
+        "Download a YouTube video (full URL or video ID) at the given resolution (default 720p) "
+        "and save it to the user's history. Returns the video details, or a job ID and progress "
+        "URL if the download is still running."
+    )
+)
 
 
 @tool
@@ -711,21 +680,12 @@ def youtube_save_to_history(video_url_or_id: str) -> str:
     video_url = f"https://www.youtube.com/watch?v={video_id}"
 
     try:
-        # Get video info
-        youtube = get_youtube_client()
+        # Get video info (served from the shared metadata cache when possible)
         video_info = None
-
-        if youtube:
-            try:
-                video_response = youtube.videos().list(
-                    part="snippet",
-                    id=video_id
-                ).execute()
-
-                if video_response.get("items"):
-                    video_info = video_response["items"][0]["snippet"]
-            except Exception as e:
-                logger.error(f"Error fetching video info: {str(e)}")
+        try:
+            video_info = get_video_snippet(video_id)
+        except Exception as e:
+            logger.error(f"Error fetching video info: {str(e)}")
 
         # Generate result for storage in the database
         # This will be handled in the API route
@@ -803,7 +763,7 @@ Provide a concise outline of your plan.
             HumanMessage(content=thinking_prompt)
         ]
 
-        thinking_result = model_obj.invoke(messages)
+        thinking_result = await model_obj.ainvoke(messages)
         debug_print(f"Completed thinking process (approx. {len(thinking_result.content)} chars)", "THINKING")
 
         return thinking_result.content
@@ -889,37 +849,13 @@ def setup_langgraph_components(model_name: str = "gemini-1.5-pro"):
 
         logger.info(f"ChatGoogleGenerativeAI initialized with models '{model_name}'")
 
-        # Test LLMs directly
-        try:
-            logger.info("Testing LLMs directly")
-            test_message = [HumanMessage(content="Hello, this is a test.")]
-            llm_result_std = gemini_llm.invoke(test_message)
-            llm_result_comp = gemini_llm_comprehensive.invoke(test_message)
-            logger.info("LLM tests successful")
-        except Exception as llm_error:
-            logger.error(f"LLM test failed: {llm_error}")
-            return gemini_llm, None
-
-        # Test Google Search directly
-        try:
-            logger.info("Testing Google Search API directly")
-            test_result = google_search("test query")
-            if "Error" in test_result:
-                logger.error("Google Search API test failed")
-                logger.error(f"Error details: {test_result}")
-                # Don't return None here, agents can still work without search if tools are not used
-                # return gemini_llm, None # Keep agent setup attempt
-            else:
-                 logger.info("Google Search API test successful")
-        except Exception as search_error:
-            logger.error(f"Google Search API test failed: {search_error}")
-            # Don't return None here, agents can still work without search if tools are not used
-            # return gemini_llm, None # Keep agent setup attempt
-
+        # No network calls here: the LLMs are exercised by
+        # warm_langgraph_components() after the server is listening
 
         # Create the tools list
         tools = [
             google_search,
+            google_multi_search,
             youtube_search,
             youtube_video_info,
             youtube_oembed,
@@ -956,7 +892,8 @@ def setup_langgraph_components(model_name: str = "gemini-1.5-pro"):
 async def generate_langgraph_response(
     prompt: str,
     model: str = "gemini-1.5-pro",
-    comprehensive: bool = True
+    comprehensive: bool = True,
+    user_id: Optional[int] = None
 ) -> Tuple[str, str]:
     """
     Generate a response using LangGraph with Google Gemini.
@@ -966,6 +903,7 @@ async def generate_langgraph_response(
         prompt: The user's input prompt
         model: The Google Gemini model to use
         comprehensive: Whether to use comprehensive mode (includes thinking for non-large inputs)
+        user_id: The requesting user; tools that save videos attribute them to this user
 
     Returns:
         Tuple[str, str]: (generated content, model used)
@@ -987,7 +925,7 @@ async def generate_langgraph_response(
         logger.warning("LangGraph agent or LLM for thinking is not available, setting up now...")
         # Re-setup components. Note: this might re-initialize everything.
         # In a real application, you might want a more robust initialization check.
-        _, _ = setup_langgraph_components(model)
+        _, _ = await asyncio.to_thread(setup_langgraph_components, model)
         agent_to_use = langgraph_comprehensive_agent if comprehensive and langgraph_comprehensive_agent else langgraph_agent
         llm_for_thinking = gemini_llm
 
@@ -1036,10 +974,15 @@ async def generate_langgraph_response(
         # Using callbacks to track the execution
         # Note: StreamingStdOutCallbackHandler might interfere with API responses if not handled carefully
         # For simple console debugging, it's fine.
-        result = agent_to_use.invoke(
-            {"messages": messages},
-            config={"callbacks": [StreamingStdOutCallbackHandler()]} if debug_mode else {}
-        )
+        # ainvoke keeps the event loop free; sync tools are run in the default executor
+        user_token = current_user_id.set(user_id)
+        try:
+            result = await agent_to_use.ainvoke(
+                {"messages": messages},
+                config={"callbacks": [StreamingStdOutCallbackHandler()]} if debug_mode else {}
+            )
+        finally:
+            current_user_id.reset(user_token)
 
         # Extract the AI's response from the result
         final_response = "I couldn't generate a proper response."
@@ -1116,7 +1059,7 @@ async def test_langgraph_agent(query: str, comprehensive: bool = True) -> Dict[s
 
     if agent_to_use is None or (use_thinking and llm_for_thinking is None):
          # Attempt setup if not available
-        _, _ = setup_langgraph_components()
+        _, _ = await asyncio.to_thread(setup_langgraph_components)
         agent_to_use = langgraph_comprehensive_agent if comprehensive and langgraph_comprehensive_agent else langgraph_agent
         llm_for_thinking = gemini_llm
         if agent_to_use is None:
@@ -1159,7 +1102,7 @@ async def test_langgraph_agent(query: str, comprehensive: bool = True) -> Dict[s
 
         messages = [HumanMessage(content=actual_query)]
 
-        result = agent_to_use.invoke(
+        result = await agent_to_use.ainvoke(
             {"messages": messages},
             config={"callbacks": [StreamingStdOutCallbackHandler()]} if debug_mode else {}
         )
@@ -1201,26 +1144,57 @@ async def test_langgraph_agent(query: str, comprehensive: bool = True) -> Dict[s
             "error": str(agent_error)
         }
 
+def check_langgraph_status() -> Tuple[bool, Optional[str]]:
+    """Check if LangGraph components are available (no network I/O)"""
+    if gemini_llm is None:
+        return False, "LLM not initialized"
+
+    if langgraph_agent is None:
+        return False, "LLM available but agent not initialized"
+
+    if langgraph_comprehensive_agent is None:
+        return True, "Standard agent available but comprehensive agent not initialized"
+
+    return True, None
+
+
+async def warm_langgraph_components() -> bool:
+    """
+    Exercise both LangGraph LLMs once so the first user request does not pay for
+    connection setup. Run in the background after startup, never on the request path.
+
+    Returns:
+        bool: True if both LLMs answered
+    """
+    if gemini_llm is None or gemini_llm_comprehensive is None:
+        logger.warning("LangGraph warm-up skipped: LLMs not initialized")
+        return False
+
+    test_message = [HumanMessage(content="Hello, this is a test.")]
+    await asyncio.gather(
+        gemini_llm.ainvoke(test_message),
+        gemini_llm_comprehensive.ainvoke(test_message)
+    )
+    logger.info("LangGraph LLM warm-up successful")
+    return True
+
+
 # Removed expand_langgraph_response as it doesn't align with the comprehensive mode logic implemented.
 
 def test_youtube_api():
     """Test the YouTube API connectivity"""
     try:
-        youtube = get_youtube_client()
-        if not youtube:
+        if not get_youtube_client():
             return False
 
-        # Test with a simple request
-        request = youtube.videos().list(
-            part="snippet",
-            id="dQw4w9WgXcQ"  # Rick Astley's "Never Gonna Give You Up"
+        # Test with a simple request; always goes to the API (this is a connectivity
+        # check) but refreshes the shared metadata cache on the way
+        video = get_video_metadata(
+            "dQw4w9WgXcQ",  # Rick Astley's "Never Gonna Give You Up"
+            ("snippet",),
+            refresh=True
         )
-        response = request.execute()
-
-        if response and "items" in response:
-            return True
-        else:
-            return False
+        return video is not None
     except Exception as e:
         logger.error(f"YouTube API test failed: {str(e)}")
         return False
@@ -1230,11 +1204,7 @@ def test_youtube_oembed():
     """Test the YouTube oEmbed API connectivity"""
     try:
         video_url = "https://www.youtube.com/watch?v=dQw4w9WgXcQ"
-        oembed_url = f"https://www.youtube.com/oembed?url={video_url}&format=json"
-        response = requests.get(oembed_url)
-        response.raise_for_status()
-
-        oembed_data = response.json()
+        oembed_data = get_json(YOUTUBE_OEMBED_URL, params={"url": video_url, "format": "json"})
         if "html" in oembed_data:
             return True
         else:
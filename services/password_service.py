@@ -0,0 +1,92 @@
+import asyncio
+import logging
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from typing import Optional
+
+from werkzeug.security import generate_password_hash, check_password_hash
+
+from config import PASSWORD_HASH_WORKERS, PASSWORD_HASH_MAX_PENDING
+
+
+logger = logging.getLogger(__name__)
+
+# Global process pool and admission limiter for password hashing.
+# PBKDF2 holds the GIL for its whole run, so threads would not help here.
+hash_pool = None
+hash_slots = None
+
+# Workers must not be forked from the server process: a fork copies locks held by its
+# other threads (DB pool, HTTP clients, background tasks) and the child can deadlock
+POOL_START_METHOD = "forkserver" if "forkserver" in multiprocessing.get_all_start_methods() else "spawn"
+
+
+def init_password_pool() -> ProcessPoolExecutor:
+    """Create the password hashing process pool if it does not exist yet"""
+    global hash_pool
+
+    if hash_pool is None:
+        logger.info(f"Starting password hashing pool with {PASSWORD_HASH_WORKERS} worker processes")
+        hash_pool = ProcessPoolExecutor(
+            max_workers=PASSWORD_HASH_WORKERS,
+            mp_context=multiprocessing.get_context(POOL_START_METHOD)
+        )
+    return hash_pool
+
+
+def shutdown_password_pool():
+    """Shut down the password hashing process pool"""
+    global hash_pool, hash_slots
+
+    if hash_pool is not None:
+        hash_pool.shutdown(wait=False, cancel_futures=True)
+        hash_pool = None
+        hash_slots = None
+        logger.info("Password hashing pool shut down")
+
+
+def _get_slots() -> asyncio.Semaphore:
+    """Return the semaphore bounding how many hash jobs may be queued at once"""
+    global hash_slots
+
+    if hash_slots is None:
+        hash_slots = asyncio.Semaphore(PASSWORD_HASH_MAX_PENDING)
+    return hash_slots
+
+
+async def _run_in_pool(func, *args):
+    """Run a CPU-bound function on the hashing pool without blocking the event loop"""
+    pool = init_password_pool()
+    loop = asyncio.get_running_loop()
+    async with _get_slots():
+        return await loop.run_in_executor(pool, func, *args)
+
+
+async def hash_password(password: str, method: Optional[str] = None) -> str:
+    """
+    Hash a password on the dedicated process pool
+
+    Args:
+        password: The plain text password
+        method: Optional werkzeug hashing method (defaults to werkzeug's default)
+
+    Returns:
+        str: The salted password hash
+    """
+    if method:
+        return await _run_in_pool(generate_password_hash, password, method)
+    return await _run_in_pool(generate_password_hash, password)
+
+
+async def verify_password(hashed_password: str, password: str) -> bool:
+    """
+    Verify a password against its hash on the dedicated process pool
+
+    Args:
+        hashed_password: The stored password hash
+        password: The plain text password to check
+
+    Returns:
+        bool: True if the password matches
+    """
+    return await _run_in_pool(check_password_hash, hashed_password, password)
@@ -0,0 +1,156 @@
+import copy
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from typing import Dict, Any, Optional
+
+from config import (
+    SEARCH_CACHE_ENABLED,
+    SEARCH_CACHE_MAX_ENTRIES,
+    SEARCH_CACHE_TTL,
+    SEARCH_CACHE_SQLITE_PATH,
+    SEARCH_CACHE_SQLITE_TTL
+)
+from services.cache import TTLCache
+
+
+logger = logging.getLogger(__name__)
+
+
+def normalize_query(query: str) -> str:
+    """Normalize a search query so trivially different spellings share a cache entry"""
+    return " ".join(query.lower().split())
+
+
+class SearchCache:
+    """Two-tier cache for Custom Search responses: an in-memory LRU and an optional SQLite file"""
+
+    def __init__(self, max_entries: int, ttl: float, sqlite_path: Optional[str] = None, sqlite_ttl: Optional[float] = None):
+        self.memory = TTLCache(max_entries, ttl)
+        self.sqlite_ttl = sqlite_ttl or ttl
+        self.disk_hits = 0
+        self.disk_misses = 0
+        self._db = None
+        self._db_lock = threading.Lock()
+
+        if sqlite_path:
+            try:
+                os.makedirs(os.path.dirname(os.path.abspath(sqlite_path)), exist_ok=True)
+                self._db = sqlite3.connect(sqlite_path, check_same_thread=False)
+                self._db.execute("PRAGMA journal_mode=WAL")
+                self._db.execute(
+                    "CREATE TABLE IF NOT EXISTS search_cache "
+                    "(cache_key TEXT PRIMARY KEY, response TEXT NOT NULL, expires_at REAL NOT NULL)"
+                )
+                self._db.execute("DELETE FROM search_cache WHERE expires_at <= ?", (time.time(),))
+                self._db.commit()
+                logger.info(f"Search cache persisted to {sqlite_path}")
+            except sqlite3.Error as e:
+                logger.error(f"Could not open search cache database '{sqlite_path}': {e}")
+                self._db = None
+
+    @staticmethod
+    def make_key(query: str, num_results: Optional[int]) -> str:
+        """Build the cache key from the normalized query and result count"""
+        return f"{normalize_query(query)}|{num_results or 10}"
+
+    def get(self, query: str, num_results: Optional[int] = None) -> Optional[Dict[str, Any]]:
+        """Return a cached response or None"""
+        key = self.make_key(query, num_results)
+        data = self.memory.get(key)
+        if data is not None or self._db is None:
+            # Callers get their own copy so mutating a response cannot corrupt the cache
+            return copy.deepcopy(data)
+
+        with self._db_lock:
+            row = self._db.execute(
+                "SELECT response, expires_at FROM search_cache WHERE cache_key = ?", (key,)
+            ).fetchone()
+
+        if row and row[1] > time.time():
+            self.disk_hits += 1
+            data = json.loads(row[0])
+            self.memory.set(key, copy.deepcopy(data))
+            return data
+
+        self.disk_misses += 1
+        return None
+
+    def set(self, query: str, num_results: Optional[int], data: Dict[str, Any]):
+        """Store a successful response in both tiers"""
+        key = self.make_key(query, num_results)
+        self.memory.set(key, copy.deepcopy(data))
+        if self._db is None:
+            return
+
+        try:
+            with self._db_lock:
+                self._db.execute(
+                    "INSERT OR REPLACE INTO search_cache (cache_key, response, expires_at) VALUES (?, ?, ?)",
+                    (key, json.dumps(data), time.time() + self.sqlite_ttl)
+                )
+                self._db.commit()
+        except sqlite3.Error as e:
+            logger.error(f"Error writing search cache entry: {e}")
+
+    def close(self):
+        """Close the SQLite tier"""
+        with self._db_lock:
+            if self._db is not None:
+                self._db.close()
+                self._db = None
+
+    def stats(self) -> Dict[str, Any]:
+        """Return hit/miss metrics for both tiers"""
+        return {
+            "memory": self.memory.stats(),
+            "sqlite_enabled": self._db is not None,
+            "sqlite_hits": self.disk_hits,
+            "sqlite_misses": self.disk_misses
+        }
+
+
+# Global search cache shared by LangChain, LangGraph and the test endpoints,
+# created on first use so importing this module touches no files
+search_cache: Optional[SearchCache] = None
+search_cache_lock = threading.Lock()
+
+
+def get_search_cache() -> Optional[SearchCache]:
+    """Return the shared search cache, or None if SEARCH_CACHE_ENABLED is off"""
+    global search_cache
+
+    if not SEARCH_CACHE_ENABLED:
+        return None
+    if search_cache is None:
+        with search_cache_lock:
+            if search_cache is None:
+                search_cache = SearchCache(
+                    SEARCH_CACHE_MAX_ENTRIES,
+                    SEARCH_CACHE_TTL,
+                    SEARCH_CACHE_SQLITE_PATH,
+                    SEARCH_CACHE_SQLITE_TTL
+                )
+    return search_cache
+
+
+def close_search_cache():
+    """Close the shared search cache's SQLite connection"""
+    global search_cache
+
+    with search_cache_lock:
+        if search_cache is not None:
+            search_cache.close()
+            search_cache = None
+
+
+def get_search_cache_stats() -> Dict[str, Any]:
+    """Return search cache metrics (or a disabled marker)"""
+    if not SEARCH_CACHE_ENABLED:
+        return {"enabled": False}
+    if search_cache is None:
+        return {"enabled": True, "initialized": False}
+    return {"enabled": True, **search_cache.stats()}
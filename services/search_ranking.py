@@ -0,0 +1,128 @@
+import logging
+import re
+from typing import Dict, Any, List, Tuple
+
+import numpy as np
+
+
+logger = logging.getLogger(__name__)
+
+# BM25 parameters
+BM25_K1 = 1.5
+BM25_B = 0.75
+
+TOKEN_PATTERN = re.compile(r"\w+", re.UNICODE)
+STOPWORDS = {
+    "a", "an", "and", "are", "as", "at", "be", "by", "for", "from", "how", "in", "is", "it",
+    "of", "on", "or", "that", "the", "this", "to", "was", "what", "when", "where", "who", "why", "with"
+}
+
+
+def tokenize(text: str) -> List[str]:
+    """Lowercase word tokens without stopwords"""
+    return [t for t in TOKEN_PATTERN.findall(text.lower()) if t not in STOPWORDS]
+
+
+def estimate_token_count(text: str) -> int:
+    """Roughly estimate token count (4 chars ≈ 1 token)"""
+    return len(text) // 4
+
+
+def _term_matrix(docs: List[List[str]], query_terms: List[str]) -> Tuple[np.ndarray, List[int]]:
+    """Build a document-term count matrix and return the column indices of the query terms"""
+    vocab: Dict[str, int] = {}
+    rows, cols = [], []
+    for row, tokens in enumerate(docs):
+        for token in tokens:
+            rows.append(row)
+            cols.append(vocab.setdefault(token, len(vocab)))
+
+    query_cols = [vocab[t] for t in dict.fromkeys(query_terms) if t in vocab]
+    matrix = np.zeros((len(docs), max(len(vocab), 1)), dtype=np.float32)
+    if rows:
+        np.add.at(matrix, (np.array(rows), np.array(cols)), 1.0)
+    return matrix, query_cols
+
+
+def bm25_scores(matrix: np.ndarray, query_cols: List[int]) -> np.ndarray:
+    """Vectorized BM25 score of every document for the query columns"""
+    n_docs = matrix.shape[0]
+    if not query_cols or n_docs == 0:
+        return np.zeros(n_docs, dtype=np.float32)
+
+    doc_len = matrix.sum(axis=1)
+    avg_len = doc_len.mean() or 1.0
+    tf = matrix[:, query_cols]
+    df = (tf > 0).sum(axis=0)
+    idf = np.log1p((n_docs - df + 0.5) / (df + 0.5))
+    norm = BM25_K1 * (1 - BM25_B + BM25_B * doc_len / avg_len)
+    return (idf * tf * (BM25_K1 + 1) / (tf + norm[:, None])).sum(axis=1)
+
+
+def rank_search_results(
+    query: str,
+    items: List[Dict[str, Any]],
+    duplicate_threshold: float = 0.9
+) -> List[Dict[str, Any]]:
+    """
+    Rank Custom Search items against the query with BM25 and drop near-duplicates.
+
+    Args:
+        query: The user's search query
+        items: Custom Search result items (title, link, snippet)
+        duplicate_threshold: Cosine similarity above which a lower-ranked result is dropped
+
+    Returns:
+        List[Dict]: Items ordered by relevance, near-duplicates removed
+    """
+    if not items:
+        return []
+
+    docs = [tokenize(f"{item.get('title', '')} {item.get('snippet', '')}") for item in items]
+    matrix, query_cols = _term_matrix(docs, tokenize(query))
+
+    # Break ties by the original search engine rank
+    scores = bm25_scores(matrix, query_cols)
+    order = np.lexsort((np.arange(len(items)), -scores))
+
+    # Cosine similarity between all result pairs, computed once
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    unit = np.divide(matrix, norms, out=np.zeros_like(matrix), where=norms > 0)
+    similarity = unit @ unit.T
+
+    kept: List[int] = []
+    for idx in order:
+        if kept and similarity[idx, kept].max() >= duplicate_threshold:
+            continue
+        kept.append(int(idx))
+
+    dropped = len(items) - len(kept)
+    if dropped:
+        logger.debug(f"Dropped {dropped} near-duplicate search results")
+    return [items[i] for i in kept]
+
+
+def pack_search_results(items: List[Dict[str, Any]], token_budget: int) -> List[str]:
+    """
+    Format ranked items and keep as many as fit into the token budget.
+    The best result is always included, with its snippet trimmed if necessary.
+
+    Args:
+        items: Ranked result items
+        token_budget: Approximate token budget for all formatted results
+
+    Returns:
+        List[str]: Formatted result blocks
+    """
+    blocks = []
+    used = 0
+    for item in items:
+        block = f"Title: {item.get('title', '')}\nURL: {item.get('link', '')}\nSnippet: {item.get('snippet', '')}"
+        cost = estimate_token_count(block)
+        if used + cost > token_budget:
+            if not blocks:
+                blocks.append(block[:token_budget * 4])
+            break
+        blocks.append(block)
+        used += cost
+    return blocks
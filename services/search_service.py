@@ -1,21 +1,125 @@
-import requests
+import asyncio
 import logging
-from typing import Dict, Any
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Any, Optional, List, Tuple
+from urllib.parse import urlsplit, urlunsplit
 
 # Updated to ensure we use the correct variable name
-from config import GOOGLE_API_KEY, GOOGLE_CSE_ID
+from config import (
+    GOOGLE_API_KEY,
+    GOOGLE_CSE_ID,
+    GOOGLE_CSE_URL,
+    SEARCH_MAX_CONCURRENCY,
+    SEARCH_CANDIDATE_COUNT,
+    SEARCH_SNIPPET_TOKEN_BUDGET,
+    SEARCH_FAILURE_TTL
+)
+from services.http_client import get_json, async_get_json
+from services.search_cache import get_search_cache, normalize_query
+from services.search_ranking import rank_search_results, pack_search_results
 
 
 logger = logging.getLogger(__name__)
 
+# Outcome of the most recent Custom Search request. The health prober reads this
+# instead of spending a billable query on every probe.
+last_search_outcome: Dict[str, Any] = {"ok": None, "error": None, "persistent": False, "at": None}
+
+# Failures that retrying will not fix soon: bad or restricted credentials, API not
+# enabled, quota used up. Anything else (5xx, timeouts, one bad query) is transient.
+PERSISTENT_ERROR_CODES = {401, 403, 429}
+PERSISTENT_ERROR_REASONS = {
+    "keyInvalid", "keyExpired", "accessNotConfigured", "forbidden",
+    "dailyLimitExceeded", "quotaExceeded", "rateLimitExceeded", "userRateLimitExceeded"
+}
+
+
+def _record_search_outcome(data: Optional[Dict[str, Any]] = None, error: Optional[Exception] = None):
+    code, reasons = None, set()
+    if error is not None:
+        message = str(error)
+        code = getattr(getattr(error, "response", None), "status_code", None)
+    elif "error" in data:
+        message = data["error"].get("message", "Unknown error")
+        code = data["error"].get("code")
+        reasons = {e.get("reason") for e in data["error"].get("errors", [])}
+    else:
+        message = None
+    persistent = message is not None and (code in PERSISTENT_ERROR_CODES or bool(reasons & PERSISTENT_ERROR_REASONS))
+    last_search_outcome.update(ok=message is None, error=message, persistent=persistent, at=time.time())
+
+
+def check_google_search_status() -> Tuple[bool, Optional[str]]:
+    """
+    Free availability check of Google Search: the credentials are configured and
+    the last real search did not fail on credentials or quota within the last
+    SEARCH_FAILURE_TTL seconds. Makes no API call.
+    """
+    for value, name in ((GOOGLE_API_KEY, "API key"), (GOOGLE_CSE_ID, "CSE ID")):
+        if not value or value.startswith("place your"):
+            return False, f"Google {name} is not configured"
+    outcome = last_search_outcome
+    if outcome["ok"] is False and outcome["persistent"] and time.time() - outcome["at"] < SEARCH_FAILURE_TTL:
+        return False, outcome["error"]
+    return True, None
+
+
+def fetch_google_results(query: str, num_results: Optional[int] = None, use_cache: bool = True) -> Dict[str, Any]:
+    """
+    Call the Google Custom Search API and return the raw JSON response.
+    Responses with results are served from and stored in the shared search cache.
+
+    Args:
+        query: The search query
+        num_results: Optional number of results to request (1-10)
+        use_cache: Whether to consult the search cache (disable for connectivity checks)
+
+    Returns:
+        Dict: The Custom Search API response
+    """
+    search_cache = get_search_cache()
+    if use_cache and search_cache is not None:
+        cached = search_cache.get(query, num_results)
+        if cached is not None:
+            logger.debug(f"Search cache hit for query: {query}")
+            return cached
+
+    params = {"q": query, "key": GOOGLE_API_KEY, "cx": GOOGLE_CSE_ID}
+    if num_results:
+        params["num"] = num_results
+    try:
+        data = get_json(GOOGLE_CSE_URL, params=params)
+    except Exception as e:
+        _record_search_outcome(error=e)
+        raise
+    _record_search_outcome(data)
+
+    if search_cache is not None and "items" in data:
+        search_cache.set(query, num_results, data)
+    return data
+
+
+def build_search_context(query: str, items: List[Dict[str, Any]]) -> List[str]:
+    """
+    Rank search results against the query, drop near-duplicates and keep
+    the best ones that fit into the prompt token budget.
+
+    Args:
+        query: The search query
+        items: Custom Search result items
+
+    Returns:
+        List[str]: Formatted result blocks, best first
+    """
+    ranked = rank_search_results(query, items)
+    return pack_search_results(ranked, SEARCH_SNIPPET_TOKEN_BUDGET)
+
 
 def test_google_api() -> bool:
     """Test the Google API setup directly"""
     try:
-        url = f"https://www.googleapis.com/customsearch/v1?q=test&key={GOOGLE_API_KEY}&cx={GOOGLE_CSE_ID}"
-        response = requests.get(url)
-        response.raise_for_status()
-        data = response.json()
+        data = fetch_google_results("test", use_cache=False)
 
         if "items" in data:
             logger.info("Google API test successful: search results returned")
@@ -42,36 +146,49 @@ def google_search(query: str) -> str:
     Returns:
         str: The search results
     """
-    url = f"https://www.googleapis.com/customsearch/v1?q={query}&key={GOOGLE_API_KEY}&cx={GOOGLE_CSE_ID}"
     logger.info(f"Performing Google search for query: {query}")
 
     try:
-        response = requests.get(url)
-        response.raise_for_status()
-        data = response.json()
+        data = fetch_google_results(query, SEARCH_CANDIDATE_COUNT)
+        return _format_search_response(query, data)
+    except Exception as e:
+        logger.error(f"Error performing Google search: {str(e)}")
+        return f"Error performing Google search: {str(e)}"
 
-        if "items" in data:
-            # Return a compilation of the first 5 snippets
-            snippets = []
-            for item in data["items"][:5]:
-                # Enhanced: Include title and link for better context
-                title = item.get("title", "")
-                link = item.get("link", "")
-                snippet = item.get("snippet", "")
-                snippets.append(f"Title: {title}\nURL: {link}\nSnippet: {snippet}")
-                
-            result = "\n\n---\n\n".join(snippets)
-            logger.info(f"Google search returned {len(snippets)} results")
-            return result
-        
-        logger.warning("Google search returned no results")
-        if "error" in data:
-            logger.error(f"Google search error: {data['error'].get('message', 'Unknown error')}")
 
-        return "No search results found"
+async def async_google_search(query: str) -> str:
+    """
+    Perform a Google search without blocking the event loop.
+    
+    Args:
+        query: The search query
+    
+    Returns:
+        str: The search results
+    """
+    logger.info(f"Performing async Google search for query: {query}")
+
+    try:
+        data = await async_fetch_google_results(query, SEARCH_CANDIDATE_COUNT)
+        return _format_search_response(query, data)
     except Exception as e:
         logger.error(f"Error performing Google search: {str(e)}")
         return f"Error performing Google search: {str(e)}"
+
+
+def _format_search_response(query: str, data: Dict[str, Any]) -> str:
+    """Turn a Custom Search response into ranked text results for the LLM"""
+    if "items" in data:
+        snippets = build_search_context(query, data["items"])
+        result = "\n\n---\n\n".join(snippets)
+        logger.info(f"Google search returned {len(snippets)} of {len(data['items'])} results after ranking")
+        return result
+    
+    logger.warning("Google search returned no results")
+    if "error" in data:
+        logger.error(f"Google search error: {data['error'].get('message', 'Unknown error')}")
+
+    return "No search results found"
     
 
 def direct_google_search(query: str) -> str:
@@ -109,10 +226,7 @@ def advanced_search_with_google_api(query: str, num_results: int = 5) -> Dict[st
         Dict: Structured search results
     """
     try:
-        url = f"https://www.googleapis.com/customsearch/v1?q={query}&key={GOOGLE_API_KEY}&cx={GOOGLE_CSE_ID}&num={num_results}"
-        response = requests.get(url)
-        response.raise_for_status()
-        data = response.json()
+        data = fetch_google_results(query, num_results)
         
         if "items" not in data:
             logger.warning(f"Advanced Google search returned no results for: {query}")
@@ -138,4 +252,152 @@ def advanced_search_with_google_api(query: str, num_results: int = 5) -> Dict[st
     except Exception as e:
         logger.error(f"Error in advanced Google search: {e}")
         return {"success": False, "results": [], "error": str(e)}
-    
\ No newline at end of file
+    
+
+async def async_fetch_google_results(query: str, num_results: Optional[int] = None, use_cache: bool = True) -> Dict[str, Any]:
+    """
+    Async variant of fetch_google_results using the shared async HTTP client.
+
+    Args:
+        query: The search query
+        num_results: Optional number of results to request (1-10)
+        use_cache: Whether to consult the search cache
+
+    Returns:
+        Dict: The Custom Search API response
+    """
+    search_cache = get_search_cache()
+    if use_cache and search_cache is not None:
+        cached = search_cache.get(query, num_results)
+        if cached is not None:
+            logger.debug(f"Search cache hit for query: {query}")
+            return cached
+
+    params = {"q": query, "key": GOOGLE_API_KEY, "cx": GOOGLE_CSE_ID}
+    if num_results:
+        params["num"] = num_results
+    try:
+        data = await async_get_json(GOOGLE_CSE_URL, params=params)
+    except Exception as e:
+        _record_search_outcome(error=e)
+        raise
+    _record_search_outcome(data)
+
+    if search_cache is not None and "items" in data:
+        search_cache.set(query, num_results, data)
+    return data
+
+
+def _normalize_link(link: str) -> str:
+    """
+    Normalize a result URL for de-duplication. Only the scheme and host are
+    case-insensitive; paths and query strings are kept as they are.
+    """
+    parts = urlsplit(link.strip())
+    scheme = parts.scheme.lower()
+    if scheme == "http":
+        scheme = "https"
+    return urlunsplit((scheme, parts.netloc.lower(), parts.path.rstrip("/"), parts.query, ""))
+
+
+def _prepare_queries(queries: List[str]) -> List[str]:
+    """Drop empty queries and ones that only differ in case or whitespace from an earlier one"""
+    unique = {}
+    for query in queries:
+        if query and query.strip():
+            unique.setdefault(normalize_query(query), query.strip())
+    return list(unique.values())
+
+
+def _merge_search_responses(queries: List[str], responses: List[Any]) -> Dict[str, Any]:
+    """Interleave the results of several searches by rank and de-duplicate them by URL"""
+    per_query = []
+    errors = {}
+    for query, response in zip(queries, responses):
+        if isinstance(response, Exception):
+            logger.error(f"Search for '{query}' failed: {response}")
+            errors[query] = str(response)
+            per_query.append([])
+        elif "error" in response:
+            logger.error(f"Search for '{query}' failed: {response['error'].get('message', 'Unknown error')}")
+            errors[query] = response["error"].get("message", "Unknown error")
+            per_query.append([])
+        else:
+            per_query.append(response.get("items", []))
+
+    # Interleave by rank so every query contributes its best results first
+    merged = {}
+    for rank in range(max((len(items) for items in per_query), default=0)):
+        for query, items in zip(queries, per_query):
+            if rank >= len(items):
+                continue
+            item = items[rank]
+            link = item.get("link", "")
+            # Results without a link cannot be duplicates of anything
+            key = _normalize_link(link) if link else f"no-link:{len(merged)}"
+            if key in merged:
+                merged[key]["queries"].append(query)
+                continue
+            merged[key] = {
+                "title": item.get("title", ""),
+                "link": link,
+                "snippet": item.get("snippet", ""),
+                "displayLink": item.get("displayLink", ""),
+                "queries": [query]
+            }
+
+    results = list(merged.values())
+    logger.info(f"Multi-search returned {len(results)} unique results for {len(queries)} queries")
+    return {
+        "success": bool(results) or not errors,
+        "queries": queries,
+        "results": results,
+        "errors": errors
+    }
+
+
+async def multi_search(queries: List[str], num_results: int = 5, max_concurrency: int = SEARCH_MAX_CONCURRENCY) -> Dict[str, Any]:
+    """
+    Run several Google searches concurrently and merge the results.
+    Results are interleaved by rank across queries and de-duplicated by URL.
+
+    Args:
+        queries: The search queries (duplicates are searched once)
+        num_results: Number of results to request per query
+        max_concurrency: Maximum number of searches in flight at once
+
+    Returns:
+        Dict: Merged, de-duplicated results plus per-query errors
+    """
+    queries = _prepare_queries(queries)
+    if not queries:
+        return {"success": False, "queries": [], "results": [], "error": "No queries provided"}
+
+    logger.info(f"Running {len(queries)} Google searches concurrently")
+    semaphore = asyncio.Semaphore(max_concurrency)
+
+    async def run_one(query: str) -> Dict[str, Any]:
+        async with semaphore:
+            return await async_fetch_google_results(query, num_results)
+
+    responses = await asyncio.gather(*(run_one(q) for q in queries), return_exceptions=True)
+    return _merge_search_responses(queries, responses)
+
+
+def multi_search_sync(queries: List[str], num_results: int = 5, max_concurrency: int = SEARCH_MAX_CONCURRENCY) -> Dict[str, Any]:
+    """Blocking variant of multi_search for sync callers, fanning out on a thread pool"""
+    queries = _prepare_queries(queries)
+    if not queries:
+        return {"success": False, "queries": [], "results": [], "error": "No queries provided"}
+
+    logger.info(f"Running {len(queries)} Google searches concurrently")
+
+    def run_one(query: str) -> Any:
+        try:
+            return fetch_google_results(query, num_results)
+        except Exception as e:
+            return e
+
+    with ThreadPoolExecutor(max_workers=max_concurrency) as executor:
+        responses = list(executor.map(run_one, queries))
+    return _merge_search_responses(queries, responses)
@@ -0,0 +1,144 @@
+import logging
+import threading
+from contextlib import contextmanager
+from typing import Any, Dict, List, Optional, Tuple
+
+from config import (
+    LANGCHAIN_MEMORY_TOKEN_BUDGET,
+    LANGCHAIN_MEMORY_MAX_SESSIONS,
+    LANGCHAIN_MEMORY_IDLE_TTL,
+    LANGCHAIN_MEMORY_PERSIST
+)
+from services.cache import TTLCache
+
+
+logger = logging.getLogger(__name__)
+
+
+CHARS_PER_TOKEN = 4
+
+# Largest share of the token budget one message may take, so a single turn
+# (human + AI) never fills more than half of the window
+MAX_MESSAGE_SHARE = 0.25
+
+
+def estimate_token_count(text: str) -> int:
+    """Roughly estimate token count (4 chars ≈ 1 token)"""
+    return len(text) // CHARS_PER_TOKEN
+
+
+def truncate_to_tokens(text: str, max_tokens: int) -> str:
+    """Cut text so that estimate_token_count(text) <= max_tokens"""
+    if estimate_token_count(text) <= max_tokens:
+        return text
+    return text[:(max_tokens + 1) * CHARS_PER_TOKEN - 1]
+
+
+class SessionMemoryStore:
+    """
+    Per-user chat history for the LangChain agents.
+
+    Each session keeps a sliding window of (human, ai) turns bounded by a token
+    budget. Idle sessions expire and the least recently used session is evicted
+    when there are too many. Turns can optionally be persisted to the database
+    so history survives eviction and restarts.
+    """
+
+    def __init__(self, token_budget: int, max_sessions: int, idle_ttl: float, persist: bool = False):
+        self.token_budget = token_budget
+        self.persist = persist
+        self.sessions = TTLCache(max_sessions, idle_ttl)
+        # Per-session locks so concurrent requests of one user do not lose turns
+        self._locks: Dict[int, List[Any]] = {}  # user_id -> [lock, users]
+        self._locks_guard = threading.Lock()
+
+    @contextmanager
+    def _session_lock(self, user_id: int):
+        """Hold the lock of one session while reading or updating it"""
+        with self._locks_guard:
+            entry = self._locks.setdefault(user_id, [threading.Lock(), 0])
+            entry[1] += 1
+        try:
+            with entry[0]:
+                yield
+        finally:
+            with self._locks_guard:
+                entry[1] -= 1
+                if entry[1] == 0:
+                    del self._locks[user_id]
+
+    def _trim(self, turns: List[Tuple[str, str]]) -> List[Tuple[str, str]]:
+        """Drop the oldest turns until the window fits the token budget"""
+        total = sum(estimate_token_count(h) + estimate_token_count(a) for h, a in turns)
+        while turns and total > self.token_budget:
+            human, ai = turns.pop(0)
+            total -= estimate_token_count(human) + estimate_token_count(ai)
+        return turns
+
+    def _load(self, user_id: int) -> List[Tuple[str, str]]:
+        """Load a session from the cache, falling back to the persisted store"""
+        turns = self.sessions.get(user_id)
+        if turns is None:
+            turns = []
+            if self.persist:
+                from database.crud import get_recent_memory_turns
+                turns = self._trim(get_recent_memory_turns(user_id))
+        # Re-setting refreshes the idle expiry (sliding TTL)
+        self.sessions.set(user_id, turns)
+        return turns
+
+    def get_history(self, user_id: Optional[int]) -> str:
+        """
+        Return the user's recent conversation formatted for the agent prompt
+
+        Args:
+            user_id: The user ID (None means no history)
+
+        Returns:
+            str: Chat history in "Human: ... / AI: ..." form
+        """
+        if user_id is None:
+            return ""
+        with self._session_lock(user_id):
+            turns = self._load(user_id)
+        return "\n".join(f"Human: {human}\nAI: {ai}" for human, ai in turns)
+
+    def add_turn(self, user_id: Optional[int], human: str, ai: str):
+        """
+        Append a turn to the user's window and trim it to the token budget
+
+        Args:
+            user_id: The user ID (None means do not record)
+            human: The user's message
+            ai: The agent's answer
+        """
+        if user_id is None:
+            return
+
+        # A single oversized message must not push out the whole window
+        limit = int(self.token_budget * MAX_MESSAGE_SHARE)
+        human, ai = truncate_to_tokens(human, limit), truncate_to_tokens(ai, limit)
+
+        with self._session_lock(user_id):
+            turns = self._trim(list(self._load(user_id)) + [(human, ai)])
+            self.sessions.set(user_id, turns)
+
+            if self.persist:
+                from database.crud import save_memory_turn
+                save_memory_turn(user_id, human, ai)
+
+    def clear(self, user_id: int):
+        """Forget a user's in-memory session"""
+        self.sessions.pop(user_id)
+
+    def stats(self):
+        return self.sessions.stats()
+
+
+# Global per-user memory shared by the LangChain agents
+session_memory = SessionMemoryStore(
+    LANGCHAIN_MEMORY_TOKEN_BUDGET,
+    LANGCHAIN_MEMORY_MAX_SESSIONS,
+    LANGCHAIN_MEMORY_IDLE_TTL,
+    LANGCHAIN_MEMORY_PERSIST
+)
@@ -0,0 +1,320 @@
+import asyncio
+import logging
+import time
+from typing import Awaitable, Callable, Dict, Any, List, Optional, Tuple
+
+from config import HEALTH_PROBE_INTERVAL, HEALTH_STALE_AFTER, HEALTH_SEARCH_PROBE_INTERVAL, WARMUP_TIMEOUT
+
+
+logger = logging.getLogger(__name__)
+
+
+class ServiceStatus:
+    """
+    Snapshot of dependency availability published by the background health prober.
+    Health endpoints serve this snapshot instead of probing dependencies per request.
+    """
+
+    def __init__(
+        self,
+        search_available: Optional[bool] = None,
+        search_error: Optional[str] = None,
+        llm_available: Optional[bool] = None,
+        llm_error: Optional[str] = None,
+        langgraph_available: Optional[bool] = None,
+        langgraph_error: Optional[str] = None,
+        huggingface_available: Optional[bool] = None,
+        database_connected: Optional[bool] = None,
+        youtube_api_available: Optional[bool] = None,
+        youtube_oembed_available: Optional[bool] = None,
+        checked_at: Optional[float] = None,
+        probe_seconds: Optional[float] = None
+    ):
+        # None means "not probed yet" (or, for YouTube, disabled)
+        self.search_available = search_available
+        self.search_error = search_error
+        self.llm_available = llm_available
+        self.llm_error = llm_error
+        self.langgraph_available = langgraph_available
+        self.langgraph_error = langgraph_error
+        self.huggingface_available = huggingface_available
+        self.database_connected = database_connected
+        self.youtube_api_available = youtube_api_available
+        self.youtube_oembed_available = youtube_oembed_available
+        self.checked_at = checked_at
+        self.probe_seconds = probe_seconds
+
+    @property
+    def age_seconds(self) -> Optional[float]:
+        return time.time() - self.checked_at if self.checked_at else None
+
+    @property
+    def stale(self) -> bool:
+        """True if the snapshot was never taken or is older than HEALTH_STALE_AFTER"""
+        age = self.age_seconds
+        return age is None or age > HEALTH_STALE_AFTER
+
+    def to_dict(self) -> Dict[str, Any]:
+        age = self.age_seconds
+        return {
+            "search_available": self.search_available,
+            "search_error": self.search_error,
+            "llm_available": self.llm_available,
+            "llm_error": self.llm_error,
+            "langgraph_available": self.langgraph_available,
+            "langgraph_error": self.langgraph_error,
+            "huggingface_available": self.huggingface_available,
+            "database_connected": self.database_connected,
+            "youtube_api_available": self.youtube_api_available,
+            "youtube_oembed_available": self.youtube_oembed_available,
+            "checked_at": self.checked_at,
+            "age_seconds": round(age, 1) if age is not None else None,
+            "probe_seconds": self.probe_seconds,
+            "stale": self.stale
+        }
+
+
+class ReadinessStatus:
+    """
+    Warm-up state of each startup component.
+
+    Components are built without network I/O during startup and then warmed in
+    the background; each one moves from "pending" through "warming" to "ready",
+    "failed" or "disabled".
+    """
+
+    def __init__(self):
+        self.components: Dict[str, Dict[str, Any]] = {}
+        self.started_at = time.time()
+
+    def set(self, name: str, state: str, error: Optional[str] = None):
+        self.components[name] = {"state": state, "error": error, "updated_at": time.time()}
+
+    @property
+    def warmed(self) -> bool:
+        """True once no component is still pending or warming"""
+        return all(c["state"] not in ("pending", "warming") for c in self.components.values())
+
+    @property
+    def ready(self) -> bool:
+        """True once every enabled component warmed up successfully"""
+        return bool(self.components) and all(c["state"] in ("ready", "disabled") for c in self.components.values())
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "ready": self.ready,
+            "warmed": self.warmed,
+            "uptime_seconds": round(time.time() - self.started_at, 1),
+            "components": {name: dict(info) for name, info in self.components.items()}
+        }
+
+
+# Latest published status; replaced as a whole so readers never see a half-updated snapshot
+service_status = ServiceStatus()
+readiness = ReadinessStatus()
+prober_task = None
+warmup_task = None
+last_search_probe_at: Optional[float] = None  # When the opt-in live Custom Search probe last ran
+
+
+def get_service_status() -> ServiceStatus:
+    """Return the latest cached service status (O(1), no network I/O)"""
+    return service_status
+
+
+def get_readiness() -> ReadinessStatus:
+    """Return the component warm-up state (O(1), no network I/O)"""
+    return readiness
+
+
+async def _run_check(check: Callable[[], bool], name: str) -> Tuple[bool, Optional[str]]:
+    """Run a blocking availability check in a worker thread"""
+    try:
+        if await asyncio.to_thread(check):
+            return True, None
+        return False, f"{name} test failed"
+    except Exception as e:
+        return False, str(e)
+
+
+async def probe_services() -> ServiceStatus:
+    """Run the availability checks concurrently and publish the result as one snapshot"""
+    global service_status, last_search_probe_at
+    from config import YOUTUBE_API_ENABLED
+    from services.search_service import test_google_api, check_google_search_status
+    from services.langchain_service import check_langchain_status
+    from services.langgraph_service import check_langgraph_status, test_youtube_api, test_youtube_oembed
+    from services.huggingface_service import check_huggingface_status
+    from database.connection import check_database_connection
+
+    start = time.perf_counter()
+    checks = {"database": _run_check(check_database_connection, "Database")}
+    # The live search probe is billable, so it only runs when opted in and then rarely
+    if HEALTH_SEARCH_PROBE_INTERVAL > 0 and (
+        last_search_probe_at is None or time.time() - last_search_probe_at >= HEALTH_SEARCH_PROBE_INTERVAL
+    ):
+        last_search_probe_at = time.time()
+        checks["search"] = _run_check(test_google_api, "Google Search API")
+    if YOUTUBE_API_ENABLED:
+        checks["youtube_api"] = _run_check(test_youtube_api, "YouTube API")
+        checks["youtube_oembed"] = _run_check(test_youtube_oembed, "YouTube oEmbed API")
+    results = dict(zip(checks, await asyncio.gather(*checks.values())))
+
+    database_connected = results["database"][0]
+    youtube_api_available = results["youtube_api"][0] if YOUTUBE_API_ENABLED else None
+    youtube_oembed_available = results["youtube_oembed"][0] if YOUTUBE_API_ENABLED else None
+    # A live probe records its outcome, so this also reflects it when one ran
+    search_available, search_error = check_google_search_status()
+
+    # In-process checks, no network I/O
+    llm_available, llm_error = check_langchain_status()
+    langgraph_available, langgraph_error = check_langgraph_status()
+
+    service_status = ServiceStatus(
+        search_available=search_available,
+        search_error=search_error,
+        llm_available=llm_available,
+        llm_error=llm_error,
+        langgraph_available=langgraph_available,
+        langgraph_error=langgraph_error,
+        huggingface_available=check_huggingface_status(),
+        database_connected=database_connected,
+        youtube_api_available=youtube_api_available,
+        youtube_oembed_available=youtube_oembed_available,
+        checked_at=time.time(),
+        probe_seconds=round(time.perf_counter() - start, 3)
+    )
+    return service_status
+
+
+def check_readiness() -> Tuple[bool, List[str]]:
+    """
+    Decide from the cached snapshot whether this instance should receive traffic.
+
+    Returns:
+        Tuple[bool, List[str]]: Ready flag and the reasons it is not ready
+    """
+    status = service_status
+    reasons = []
+    if not readiness.warmed:
+        reasons.append("warm-up in progress")
+    if status.stale:
+        reasons.append("health snapshot is stale" if status.checked_at else "health snapshot not taken yet")
+    if status.database_connected is False:
+        reasons.append("database not connected")
+    if status.llm_available is False and status.langgraph_available is False:
+        reasons.append("no LLM agent available")
+    return not reasons, reasons
+
+
+async def _prober_loop():
+    """Probe dependencies every HEALTH_PROBE_INTERVAL seconds (the first probe is run by the warm-up)"""
+    while True:
+        await asyncio.sleep(HEALTH_PROBE_INTERVAL)
+        try:
+            status = await probe_services()
+            logger.debug(
+                f"Health probe in {status.probe_seconds}s: search={status.search_available}, "
+                f"llm={status.llm_available}, db={status.database_connected}"
+            )
+        except Exception as e:
+            logger.error(f"Health probe failed: {e}")
+
+
+def start_health_prober():
+    """Start the background health prober on the running event loop"""
+    global prober_task
+
+    if prober_task is None or prober_task.done():
+        prober_task = asyncio.create_task(_prober_loop())
+        logger.info(f"Background health prober started (interval: {HEALTH_PROBE_INTERVAL}s)")
+
+
+async def stop_health_prober():
+    """Cancel the background health prober"""
+    global prober_task
+
+    if prober_task is not None:
+        prober_task.cancel()
+        try:
+            await prober_task
+        except asyncio.CancelledError:
+            pass
+        prober_task = None
+
+
+async def _warm_component(name: str, check: Callable[[], Awaitable[bool]]):
+    """Run one warm-up check and record its outcome; a check that hangs fails after WARMUP_TIMEOUT"""
+    readiness.set(name, "warming")
+    start = time.perf_counter()
+    try:
+        ok = await asyncio.wait_for(check(), WARMUP_TIMEOUT)
+    except asyncio.TimeoutError:
+        logger.warning(f"⚠️ Warm-up of {name} timed out after {WARMUP_TIMEOUT}s")
+        readiness.set(name, "failed", f"Timed out after {WARMUP_TIMEOUT}s")
+        return
+    except Exception as e:
+        logger.warning(f"⚠️ Warm-up of {name} failed: {e}")
+        readiness.set(name, "failed", str(e))
+        return
+
+    elapsed = time.perf_counter() - start
+    if ok:
+        logger.info(f"✅ {name} warmed up in {elapsed:.2f}s")
+        readiness.set(name, "ready")
+    else:
+        logger.warning(f"⚠️ Warm-up of {name} failed after {elapsed:.2f}s")
+        readiness.set(name, "failed", f"{name} check failed")
+
+
+async def warm_up_components():
+    """
+    Warm up everything that needs the network, concurrently and off the startup path:
+    the HuggingFace model, the LLMs, and the first health snapshot (Google Search,
+    database and YouTube APIs).
+    """
+    from services.huggingface_service import init_huggingface, check_huggingface_status
+    from services.langchain_service import warm_langchain_components
+    from services.langgraph_service import warm_langgraph_components
+
+    async def load_huggingface() -> bool:
+        await asyncio.to_thread(init_huggingface)
+        return check_huggingface_status()
+
+    async def take_snapshot() -> bool:
+        status = await probe_services()
+        return bool(status.search_available and status.database_connected)
+
+    checks = {
+        "huggingface": load_huggingface,
+        "langchain": warm_langchain_components,
+        "langgraph": warm_langgraph_components,
+        "health_snapshot": take_snapshot,
+    }
+    for name in checks:
+        readiness.set(name, "pending")
+
+    await asyncio.gather(*(_warm_component(name, check) for name, check in checks.items()))
+    logger.info(f"Background warm-up finished (ready: {readiness.ready})")
+
+
+def start_warmup():
+    """Start the background warm-up on the running event loop"""
+    global warmup_task
+
+    if warmup_task is None or warmup_task.done():
+        warmup_task = asyncio.create_task(warm_up_components())
+        logger.info("Background warm-up started")
+
+
+async def stop_warmup():
+    """Cancel the background warm-up if it is still running"""
+    global warmup_task
+
+    if warmup_task is not None:
+        warmup_task.cancel()
+        try:
+            await warmup_task
+        except asyncio.CancelledError:
+            pass
+        warmup_task = None
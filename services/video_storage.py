@@ -0,0 +1,192 @@
+import logging
+import os
+import re
+import shutil
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from config import VIDEO_STORAGE_DIR, VIDEO_STORAGE_QUOTA_MB
+
+
+logger = logging.getLogger(__name__)
+
+video_storage_dir = Path(VIDEO_STORAGE_DIR)
+video_storage_dir.mkdir(parents=True, exist_ok=True)
+
+SAFE_KEY_PART = re.compile(r"[^A-Za-z0-9_-]")
+
+# Per-file locks so two downloads never write the same stored file
+file_locks: Dict[str, List[Any]] = {}  # filename -> [lock, users]
+file_locks_guard = threading.Lock()
+
+# Serializes quota enforcement
+quota_lock = threading.Lock()
+quota_bytes = VIDEO_STORAGE_QUOTA_MB * 1024 * 1024
+evictions = 0
+
+# Abandoned partial downloads older than this are removed during quota enforcement
+PARTIAL_FILE_MAX_AGE = 60 * 60
+
+
+def stored_video_path(video_id: str, resolution: str, file_format: str = "mp4") -> Path:
+    """
+    Content-addressed location of a downloaded video.
+    Every user downloading the same (video_id, resolution, format) shares one file;
+    the rows in the videos table that point at it are its references.
+    """
+    parts = [SAFE_KEY_PART.sub("", str(p)) for p in (video_id, resolution, file_format)]
+    return video_storage_dir / f"{parts[0]}_{parts[1]}.{parts[2]}"
+
+
+def stored_hls_dir(path: Path) -> Path:
+    """Directory holding the HLS playlist and segments remuxed from a stored video"""
+    return video_storage_dir / "hls" / path.stem
+
+
+def _stored_size(path: Path, st: os.stat_result) -> int:
+    """Size of a stored video plus its HLS segments"""
+    hls_dir = stored_hls_dir(path)
+    if not hls_dir.is_dir():
+        return st.st_size
+    return st.st_size + sum(f.stat().st_size for f in hls_dir.iterdir() if f.is_file())
+
+
+def find_stored_video(video_id: str, resolution: str, file_format: str = "mp4") -> Optional[Path]:
+    """Return the stored file for the key if it has already been downloaded"""
+    path = stored_video_path(video_id, resolution, file_format)
+    return path if path.is_file() else None
+
+
+@contextmanager
+def lock_stored_video(path: Path):
+    """Hold the per-file lock while checking for and writing a stored video"""
+    key = path.name
+    with file_locks_guard:
+        entry = file_locks.setdefault(key, [threading.Lock(), 0])
+        entry[1] += 1
+    try:
+        with entry[0]:
+            yield
+    finally:
+        with file_locks_guard:
+            entry[1] -= 1
+            if entry[1] == 0:
+                del file_locks[key]
+
+
+def count_references(paths: List[Path]) -> Dict[Path, int]:
+    """Number of video rows (across all users) that reference each stored file, in one query"""
+    from database.crud import count_video_file_references
+    counts = count_video_file_references([str(path) for path in paths])
+    return {path: counts.get(str(path), 0) for path in paths}
+
+
+def touch_stored_video(path: Path):
+    """
+    Record an access to a stored video. The access time drives LRU eviction; the
+    modification time is left alone so it stays valid for Last-Modified and ETags.
+    """
+    try:
+        st = path.stat()
+        # Nanosecond form: a float mtime would round st_mtime_ns and change the ETag
+        os.utime(path, ns=(time.time_ns(), st.st_mtime_ns))
+    except OSError as e:
+        logger.debug(f"Could not record access to {path}: {e}")
+
+
+def _remove_stale_partials():
+    cutoff = time.time() - PARTIAL_FILE_MAX_AGE
+    for path in video_storage_dir.glob("*.part"):
+        try:
+            if path.stat().st_mtime < cutoff:
+                path.unlink()
+                logger.info(f"Removed abandoned partial download {path.name}")
+        except OSError:
+            pass
+    # HLS playlists are built in hidden directories and renamed when complete
+    for path in (video_storage_dir / "hls").glob(".*.tmp"):
+        try:
+            if path.stat().st_mtime < cutoff:
+                shutil.rmtree(path, ignore_errors=True)
+        except OSError:
+            pass
+
+
+def enforce_quota(incoming_bytes: int = 0, keep: Optional[Path] = None) -> List[Path]:
+    """
+    Evict unreferenced and then least recently accessed videos (with their HLS
+    segments) until the stored files plus incoming_bytes fit in the quota. Files
+    being written and `keep` are never evicted. Rows referencing an evicted file
+    are marked as re-downloadable.
+
+    Args:
+        incoming_bytes: Size of a download about to be written
+        keep: A file that must stay (e.g. the one just downloaded)
+
+    Returns:
+        List[Path]: The evicted files
+    """
+    global evictions
+    from database.crud import mark_video_file_evicted
+
+    with quota_lock:
+        _remove_stale_partials()
+
+        files = []
+        for path in video_storage_dir.glob("*.mp4"):
+            try:
+                st = path.stat()
+            except OSError:
+                continue
+            files.append((st.st_atime, _stored_size(path, st), path))
+
+        used = sum(size for _, size, _ in files)
+        if used + incoming_bytes <= quota_bytes:
+            return []
+
+        with file_locks_guard:
+            busy = set(file_locks)
+
+        candidates = [f for f in files if f[2].name not in busy and f[2] != keep]
+        references = count_references([path for _, _, path in candidates])
+
+        # Files no videos row references go first, then least recently accessed
+        candidates.sort(key=lambda f: (references[f[2]] > 0, f[0]))
+
+        evicted = []
+        for _, size, path in candidates:
+            if used + incoming_bytes <= quota_bytes:
+                break
+            try:
+                path.unlink()
+            except OSError as e:
+                logger.error(f"Could not evict {path}: {e}")
+                continue
+            shutil.rmtree(stored_hls_dir(path), ignore_errors=True)
+            used -= size
+            evicted.append(path)
+            mark_video_file_evicted(str(path))
+            logger.info(f"Evicted {path.name} ({size / (1024 * 1024):.1f} MB) to stay under the storage quota")
+
+        evictions += len(evicted)
+        if used + incoming_bytes > quota_bytes:
+            logger.warning(
+                f"Video storage still over quota after eviction ({used / (1024 * 1024):.1f} MB used, "
+                f"{quota_bytes / (1024 * 1024):.0f} MB quota)"
+            )
+        return evicted
+
+
+def get_storage_stats() -> Dict[str, Any]:
+    """Number and total size of stored video files, against the quota"""
+    files = [p for p in video_storage_dir.glob("*.mp4") if p.is_file()]
+    used = sum(_stored_size(p, p.stat()) for p in files)
+    return {
+        "files": len(files),
+        "total_mb": round(used / (1024 * 1024), 2),
+        "quota_mb": VIDEO_STORAGE_QUOTA_MB,
+        "evictions": evictions
+    }
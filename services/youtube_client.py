@@ -0,0 +1,111 @@
+import logging
+import threading
+from typing import List
+
+import httplib2
+from googleapiclient.discovery import build
+
+from config import (
+    GOOGLE_API_KEY,
+    YOUTUBE_API_SERVICE_NAME,
+    YOUTUBE_API_VERSION,
+    YOUTUBE_API_BASE_URL,
+    HTTP_READ_TIMEOUT
+)
+
+
+logger = logging.getLogger(__name__)
+
+
+class ThreadLocalHttp:
+    """
+    Thread-safe stand-in for httplib2.Http.
+
+    httplib2.Http is not safe to share between threads, but the tools run in
+    worker threads. Each thread gets its own Http object, which keeps its
+    connections alive between requests.
+    """
+
+    def __init__(self, timeout: float):
+        self.timeout = timeout
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._all: List[httplib2.Http] = []
+
+    def _get_http(self) -> httplib2.Http:
+        http = getattr(self._local, "http", None)
+        if http is None:
+            http = httplib2.Http(timeout=self.timeout)
+            # Same as googleapiclient.http.build_http: 308 is "Resume Incomplete" for uploads
+            http.redirect_codes = http.redirect_codes - {308}
+            self._local.http = http
+            with self._lock:
+                self._all.append(http)
+        return http
+
+    def request(self, *args, **kwargs):
+        return self._get_http().request(*args, **kwargs)
+
+    def __getattr__(self, name):
+        # Anything else googleapiclient reads off the Http object
+        return getattr(self._get_http(), name)
+
+    def close(self):
+        """Close the keep-alive connections of every thread"""
+        with self._lock:
+            for http in self._all:
+                http.close()
+            self._all.clear()
+        self._local = threading.local()
+
+
+youtube_client = None
+youtube_http = None
+client_lock = threading.Lock()
+
+
+def init_youtube_client():
+    """
+    Build the shared YouTube Data API client.
+
+    The discovery document ships with google-api-python-client (static discovery),
+    so this does not touch the network and no discovery cache is needed. The resource object is immutable once built and is shared
+    by all threads; requests go through the thread-local keep-alive transport.
+    """
+    global youtube_client, youtube_http
+
+    with client_lock:
+        if youtube_client is not None:
+            return youtube_client
+
+        http = ThreadLocalHttp(HTTP_READ_TIMEOUT)
+        youtube_client = build(
+            YOUTUBE_API_SERVICE_NAME,
+            YOUTUBE_API_VERSION,
+            developerKey=GOOGLE_API_KEY,
+            http=http,
+            static_discovery=True,
+            cache_discovery=False,
+            client_options={"api_endpoint": YOUTUBE_API_BASE_URL} if YOUTUBE_API_BASE_URL else None
+        )
+        youtube_http = http
+        logger.info("YouTube API client initialized")
+        return youtube_client
+
+
+def get_youtube_client():
+    """Return the shared YouTube API client, building it on first use"""
+    if youtube_client is not None:
+        return youtube_client
+    return init_youtube_client()
+
+
+def close_youtube_client():
+    """Close the client's keep-alive connections"""
+    global youtube_client, youtube_http
+
+    with client_lock:
+        if youtube_http is not None:
+            youtube_http.close()
+        youtube_client = None
+        youtube_http = None
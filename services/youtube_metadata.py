@@ -0,0 +1,185 @@
+import logging
+import threading
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from config import YOUTUBE_METADATA_CACHE_MAX_ENTRIES, YOUTUBE_METADATA_TTLS
+from services.cache import TTLCache
+from services.youtube_client import get_youtube_client
+
+
+logger = logging.getLogger(__name__)
+
+# videos.list accepts at most this many IDs per call
+VIDEOS_LIST_MAX_IDS = 50
+
+
+class VideoMetadataCache:
+    """
+    YouTube video metadata keyed by video ID, with a separate TTL per
+    videos.list part (snippet, contentDetails, statistics).
+
+    Every tool and route that needs video metadata goes through here, so a
+    video that was just searched or looked up costs no further API calls.
+    """
+
+    def __init__(self, maxsize: int, part_ttls: Dict[str, float]):
+        self.parts = {part: TTLCache(maxsize, ttl) for part, ttl in part_ttls.items()}
+        self._lock = threading.Lock()
+        self.api_calls = 0
+
+    def get(self, video_id: str, parts: Iterable[str]) -> Optional[Dict[str, Any]]:
+        """Return {"id", <part>: ...} if every requested part is cached, else None"""
+        item = {"id": video_id}
+        for part in parts:
+            value = self.parts[part].get(video_id)
+            if value is None:
+                return None
+            item[part] = value
+        return item
+
+    def put(self, item: Dict[str, Any]):
+        """Store every cached part present in a videos.list item"""
+        video_id = item.get("id")
+        if not isinstance(video_id, str) or not video_id:
+            return
+        for part, cache in self.parts.items():
+            if part in item:
+                cache.set(video_id, item[part])
+
+    def count_api_call(self):
+        with self._lock:
+            self.api_calls += 1
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "api_calls": self.api_calls,
+            "parts": {part: cache.stats() for part, cache in self.parts.items()}
+        }
+
+
+# Global metadata cache shared by the LangGraph tools and the API routes
+video_metadata_cache = VideoMetadataCache(YOUTUBE_METADATA_CACHE_MAX_ENTRIES, YOUTUBE_METADATA_TTLS)
+
+
+def _normalize_parts(parts: Iterable[str]) -> Tuple[str, ...]:
+    parts = tuple(dict.fromkeys(parts))
+    unknown = [p for p in parts if p not in video_metadata_cache.parts]
+    if unknown:
+        raise ValueError(f"Unsupported videos.list parts: {', '.join(unknown)}")
+    return parts
+
+
+def get_videos_metadata(
+    video_ids: List[str],
+    parts: Iterable[str] = ("snippet",),
+    refresh: bool = False
+) -> Dict[str, Dict[str, Any]]:
+    """
+    Get metadata for several videos, fetching cache misses with batched videos.list calls.
+
+    A video with any requested part missing is refetched with all requested parts;
+    videos.list costs one quota unit per call regardless of the parts asked for.
+
+    Args:
+        video_ids: YouTube video IDs
+        parts: videos.list parts to return
+        refresh: Skip the cache and always fetch (the result is still cached)
+
+    Returns:
+        Dict[str, Dict]: video ID -> videos.list item; IDs that do not exist are left out
+
+    Raises:
+        RuntimeError: If the YouTube API client is not available
+        googleapiclient.errors.HttpError: If the API call fails
+    """
+    parts = _normalize_parts(parts)
+    found: Dict[str, Dict[str, Any]] = {}
+    missing: List[str] = []
+    for video_id in dict.fromkeys(video_ids):
+        item = None if refresh else video_metadata_cache.get(video_id, parts)
+        if item is not None:
+            found[video_id] = item
+        else:
+            missing.append(video_id)
+
+    if not missing:
+        return found
+
+    youtube = get_youtube_client()
+    if youtube is None:
+        raise RuntimeError("YouTube API client could not be initialized")
+
+    for start in range(0, len(missing), VIDEOS_LIST_MAX_IDS):
+        batch = missing[start:start + VIDEOS_LIST_MAX_IDS]
+        response = youtube.videos().list(
+            part=",".join(parts),
+            id=",".join(batch),
+            maxResults=len(batch)
+        ).execute()
+        video_metadata_cache.count_api_call()
+
+        for item in response.get("items", []):
+            video_metadata_cache.put(item)
+            found[item["id"]] = item
+
+    return found
+
+
+def get_video_metadata(video_id: str, parts: Iterable[str] = ("snippet",), refresh: bool = False) -> Optional[Dict[str, Any]]:
+    """
+    Get metadata for one video, from the cache when possible.
+
+    Args:
+        video_id: YouTube video ID
+        parts: videos.list parts to return
+        refresh: Skip the cache and always fetch (the result is still cached)
+
+    Returns:
+        Optional[Dict]: The videos.list item, or None if the video does not exist
+    """
+    return get_videos_metadata([video_id], parts, refresh).get(video_id)
+
+
+def get_video_snippet(video_id: str) -> Optional[Dict[str, Any]]:
+    """Shortcut for the snippet of one video (None if it does not exist)"""
+    item = get_video_metadata(video_id, ("snippet",))
+    return item["snippet"] if item else None
+
+
+def enrich_search_items(items: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """
+    Add contentDetails and statistics to search.list results with one batched
+    videos.list call (instead of one lookup per video later on).
+
+    The call also asks for the snippet (same quota cost), so the cache gets the
+    full videos.list snippet. The search.list snippets are never cached: their
+    descriptions are truncated, titles HTML-escaped and tags missing.
+
+    Args:
+        items: search.list items of kind youtube#video
+
+    Returns:
+        List[Dict]: The same items, each with "contentDetails" and "statistics" when available
+    """
+    video_ids = [item["id"]["videoId"] for item in items if item.get("id", {}).get("videoId")]
+    if not video_ids:
+        return items
+
+    try:
+        details = get_videos_metadata(video_ids, ("snippet", "contentDetails", "statistics"))
+    except Exception as e:
+        # Search results are still useful without the extra details
+        logger.error(f"Error enriching YouTube search results: {str(e)}")
+        return items
+
+    for item in items:
+        detail = details.get(item.get("id", {}).get("videoId"))
+        if detail:
+            item["contentDetails"] = detail.get("contentDetails", {})
+            item["statistics"] = detail.get("statistics", {})
+    return items
+
+
+def get_video_metadata_stats() -> Dict[str, Any]:
+    """Hit-rate metrics of the metadata cache and the number of videos.list calls made"""
+    return video_metadata_cache.stats()
@@ -0,0 +1,79 @@
+import logging
+import threading
+from contextlib import contextmanager
+from typing import Any, Dict, List
+
+from pytube import YouTube
+
+from config import YOUTUBE_STREAM_CACHE_MAX_ENTRIES, YOUTUBE_STREAM_CACHE_TTL
+from services.cache import TTLCache
+
+
+logger = logging.getLogger(__name__)
+
+# video ID -> YouTube object whose watch page, player response and stream
+# manifest (including deciphered signatures) have already been loaded
+stream_cache = TTLCache(YOUTUBE_STREAM_CACHE_MAX_ENTRIES, YOUTUBE_STREAM_CACHE_TTL)
+
+# Per-video locks so concurrent requests for the same video share one fetch
+fetch_locks: Dict[str, List[Any]] = {}  # video ID -> [lock, users]
+fetch_locks_guard = threading.Lock()
+
+
+@contextmanager
+def _video_lock(video_id: str):
+    with fetch_locks_guard:
+        entry = fetch_locks.setdefault(video_id, [threading.Lock(), 0])
+        entry[1] += 1
+    try:
+        with entry[0]:
+            yield
+    finally:
+        with fetch_locks_guard:
+            entry[1] -= 1
+            if entry[1] == 0:
+                del fetch_locks[video_id]
+
+
+def get_stream_manifest(video_id: str) -> YouTube:
+    """
+    Return a pytube YouTube object with its stream manifest loaded, from the cache
+    when possible. Loading costs a watch-page fetch plus the cipher parse, so
+    "show formats" followed by "download" only pays for it once.
+
+    Args:
+        video_id: YouTube video ID
+
+    Returns:
+        YouTube: Object whose streams, title, author and length are already loaded
+
+    Raises:
+        pytube.exceptions.RegexMatchError, VideoUnavailable: If the video cannot be loaded
+    """
+    yt = stream_cache.get(video_id)
+    if yt is not None:
+        return yt
+
+    with _video_lock(video_id):
+        # Another thread may have loaded it while we waited
+        yt = stream_cache.get(video_id)
+        if yt is not None:
+            return yt
+
+        yt = YouTube(f"https://www.youtube.com/watch?v={video_id}")
+        # Touch the lazy properties now so every later access is served from the object
+        yt.streams
+        yt.title, yt.author, yt.length
+        stream_cache.set(video_id, yt)
+        logger.debug(f"Loaded stream manifest for {video_id}")
+        return yt
+
+
+def invalidate_stream_manifest(video_id: str):
+    """Drop a cached manifest, e.g. after its signed stream URLs were rejected"""
+    stream_cache.pop(video_id)
+
+
+def get_stream_cache_stats() -> Dict[str, Any]:
+    """Hit-rate metrics of the stream manifest cache"""
+    return stream_cache.stats()
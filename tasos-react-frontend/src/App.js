@@ -307,15 +307,9 @@ function App() {
                         });
                     }
                 } else if (videoType === "downloaded") {
-                    // Handle downloaded video
-                    const videoRes = await axios.post(`http://localhost:8000/videos/${videoId}/download`, {}, {
-                        headers: { Authorization: `Bearer ${token}` }
-                    });
-                    
-                    if (videoRes.data.success) {
-                        // Add logic to handle downloaded video
-                        console.log("Video downloaded:", videoRes.data);
-                    }
+                    // The agent's download tool has already saved the video to history;
+                    // fetchConversations() below picks up the new entry
+                    console.log("Video downloaded:", videoId);
                 }
                 
                 // Set the cleaned response without the metadata
@@ -0,0 +1,69 @@
+import itertools
+import sys
+import types
+from pathlib import Path
+
+import pytest
+
+
+# Modules are imported the way app.py imports them, relative to the repository root
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+
+@pytest.fixture
+def fake_crud(monkeypatch):
+    """
+    Replace database.crud (which needs a MySQL connection) with an in-memory
+    stand-in. Tests read `videos`, `conversations` and `evicted` back, and fill
+    `references` with filepath -> row count for the eviction queries.
+    """
+    crud = types.ModuleType("database.crud")
+    crud.videos = []
+    crud.conversations = []
+    crud.references = {}
+    crud.evicted = []
+    crud.queries = 0
+    ids = itertools.count(1)
+
+    def save_video_to_db(user_id, video_data):
+        video_db_id = next(ids)
+        crud.videos.append({"id": video_db_id, "user_id": user_id, **video_data})
+        return video_db_id
+
+    def execute_query(query, params=None, return_last_id=False):
+        if query.startswith("INSERT INTO conversations"):
+            conversation_id = next(ids)
+            crud.conversations.append({"id": conversation_id, "user_id": params[0], "video_id": None})
+            return conversation_id
+        return True
+
+    def link_video_to_conversation(conversation_id, video_db_id):
+        for conversation in crud.conversations:
+            if conversation["id"] == conversation_id:
+                conversation["video_id"] = video_db_id
+        return True
+
+    def get_user_downloaded_video(user_id, filepath):
+        for video in reversed(crud.videos):
+            if video["user_id"] == user_id and video.get("filepath") == filepath:
+                linked = [c["id"] for c in crud.conversations if c["video_id"] == video["id"]]
+                return video["id"], (linked[-1] if linked else None)
+        return None
+
+    def count_video_file_references(filepaths):
+        crud.queries += 1
+        return {filepath: crud.references.get(filepath, 0) for filepath in filepaths}
+
+    def mark_video_file_evicted(filepath):
+        crud.evicted.append(filepath)
+        return True
+
+    for func in (save_video_to_db, execute_query, link_video_to_conversation, get_user_downloaded_video,
+                 count_video_file_references, mark_video_file_evicted):
+        setattr(crud, func.__name__, func)
+
+    database = types.ModuleType("database")
+    database.crud = crud
+    monkeypatch.setitem(sys.modules, "database", database)
+    monkeypatch.setitem(sys.modules, "database.crud", crud)
+    return crud
@@ -0,0 +1,42 @@
+from services import cache
+from services.cache import TTLCache
+
+
+def test_lru_evicts_least_recently_used():
+    c = TTLCache(maxsize=2)
+    c.set("a", 1)
+    c.set("b", 2)
+    assert c.get("a") == 1  # "b" is now the least recently used
+    c.set("c", 3)
+    assert "b" not in c
+    assert c.get("a") == 1 and c.get("c") == 3
+    assert c.stats()["evictions"] == 1
+
+
+def test_entries_expire_after_ttl(monkeypatch):
+    now = [100.0]
+    monkeypatch.setattr(cache.time, "monotonic", lambda: now[0])
+    c = TTLCache(maxsize=10, ttl=5)
+    c.set("a", 1)
+    c.set("b", 2, ttl=20)
+
+    now[0] += 6
+    assert c.get("a") is None
+    assert "a" not in c
+    assert c.get("b") == 2
+
+
+def test_hit_and_miss_counters():
+    c = TTLCache(maxsize=10)
+    c.set("a", 1)
+    c.get("a")
+    c.get("missing", "default")
+    stats = c.stats()
+    assert (stats["hits"], stats["misses"]) == (1, 1)
+
+
+def test_pop_returns_value_once():
+    c = TTLCache(maxsize=10)
+    c.set("a", 1)
+    assert c.pop("a") == 1
+    assert c.pop("a", "gone") == "gone"
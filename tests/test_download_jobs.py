@@ -0,0 +1,71 @@
+import threading
+import time
+
+import pytest
+
+from services import download_jobs
+from services.download_jobs import COMPLETED, DownloadJobManager, record_download
+
+
+VIDEO = {
+    "video_id": "dQw4w9WgXcQ",
+    "title": "Title",
+    "filepath": "storage/videos/dQw4w9WgXcQ_720p.mp4",
+    "type": "downloaded",
+}
+
+
+def test_record_download_is_idempotent_per_user_and_file(fake_crud):
+    first = record_download(1, VIDEO)
+    assert record_download(1, VIDEO) == first
+    assert len(fake_crud.videos) == 1 and len(fake_crud.conversations) == 1
+
+    # Another user gets their own history entry for the same stored file
+    assert record_download(2, VIDEO) != first
+    assert len(fake_crud.videos) == 2
+
+
+@pytest.fixture
+def manager(monkeypatch):
+    started = []
+    monkeypatch.setattr(DownloadJobManager, "_run", lambda self, key: started.append(key))
+    manager = DownloadJobManager(max_workers=2, max_pending=10, job_ttl=60)
+    manager.started = started
+    yield manager
+    manager.shutdown()
+
+
+def test_concurrent_submits_for_a_stored_file_share_one_lookup(manager, monkeypatch, fake_crud):
+    lookups = []
+
+    def stored_video_result(video_id, path):
+        lookups.append(video_id)
+        time.sleep(0.1)  # Other submits arrive while the row is being read
+        return dict(VIDEO)
+
+    monkeypatch.setattr(download_jobs, "find_stored_video", lambda video_id, resolution: VIDEO["filepath"])
+    monkeypatch.setattr(download_jobs, "stored_video_result", stored_video_result)
+
+    jobs = []
+    threads = [threading.Thread(target=lambda: jobs.append(manager.submit("dQw4w9WgXcQ", "720p", 1))) for _ in range(5)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert lookups == ["dQw4w9WgXcQ"]
+    assert manager.started == []
+    assert all(job.status == COMPLETED for job in jobs)
+    # All five jobs belong to one user and one file: a single history entry
+    assert len(fake_crud.videos) == 1
+
+
+def test_missing_file_is_downloaded_once(manager, monkeypatch):
+    monkeypatch.setattr(download_jobs, "find_stored_video", lambda video_id, resolution: None)
+
+    first = manager.submit("dQw4w9WgXcQ", "720p")
+    second = manager.submit("dQw4w9WgXcQ", "720p")
+
+    time.sleep(0.05)
+    assert manager.started == [("dQw4w9WgXcQ", "720p")]
+    assert first.job_id != second.job_id
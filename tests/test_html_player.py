@@ -0,0 +1,72 @@
+import os
+
+import pytest
+
+from services import html_player
+
+
+@pytest.fixture(autouse=True)
+def empty_cache():
+    html_player.player_cache.clear()
+    yield
+    html_player.player_cache.clear()
+
+
+def test_render_escapes_title_and_id():
+    page = html_player.render_player("abc123", 640, 360, '<script>alert("x")</script> & more')
+    assert "<script>alert" not in page
+    assert "&lt;script&gt;alert(&quot;x&quot;)&lt;/script&gt; &amp; more" in page
+    assert 'src="https://www.youtube.com/embed/abc123?autoplay=1"' in page
+    assert "width: 640px;" in page and "height: 360px;" in page
+
+
+def test_page_is_rendered_once_per_size(monkeypatch):
+    lookups = []
+
+    def snippet(video_id):
+        lookups.append(video_id)
+        return {"title": "Some title"}
+
+    monkeypatch.setattr(html_player, "get_video_snippet", snippet)
+    first = html_player.get_player_html("dQw4w9WgXcQ", 640, 360)
+    assert html_player.get_player_html("dQw4w9WgXcQ", 640, 360) is first
+    assert "<title>Some title</title>" in first
+
+    html_player.get_player_html("dQw4w9WgXcQ", 800, 450)
+    assert lookups == ["dQw4w9WgXcQ", "dQw4w9WgXcQ"]
+
+
+def test_title_falls_back_when_lookup_fails(monkeypatch):
+    def snippet(video_id):
+        raise RuntimeError("quota exceeded")
+
+    monkeypatch.setattr(html_player, "get_video_snippet", snippet)
+    page = html_player.get_player_html("dQw4w9WgXcQ", 640, 360)
+    assert "<title>YouTube Video - dQw4w9WgXcQ</title>" in page
+
+
+def test_invalid_video_id_is_rejected():
+    with pytest.raises(ValueError):
+        html_player.get_player_html("../../etc/passwd", 640, 360)
+
+
+@pytest.mark.parametrize("value, expected", [
+    ("https://www.youtube.com/watch?v=dQw4w9WgXcQ&t=10", "dQw4w9WgXcQ"),
+    ("https://youtu.be/dQw4w9WgXcQ?si=abc", "dQw4w9WgXcQ"),
+    ("dQw4w9WgXcQ", "dQw4w9WgXcQ"),
+])
+def test_extract_video_id(value, expected):
+    assert html_player.extract_video_id(value) == expected
+
+
+def test_legacy_files_expire(tmp_path, monkeypatch):
+    monkeypatch.setattr(html_player, "HTML_PLAYER_TEMP_DIR", str(tmp_path))
+    monkeypatch.setattr(html_player.tempfile, "gettempdir", lambda: str(tmp_path))
+    old = tmp_path / "youtube_player_old.html"
+    new = tmp_path / "youtube_player_new.html"
+    old.write_text("old")
+    new.write_text("new")
+    os.utime(old, (0, 0))
+
+    assert html_player.cleanup_legacy_player_files(max_age=60) == 1
+    assert not old.exists() and new.exists()
@@ -0,0 +1,40 @@
+import asyncio
+
+import pytest
+
+from services import password_service
+
+
+# Few iterations keep the test fast; the pool does not care about the method
+FAST_METHOD = "pbkdf2:sha256:1000"
+
+
+@pytest.fixture(autouse=True)
+def pool():
+    yield
+    password_service.shutdown_password_pool()
+
+
+def test_hash_and_verify_on_the_pool():
+    async def run():
+        hashed = await password_service.hash_password("s3cret", FAST_METHOD)
+        return hashed, await password_service.verify_password(hashed, "s3cret"), await password_service.verify_password(hashed, "wrong")
+
+    hashed, ok, wrong = asyncio.run(run())
+    assert hashed.startswith("pbkdf2:sha256:1000$")
+    assert ok is True
+    assert wrong is False
+    assert password_service.hash_pool is not None
+
+
+def test_concurrent_hashes_are_all_answered():
+    async def run():
+        return await asyncio.gather(*(password_service.hash_password(f"pw{i}", FAST_METHOD) for i in range(8)))
+
+    hashes = asyncio.run(run())
+    assert len(set(hashes)) == 8
+
+
+def test_workers_are_not_forked():
+    pool = password_service.init_password_pool()
+    assert pool._mp_context.get_start_method() in ("forkserver", "spawn")
@@ -0,0 +1,51 @@
+from services.search_ranking import (
+    bm25_scores,
+    pack_search_results,
+    rank_search_results,
+    tokenize,
+    _term_matrix
+)
+
+
+def test_tokenize_drops_stopwords_and_case():
+    assert tokenize("What is the Speed of Light?") == ["speed", "light"]
+
+
+def test_bm25_prefers_rarer_terms_and_shorter_documents():
+    docs = [["python", "asyncio"], ["python", "python", "guide", "intro", "basics"], ["cooking"]]
+    matrix, cols = _term_matrix(docs, ["asyncio", "python"])
+    scores = bm25_scores(matrix, cols)
+    assert scores[0] > scores[1] > scores[2] == 0
+
+
+def test_bm25_without_query_terms_scores_zero():
+    matrix, cols = _term_matrix([["a1"], ["b2"]], ["missing"])
+    assert cols == []
+    assert list(bm25_scores(matrix, cols)) == [0, 0]
+
+
+def test_rank_orders_by_relevance_and_keeps_engine_order_on_ties():
+    items = [
+        {"title": "Cooking pasta", "snippet": "Boil water", "link": "a"},
+        {"title": "Rust borrow checker", "snippet": "Ownership in rust", "link": "b"},
+        {"title": "Gardening", "snippet": "Tomatoes", "link": "c"},
+    ]
+    ranked = rank_search_results("rust ownership", items)
+    assert [item["link"] for item in ranked] == ["b", "a", "c"]
+
+
+def test_rank_drops_near_duplicates():
+    items = [
+        {"title": "Rust ownership explained", "snippet": "Borrowing and lifetimes", "link": "a"},
+        {"title": "Rust ownership explained", "snippet": "Borrowing and lifetimes", "link": "b"},
+        {"title": "Rust async", "snippet": "Futures and tokio", "link": "c"},
+    ]
+    ranked = rank_search_results("rust ownership", items)
+    assert [item["link"] for item in ranked] == ["a", "c"]
+
+
+def test_pack_respects_budget_but_keeps_best_result():
+    items = [{"title": "t" * 40, "link": "l", "snippet": "s" * 400}] * 3
+    blocks = pack_search_results(items, token_budget=20)
+    assert len(blocks) == 1
+    assert len(blocks[0]) == 80
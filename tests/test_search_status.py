@@ -0,0 +1,62 @@
+import pytest
+import requests
+
+from services import search_service
+from services.search_service import _record_search_outcome, check_google_search_status
+
+
+@pytest.fixture(autouse=True)
+def configured(monkeypatch):
+    monkeypatch.setattr(search_service, "GOOGLE_API_KEY", "key")
+    monkeypatch.setattr(search_service, "GOOGLE_CSE_ID", "cse")
+    monkeypatch.setattr(search_service, "SEARCH_FAILURE_TTL", 300)
+    monkeypatch.setattr(search_service, "last_search_outcome", {"ok": None, "error": None, "persistent": False, "at": None})
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(search_service.time, "time", lambda: now[0])
+    return now
+
+
+def error_payload(code, reason, message="failed"):
+    return {"error": {"code": code, "message": message, "errors": [{"reason": reason}]}}
+
+
+def test_unconfigured_credentials_are_down(monkeypatch):
+    monkeypatch.setattr(search_service, "GOOGLE_API_KEY", "place your key here")
+    assert check_google_search_status() == (False, "Google API key is not configured")
+
+
+@pytest.mark.parametrize("outcome", [
+    {"data": error_payload(503, "backendError")},
+    {"data": error_payload(400, "invalid")},
+    {"error": requests.ConnectionError("connection reset")},
+])
+def test_transient_failure_keeps_search_available(clock, outcome):
+    _record_search_outcome(**outcome)
+    assert check_google_search_status() == (True, None)
+
+
+def test_quota_failure_expires(clock):
+    _record_search_outcome(error_payload(403, "dailyLimitExceeded", "Daily limit exceeded"))
+    assert check_google_search_status() == (False, "Daily limit exceeded")
+
+    clock[0] += 301
+    assert check_google_search_status() == (True, None)
+
+
+def test_success_clears_failure(clock):
+    _record_search_outcome(error_payload(400, "keyInvalid", "API key not valid"))
+    assert check_google_search_status()[0] is False
+
+    _record_search_outcome({"items": []})
+    assert check_google_search_status() == (True, None)
+
+
+def test_raised_auth_error_counts_as_persistent(clock):
+    response = requests.Response()
+    response.status_code = 401
+    _record_search_outcome(error=requests.HTTPError("401 Unauthorized", response=response))
+    assert check_google_search_status() == (False, "401 Unauthorized")
@@ -0,0 +1,49 @@
+import threading
+
+from services.session_memory import SessionMemoryStore, estimate_token_count, truncate_to_tokens
+
+
+def test_truncate_uses_the_token_estimate():
+    for max_tokens in (0, 1, 10, 25):
+        text = truncate_to_tokens("x" * 1000, max_tokens)
+        assert estimate_token_count(text) == max_tokens
+        assert estimate_token_count(text + "x") > max_tokens
+    assert truncate_to_tokens("short", 10) == "short"
+
+
+def test_oversized_turn_keeps_earlier_turns():
+    store = SessionMemoryStore(token_budget=100, max_sessions=10, idle_ttl=60)
+    store.add_turn(1, "first question", "first answer")
+    store.add_turn(1, "q" * 10_000, "a" * 10_000)
+
+    history = store.get_history(1)
+    assert "first question" in history
+    assert estimate_token_count(history) <= 100
+
+
+def test_window_is_trimmed_oldest_first():
+    store = SessionMemoryStore(token_budget=20, max_sessions=10, idle_ttl=60)
+    for i in range(10):
+        store.add_turn(1, f"question {i:02d}", f"answer {i:02d}")
+
+    history = store.get_history(1)
+    assert "question 09" in history
+    assert "question 00" not in history
+
+
+def test_concurrent_turns_are_not_lost():
+    store = SessionMemoryStore(token_budget=100_000, max_sessions=10, idle_ttl=60)
+    threads = [threading.Thread(target=store.add_turn, args=(1, f"q{i}", f"a{i}")) for i in range(50)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert store.get_history(1).count("Human:") == 50
+    assert store._locks == {}
+
+
+def test_anonymous_users_have_no_history():
+    store = SessionMemoryStore(token_budget=100, max_sessions=10, idle_ttl=60)
+    store.add_turn(None, "q", "a")
+    assert store.get_history(None) == ""
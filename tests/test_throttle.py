@@ -0,0 +1,59 @@
+import pytest
+
+from api import throttle
+from api.throttle import InMemoryBucketStore
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    """Controllable time.monotonic for the bucket store"""
+    now = [1000.0]
+    monkeypatch.setattr(throttle.time, "monotonic", lambda: now[0])
+    return now
+
+
+def test_bucket_allows_burst_up_to_capacity(clock):
+    store = InMemoryBucketStore()
+    for _ in range(3):
+        assert store.take_all([("ip:1", 3, 60.0)]) == 0
+    assert store.take_all([("ip:1", 3, 60.0)]) == pytest.approx(20.0)
+
+
+def test_bucket_refills_at_capacity_per_period(clock):
+    store = InMemoryBucketStore()
+    for _ in range(3):
+        store.take_all([("ip:1", 3, 60.0)])
+
+    clock[0] += 10.0
+    assert store.take_all([("ip:1", 3, 60.0)]) == pytest.approx(10.0)
+    clock[0] += 10.0
+    assert store.take_all([("ip:1", 3, 60.0)]) == 0
+
+
+def test_rejection_charges_no_bucket(clock):
+    store = InMemoryBucketStore()
+    user = ("user:alice", 1, 60.0)
+    ip = ("ip:1", 5, 60.0)
+    assert store.take_all([ip, user]) == 0
+
+    # The username bucket is empty: the IP bucket must not be charged for the attempt
+    for _ in range(10):
+        assert store.take_all([ip, user]) > 0
+    for _ in range(4):
+        assert store.take_all([ip]) == 0
+    assert store.take_all([ip]) > 0
+
+
+def test_retry_after_is_longest_wait(clock):
+    store = InMemoryBucketStore()
+    store.take_all([("a", 1, 10.0), ("b", 1, 30.0)])
+    assert store.take_all([("a", 1, 10.0), ("b", 1, 30.0)]) == pytest.approx(30.0)
+
+
+def test_full_buckets_are_swept(clock):
+    store = InMemoryBucketStore()
+    store.SWEEP_EVERY = 2
+    store.take_all([("a", 2, 10.0)])
+    clock[0] += 10.0
+    store.take_all([("b", 2, 10.0)])
+    assert "a" not in store._buckets
@@ -0,0 +1,78 @@
+import os
+
+import pytest
+
+from services import video_storage
+
+
+MB = 1024 * 1024
+
+
+@pytest.fixture
+def storage(tmp_path, monkeypatch):
+    monkeypatch.setattr(video_storage, "video_storage_dir", tmp_path)
+    monkeypatch.setattr(video_storage, "quota_bytes", 3 * MB)
+    return tmp_path
+
+
+def store(storage, name: str, size: int, accessed: int):
+    path = storage / f"{name}.mp4"
+    path.write_bytes(b"\0" * size)
+    os.utime(path, (accessed, accessed))
+    return path
+
+
+def test_under_quota_evicts_nothing(storage, fake_crud):
+    store(storage, "a_720p", MB, 100)
+    assert video_storage.enforce_quota(incoming_bytes=MB) == []
+    assert fake_crud.queries == 0
+
+
+def test_unreferenced_files_go_first_then_least_recently_accessed(storage, fake_crud):
+    old_referenced = store(storage, "old_720p", MB, 100)
+    new_unreferenced = store(storage, "new_720p", MB, 300)
+    mid_referenced = store(storage, "mid_720p", MB, 200)
+    fake_crud.references = {str(old_referenced): 2, str(mid_referenced): 1}
+
+    evicted = video_storage.enforce_quota(incoming_bytes=2 * MB)
+
+    assert evicted == [new_unreferenced, old_referenced]
+    assert mid_referenced.exists()
+    assert fake_crud.evicted == [str(new_unreferenced), str(old_referenced)]
+    # Reference counts come from one query, not one per file
+    assert fake_crud.queries == 1
+
+
+def test_kept_and_busy_files_are_never_evicted(storage, fake_crud):
+    keep = store(storage, "keep_720p", 2 * MB, 100)
+    busy = store(storage, "busy_720p", MB, 150)
+    other = store(storage, "other_720p", MB, 200)
+
+    with video_storage.lock_stored_video(busy):
+        evicted = video_storage.enforce_quota(keep=keep)
+
+    assert evicted == [other]
+    assert keep.exists() and busy.exists()
+
+
+def test_hls_segments_count_towards_quota_and_are_evicted(storage, fake_crud):
+    path = store(storage, "a_720p", MB, 100)
+    hls_dir = video_storage.stored_hls_dir(path)
+    hls_dir.mkdir(parents=True)
+    (hls_dir / "index.m3u8").write_bytes(b"\0" * (2 * MB))
+
+    assert video_storage.enforce_quota(incoming_bytes=MB) == [path]
+    assert not hls_dir.exists()
+
+
+def test_recording_access_keeps_mtime(tmp_path):
+    path = tmp_path / "a_720p.mp4"
+    path.write_bytes(b"video")
+    # Sub-second mtime: a float round trip would change it, and with it the ETag
+    os.utime(path, ns=(1_700_000_000_000_000_000, 1_700_000_000_123_456_789))
+
+    video_storage.touch_stored_video(path)
+
+    st = path.stat()
+    assert st.st_mtime_ns == 1_700_000_000_123_456_789
+    assert st.st_atime_ns > 1_700_000_000_000_000_000
@@ -0,0 +1,87 @@
+import pytest
+
+from services import youtube_metadata
+from services.youtube_metadata import VideoMetadataCache
+
+
+class FakeYouTube:
+    """Records videos.list calls and answers them from a fixed catalogue"""
+
+    def __init__(self, catalogue):
+        self.catalogue = catalogue
+        self.calls = []
+
+    def videos(self):
+        return self
+
+    def list(self, part, id, maxResults):
+        self.calls.append((part, id))
+        parts = part.split(",")
+        items = [
+            {"id": video_id, **{p: self.catalogue[video_id][p] for p in parts}}
+            for video_id in id.split(",") if video_id in self.catalogue
+        ]
+        return type("Request", (), {"execute": lambda self: {"items": items}})()
+
+
+@pytest.fixture
+def cache(monkeypatch):
+    cache = VideoMetadataCache(100, {"snippet": 60, "contentDetails": 60, "statistics": 60})
+    monkeypatch.setattr(youtube_metadata, "video_metadata_cache", cache)
+    return cache
+
+
+@pytest.fixture
+def youtube(monkeypatch):
+    catalogue = {
+        video_id: {
+            "snippet": {"title": f"Full title {video_id} & co", "description": "The full description", "tags": ["t"]},
+            "contentDetails": {"duration": "PT1M"},
+            "statistics": {"viewCount": "10"},
+        }
+        for video_id in ("aaaaaaa", "bbbbbbb")
+    }
+    client = FakeYouTube(catalogue)
+    monkeypatch.setattr(youtube_metadata, "get_youtube_client", lambda: client)
+    return client
+
+
+def search_item(video_id):
+    # search.list snippets are truncated and HTML-escaped
+    return {"id": {"videoId": video_id}, "snippet": {"title": f"Full title {video_id} &amp; co", "description": "The full…"}}
+
+
+def test_enrich_makes_one_call_with_all_parts(cache, youtube):
+    items = youtube_metadata.enrich_search_items([search_item("aaaaaaa"), search_item("bbbbbbb")])
+
+    assert youtube.calls == [("snippet,contentDetails,statistics", "aaaaaaa,bbbbbbb")]
+    assert items[0]["contentDetails"] == {"duration": "PT1M"}
+    assert items[1]["statistics"] == {"viewCount": "10"}
+
+
+def test_cached_snippet_is_the_full_videos_list_one(cache, youtube):
+    youtube_metadata.enrich_search_items([search_item("aaaaaaa")])
+
+    snippet = youtube_metadata.get_video_snippet("aaaaaaa")
+    assert snippet == {"title": "Full title aaaaaaa & co", "description": "The full description", "tags": ["t"]}
+    assert len(youtube.calls) == 1
+
+
+def test_missing_part_refetches_every_requested_part(cache, youtube):
+    cache.put({"id": "aaaaaaa", "snippet": {"title": "cached"}})
+
+    item = youtube_metadata.get_video_metadata("aaaaaaa", ("snippet", "statistics"))
+
+    assert youtube.calls == [("snippet,statistics", "aaaaaaa")]
+    assert item["snippet"]["title"] == "Full title aaaaaaa & co"
+
+
+def test_unknown_video_is_none(cache, youtube):
+    assert youtube_metadata.get_video_snippet("zzzzzzz") is None
+
+
+def test_enrich_keeps_results_when_lookup_fails(cache, monkeypatch):
+    monkeypatch.setattr(youtube_metadata, "get_youtube_client", lambda: None)
+    items = [search_item("aaaaaaa")]
+    assert youtube_metadata.enrich_search_items(items) == items
+    assert "contentDetails" not in items[0]